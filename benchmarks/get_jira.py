@@ -0,0 +1,85 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Benchmark of the get_jira dependency resolving the JIRA connection of a request.
+
+Run it from the repository root with `python -m benchmarks.get_jira`.
+"""
+
+import argparse
+import time
+from typing import Callable
+
+from mvtool.auth import get_jira
+from mvtool.auth.cache import _sessions_cache, clear_session_caches
+from mvtool.auth.token import clear_credentials_cache, create_token
+from mvtool.config import AuthConfig, Config, DatabaseConfig, JiraConfig
+from mvtool.utils.crypto import derive_key
+from tests.test_data.test_jira_server import _start_fake_jira_server
+
+
+def _measure(label: str, func: Callable, requests: int) -> None:
+    start = time.perf_counter()
+    for _ in range(requests):
+        func()
+    duration = time.perf_counter() - start
+    print(f"{label:<40} {duration / requests * 1000:10.3f} ms/request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+
+    servers = _start_fake_jira_server()
+    server = next(servers)
+    config = Config(
+        database=DatabaseConfig(url="sqlite://"),
+        jira=JiraConfig(url=server.url),
+        auth=AuthConfig(secret="secret"),
+    )
+    token = create_token("user", "password", config.auth)
+
+    def resolve_jira():
+        dependency = get_jira(token, config)
+        next(dependency)
+        dependency.close()
+
+    def resolve_jira_without_session():
+        _sessions_cache.clear()
+        resolve_jira()
+
+    def resolve_jira_without_caches():
+        # Mimics deriving the key on every request as done before it was cached
+        clear_session_caches()
+        clear_credentials_cache()
+        derive_key(config.auth.secret)
+        resolve_jira()
+
+    print(f"Resolving JIRA connections for {args.requests} requests")
+    try:
+        resolve_jira()  # fetch the server info of JIRA once
+        _measure("cached session", resolve_jira, args.requests)
+        _measure("cached credentials", resolve_jira_without_session, args.requests)
+        _measure("no caches", resolve_jira_without_caches, args.requests)
+    finally:
+        servers.close()
+
+
+if __name__ == "__main__":
+    main()
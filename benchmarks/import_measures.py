@@ -0,0 +1,96 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmark of the CPU bound part of importing measures from a spreadsheet.
+
+Run it from the repository root with `python -m benchmarks.import_measures`.
+"""
+
+import argparse
+import inspect
+import time
+from typing import Callable
+
+from mvtool.tables.dataframe import Cell
+from mvtool.tables.measures import get_measure_columns
+
+
+def _resolve(get_columns: Callable):
+    """Call a columns dependency with its sub-dependencies resolved."""
+    kwargs = {}
+    for name, param in inspect.signature(get_columns).parameters.items():
+        if hasattr(param.default, "dependency"):
+            kwargs[name] = _resolve(param.default.dependency)
+    return get_columns(**kwargs)
+
+
+def _get_rows(count: int):
+    for i in range(count):
+        yield [
+            Cell("Project Name", "Project"),
+            Cell("Requirement Reference", f"REQ-{i % 100}"),
+            Cell("Requirement Summary", f"Requirement {i % 100}"),
+            Cell("Requirement Compliance Status", "C"),
+            Cell("Measure Reference", f"M-{i}"),
+            Cell("Measure Summary", f"Measure {i}"),
+            Cell("Measure Description", "Lorem ipsum dolor sit amet " * 4),
+            Cell("Document Title", f"Document {i % 10}"),
+            Cell("Measure Compliance Status", "C"),
+            Cell("Measure Verification Method", "R"),
+        ]
+
+
+def _measure(label: str, func: Callable, repeat: int) -> None:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    print(f"{label:<40} {min(durations) * 1000:10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    columns = _resolve(get_measure_columns)
+    measure_imports = list(columns.import_from_rows(_get_rows(args.rows)))
+
+    def map_etags():
+        # Mimics how the bulk import keys measures and their nested imports
+        measures_map = {m.etag: m for m in measure_imports}
+        requirements_map = {m.requirement.etag: m for m in measure_imports}
+        documents_map = {m.document.etag: m for m in measure_imports}
+        for m in measure_imports:
+            measures_map[m.etag]
+            requirements_map[m.requirement.etag]
+            documents_map[m.document.etag]
+
+    print(f"Importing {args.rows} measures, best of {args.repeat}")
+    _measure(
+        "validate rows",
+        lambda: list(columns.import_from_rows(_get_rows(args.rows))),
+        args.repeat,
+    )
+    _measure("map etags (first access)", map_etags, 1)
+    _measure("map etags (repeated access)", map_etags, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
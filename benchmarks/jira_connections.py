@@ -0,0 +1,82 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Benchmark of creating JIRA connections for logins against a local fake JIRA.
+
+Run it from the repository root with `python -m benchmarks.jira_connections`.
+"""
+
+import argparse
+import time
+from typing import Callable
+
+from jira import JIRA
+
+from mvtool.auth.jira_ import create_jira_connection
+from mvtool.config import JiraConfig
+from tests.test_data.test_jira_server import FakeJiraServer, _start_fake_jira_server
+
+
+def _measure(
+    label: str, server: FakeJiraServer, login: Callable[[str], JIRA], logins: int
+) -> None:
+    connections = server.connections
+    jira_connections = []  # keep connections open like the session cache does
+    start = time.perf_counter()
+    for i in range(logins):
+        jira_connection = login(f"user{i}")
+        jira_connection.myself()
+        jira_connections.append(jira_connection)
+    duration = time.perf_counter() - start
+    print(
+        f"{label:<40} {duration / logins * 1000:10.2f} ms/login "
+        f"{server.connections - connections:6d} TCP connections"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+
+    servers = _start_fake_jira_server()
+    server = next(servers)
+    jira_config = JiraConfig(url=server.url)
+
+    def login_with_new_client(username: str) -> JIRA:
+        return JIRA(
+            jira_config.url,
+            dict(verify=jira_config.verify_ssl),
+            basic_auth=(username, "password"),
+            timeout=jira_config.timeout,
+            max_retries=jira_config.max_retries,
+        )
+
+    def login_with_shared_transport(username: str) -> JIRA:
+        return create_jira_connection(username, "password", jira_config)
+
+    print(f"Logging {args.logins} users in to JIRA")
+    try:
+        _measure("new client per login", server, login_with_new_client, args.logins)
+        _measure("shared transport", server, login_with_shared_transport, args.logins)
+    finally:
+        servers.close()
+
+
+if __name__ == "__main__":
+    main()
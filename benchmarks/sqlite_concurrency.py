@@ -0,0 +1,80 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Benchmark of concurrent reads from a SQLite database file.
+
+Run it from the repository root with `python -m benchmarks.sqlite_concurrency`.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, insert, select
+
+from mvtool.config import DatabaseConfig
+from mvtool.db import database
+from mvtool.db.schema import Project
+
+
+def _read(_) -> int:
+    # Mimics a request handler reading with its own session
+    for session in database.get_session():
+        query = select(func.count()).where(Project.name.like("%7%"))
+        return session.execute(query).scalar()
+
+
+def _measure(threads: int, reads: int) -> float:
+    with ThreadPoolExecutor(threads) as executor:
+        start = time.perf_counter()
+        list(executor.map(_read, range(reads)))
+        return reads / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "mvtool.db")
+        database_config = DatabaseConfig(
+            url=f"sqlite:///{filename}", pool_size=max(args.threads)
+        )
+        database.setup_connection(database_config)
+        database.create_all()
+        for session in database.get_session():
+            session.execute(
+                insert(Project), [dict(name=f"Project {i}") for i in range(args.rows)]
+            )
+
+        print(f"Reading {args.rows} projects {args.reads} times")
+        try:
+            for threads in args.threads:
+                reads_per_second = _measure(threads, args.reads)
+                print(f"{threads:>3} threads {reads_per_second:10.1f} reads/s")
+        finally:
+            database.dispose_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""add job table
+
+Revision ID: 0e233ab2b857
+Revises: 35374d36bf2f
+Create Date: 2024-03-02 10:12:45.478691
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0e233ab2b857"
+down_revision = "35374d36bf2f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("created", sa.DateTime(), nullable=False),
+        sa.Column("updated", sa.DateTime(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("owner", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("processed", sa.Integer(), nullable=False),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("result_filename", sa.String(), nullable=True),
+        sa.Column("result_path", sa.String(), nullable=True),
+        sa.Column("input_path", sa.String(), nullable=True),
+        sa.Column("heartbeat", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_job")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job")
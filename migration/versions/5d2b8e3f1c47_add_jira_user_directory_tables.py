@@ -0,0 +1,64 @@
+"""add jira user directory tables
+
+Revision ID: 5d2b8e3f1c47
+Revises: 9c4e1f7a2b63
+Create Date: 2024-03-23 10:12:41.806217
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "5d2b8e3f1c47"
+down_revision = "9c4e1f7a2b63"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jira_user_entry",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("display_name", sa.String(), nullable=False),
+        sa.Column("email_address", sa.String(), nullable=True),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_jira_user_entry")),
+    )
+    op.create_index(
+        op.f("ix_jira_user_entry_display_name"),
+        "jira_user_entry",
+        ["display_name"],
+        unique=False,
+    )
+    op.create_table(
+        "jira_assignable_user",
+        sa.Column("jira_project_key", sa.String(), nullable=False),
+        sa.Column("jira_user_id", sa.String(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["jira_user_id"],
+            ["jira_user_entry.id"],
+            name=op.f("fk_jira_assignable_user_jira_user_id_jira_user_entry"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "jira_project_key", "jira_user_id", name=op.f("pk_jira_assignable_user")
+        ),
+    )
+    op.create_table(
+        "jira_user_search",
+        sa.Column("jira_project_key", sa.String(), nullable=False),
+        sa.Column("search_str", sa.String(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "jira_project_key", "search_str", name=op.f("pk_jira_user_search")
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("jira_user_search")
+    op.drop_table("jira_assignable_user")
+    op.drop_index(op.f("ix_jira_user_entry_display_name"), table_name="jira_user_entry")
+    op.drop_table("jira_user_entry")
@@ -0,0 +1,42 @@
+"""add jira issue snapshot table
+
+Revision ID: 9c4e1f7a2b63
+Revises: 0e233ab2b857
+Create Date: 2024-03-16 14:27:09.318524
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "9c4e1f7a2b63"
+down_revision = "0e233ab2b857"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jira_issue_snapshot",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("summary", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("issuetype_id", sa.String(), nullable=False),
+        sa.Column("issuetype_name", sa.String(), nullable=False),
+        sa.Column("project_id", sa.String(), nullable=False),
+        sa.Column("project_key", sa.String(), nullable=False),
+        sa.Column("project_name", sa.String(), nullable=False),
+        sa.Column("status_name", sa.String(), nullable=False),
+        sa.Column("status_color_name", sa.String(), nullable=False),
+        sa.Column("assignee_id", sa.String(), nullable=True),
+        sa.Column("assignee_display_name", sa.String(), nullable=True),
+        sa.Column("assignee_email_address", sa.String(), nullable=True),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_jira_issue_snapshot")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("jira_issue_snapshot")
@@ -24,6 +24,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from . import auth, migration, tables
 from .angular import AngularFiles
 from .config import load_config
+from .auth import (
+    setup_jira_circuit_breaker,
+    setup_session_store,
+    setup_verified_credentials,
+)
+from .auth.ldap_ import close_ldap_pool
+from .data.jira_ import setup_jira_caches
+from .data.jira_async import close_jira_async_clients
+from .data.jobs import setup_job_executor, shutdown_job_executor
 from .db import database
 from .handlers import (
     catalog_modules,
@@ -31,10 +40,16 @@ from .handlers import (
     catalogs,
     documents,
     jira_,
+    jobs,
     measures,
+    metrics,
     projects,
     requirements,
 )
+from .tables.validation import (
+    setup_validation_executor,
+    shutdown_validation_executor,
+)
 
 config = load_config()
 
@@ -56,6 +71,8 @@ def get_app(lifespan=None) -> FastAPI:
     app.include_router(requirements.router, prefix="/api")
     app.include_router(measures.router, prefix="/api")
     app.include_router(documents.router, prefix="/api")
+    app.include_router(jobs.router, prefix="/api")
+    app.include_router(metrics.router, prefix="/api")
     app.mount("/", AngularFiles(directory="htdocs", html=True))
     app.add_middleware(
         CORSMiddleware,
@@ -72,8 +89,19 @@ async def lifespan(_: FastAPI):
     # Startup logic
     migration.migrate(config.database)
     database.setup_connection(config.database)
+    setup_job_executor(config.jobs)
+    setup_validation_executor(config.imports)
+    setup_jira_caches(config.cache)
+    setup_session_store(config.auth)
+    setup_verified_credentials(config.auth)
+    if config.jira is not None:
+        setup_jira_circuit_breaker(config.jira)
     yield
     # Shutdown logic
+    shutdown_job_executor()
+    shutdown_validation_executor()
+    close_jira_async_clients()
+    close_ldap_pool()
     database.dispose_connection()
 
 
@@ -18,16 +18,28 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jira import JIRA, JIRAError
 
 from ..config import Config, load_config
-from .cache import cache_session, get_cached_session
-from .jira_ import authenticate_jira_user
-from .ldap_ import LdapJiraDummy, authenticate_ldap_user
+from .cache import (
+    cache_session,
+    get_cached_identity,
+    get_cached_session,
+    get_identity,
+    setup_session_store,
+)
+from .credentials import setup_verified_credentials, verified_credentials
+from .jira_ import (
+    authenticate_jira_user,
+    call_jira,
+    is_jira_unavailable,
+    setup_jira_circuit_breaker,
+)
+from .ldap_ import LdapJiraDummy, LdapUserDetails, authenticate_ldap_user
 from .token import create_token, get_credentials_from_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
 
-def _authenticate_user(
+def _authenticate_user_by_source(
     username: str, password: str, config: Config, validate_credentials: bool = False
 ) -> JIRA | LdapJiraDummy:
     """
@@ -58,6 +70,47 @@ def _authenticate_user(
     )
 
 
+def _authenticate_user(
+    username: str, password: str, config: Config, validate_credentials: bool = False
+) -> JIRA | LdapJiraDummy:
+    """
+    This function authenticates a user unless the same credentials failed recently.
+    Failed credentials are remembered to back off, verified credentials to restore
+    sessions without authenticating the user again. JIRA credentials only count as
+    verified if they have been validated.
+    """
+    verified_credentials.check_backoff(username, password)
+    try:
+        jira_connection = _authenticate_user_by_source(
+            username, password, config, validate_credentials
+        )
+    except HTTPException as error:
+        if error.status_code == 401:
+            verified_credentials.add_failure(username, password)
+        raise
+    if validate_credentials or isinstance(jira_connection, LdapJiraDummy):
+        verified_credentials.set_identity(
+            username, password, get_identity(jira_connection)
+        )
+    return jira_connection
+
+
+def _restore_session(
+    identity: dict, username: str, password: str, config: Config
+) -> JIRA | LdapJiraDummy | None:
+    """
+    This function restores the session of a user whose identity has already been
+    verified, possibly by another worker. LDAP users are not bound again and JIRA
+    users are not tried against LDAP first. None is returned if the source of the
+    identity is no longer configured.
+    """
+    if identity["source"] == "ldap" and config.ldap is not None:
+        return LdapJiraDummy(LdapUserDetails(**identity["user"]))
+    if identity["source"] == "jira" and config.jira is not None:
+        return authenticate_jira_user(username, password, config.jira)
+    return None
+
+
 @router.post("/token")
 def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
@@ -79,8 +132,17 @@ def get_jira(
     jira_connection = get_cached_session(token)
     if jira_connection is None:
         username, password = get_credentials_from_token(token, config.auth)
-        jira_connection = _authenticate_user(username, password, config)
-        cache_session(token, jira_connection)
+        identity = get_cached_identity(token) or verified_credentials.get_identity(
+            username, password
+        )
+        if identity is not None:
+            jira_connection = _restore_session(identity, username, password, config)
+        if jira_connection is None:
+            jira_connection = _authenticate_user(username, password, config)
+            cache_session(token, jira_connection)
+        else:
+            # Do not renew the identity, so that the user is verified again after all
+            cache_session(token, jira_connection, store_identity=False)
 
     # yield jira_connection to catch JIRA errors
     try:
@@ -93,3 +155,10 @@ def get_jira(
         ]
         details_str = "; ".join([d for d in details if d]) or "Unknown error"
         raise HTTPException(error.status_code, detail=f"JIRAError: {details_str}")
+
+
+def get_username(
+    token: str = Depends(oauth2_scheme), config: Config = Depends(load_config)
+) -> str:
+    username, _ = get_credentials_from_token(token, config.auth)
+    return username
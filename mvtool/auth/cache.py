@@ -12,24 +12,62 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from dataclasses import asdict
 from hashlib import sha256
 from threading import Lock
+from typing import Any
 
 from cachetools import TTLCache
 from jira import JIRA
 
+from ..config import AuthConfig
+from .ldap_ import LdapJiraDummy
+from .session_store import MemorySessionStore, SessionStore, create_session_store
+
+# Connections of users are cached per worker, while their verified identities are
+# kept in the session store to restore connections in other workers
 _sessions_cache = TTLCache(maxsize=1000, ttl=5 * 60)
 _sessions_cache_lock = Lock()
+_session_store: SessionStore = MemorySessionStore()
+
+
+def setup_session_store(auth_config: AuthConfig) -> None:
+    global _sessions_cache, _session_store
+    with _sessions_cache_lock:
+        _sessions_cache = TTLCache(
+            maxsize=auth_config.sessions_maxsize, ttl=auth_config.sessions_ttl
+        )
+        _session_store = create_session_store(auth_config)
+
+
+def get_identity(jira: JIRA | LdapJiraDummy) -> dict[str, Any]:
+    if isinstance(jira, LdapJiraDummy):
+        return dict(source="ldap", user=asdict(jira.ldap_user_details))
+    return dict(source="jira")
 
 
-def cache_session(token: str, jira: JIRA):
+def cache_session(token: str, jira: JIRA | LdapJiraDummy, store_identity: bool = True):
     cache_key = sha256(token.encode("utf-8")).hexdigest()
     with _sessions_cache_lock:
         _sessions_cache[cache_key] = jira
+    if store_identity:
+        _session_store.set(cache_key, get_identity(jira))
 
 
-def get_cached_session(token: str) -> JIRA | None:
+def get_cached_session(token: str) -> JIRA | LdapJiraDummy | None:
     cache_key = sha256(token.encode("utf-8")).hexdigest()
     with _sessions_cache_lock:
         jira_connection = _sessions_cache.get(cache_key, None)
     return jira_connection
+
+
+def get_cached_identity(token: str) -> dict[str, Any] | None:
+    """Get the identity of a user verified by this or another worker."""
+    cache_key = sha256(token.encode("utf-8")).hexdigest()
+    return _session_store.get(cache_key)
+
+
+def clear_session_caches() -> None:
+    with _sessions_cache_lock:
+        _sessions_cache.clear()
+    _session_store.clear()
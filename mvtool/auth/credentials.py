@@ -0,0 +1,142 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import hmac
+import math
+import os
+import time
+from threading import Lock
+from typing import Any
+
+from cachetools import TTLCache
+from fastapi import HTTPException
+
+from ..config import AuthConfig
+
+
+def _hash_credentials(username: str, password: str, salt: bytes) -> bytes:
+    # Slow salted hash, so that cached entries do not reveal passwords
+    credentials = f"{username}\0{password}".encode("utf-8")
+    return hashlib.pbkdf2_hmac("sha256", credentials, salt, 10000)
+
+
+def _match_credentials(entry: tuple, username: str, password: str) -> bool:
+    salt, digest = entry[:2]
+    return hmac.compare_digest(digest, _hash_credentials(username, password, salt))
+
+
+class VerifiedCredentials:
+    """Remembers credentials verified by LDAP or JIRA and credentials which failed.
+
+    Verified credentials are kept as salted slow hashes together with the identity
+    of the user for ttl seconds, so that users are not authenticated again when
+    their session expires. Repeated failures of the same credentials are rejected
+    without asking LDAP or JIRA, for backoff seconds after the first failure, which
+    doubles with every further failure up to max_backoff seconds.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60 * 60,
+        maxsize: int = 10000,
+        backoff: float = 1,
+        max_backoff: float = 5 * 60,
+    ):
+        self._lock = Lock()
+        self.configure(ttl, maxsize, backoff, max_backoff)
+
+    def configure(
+        self, ttl: float, maxsize: int, backoff: float, max_backoff: float
+    ) -> None:
+        """Set time to live, size and backoff. Remembered credentials are dropped."""
+        with self._lock:
+            self._verified: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+            self._ttl = ttl
+            # Failures are forgotten if the credentials did not fail for a while
+            self._failed: TTLCache = TTLCache(maxsize=maxsize, ttl=2 * max_backoff)
+            self._backoff = backoff
+            self._max_backoff = max_backoff
+
+    def get_identity(self, username: str, password: str) -> dict[str, Any] | None:
+        if not self._ttl:
+            return None
+        with self._lock:
+            entry = self._verified.get(username)
+        if entry is None or not _match_credentials(entry, username, password):
+            return None
+        return entry[2]
+
+    def set_identity(
+        self, username: str, password: str, identity: dict[str, Any]
+    ) -> None:
+        salt = os.urandom(16)
+        digest = _hash_credentials(username, password, salt)
+        with self._lock:
+            self._failed.pop(username, None)
+            if self._ttl:
+                self._verified[username] = (salt, digest, identity)
+
+    def check_backoff(self, username: str, password: str) -> None:
+        """Raise an HTTPException if the credentials failed recently."""
+        with self._lock:
+            entry = self._failed.get(username)
+        if entry is None or not _match_credentials(entry, username, password):
+            return
+        retry_after = entry[3] - time.monotonic()
+        if retry_after > 0:
+            raise HTTPException(
+                429,
+                "Too many failed login attempts, please try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    def add_failure(self, username: str, password: str) -> None:
+        with self._lock:
+            entry = self._failed.get(username)
+        if entry is not None and _match_credentials(entry, username, password):
+            salt, digest, failures = entry[:3]
+        else:
+            salt = os.urandom(16)
+            digest = _hash_credentials(username, password, salt)
+            failures = 0
+        failures = min(failures + 1, 32)  # backoff reaches its maximum long before
+        backoff = min(self._backoff * 2 ** (failures - 1), self._max_backoff)
+        with self._lock:
+            self._failed[username] = (
+                salt,
+                digest,
+                failures,
+                time.monotonic() + backoff,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._verified.clear()
+            self._failed.clear()
+
+
+verified_credentials = VerifiedCredentials()
+
+
+def setup_verified_credentials(auth_config: AuthConfig) -> None:
+    verified_credentials.configure(
+        auth_config.credentials_ttl,
+        auth_config.credentials_maxsize,
+        auth_config.failed_credentials_backoff,
+        auth_config.failed_credentials_max_backoff,
+    )
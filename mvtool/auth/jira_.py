@@ -15,10 +15,102 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from functools import lru_cache
+from typing import Any, Callable, TypeVar
+
 from fastapi import HTTPException
 from jira import JIRA, JIRAError
+from requests import ConnectionError, Timeout
+from requests.adapters import HTTPAdapter
 
 from ..config import JiraConfig
+from ..utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+T = TypeVar("T")
+
+
+def is_jira_unavailable(error: Exception) -> bool:
+    """Tell whether the error means that JIRA is down, not that a request failed."""
+    return isinstance(error, JIRAError) and (error.status_code or 0) >= 500
+
+
+# Stops requesting JIRA while it is down, shared by the connections of all users
+jira_circuit_breaker = CircuitBreaker(is_failure=is_jira_unavailable)
+
+
+def setup_jira_circuit_breaker(jira_config: JiraConfig) -> None:
+    jira_circuit_breaker.configure(
+        jira_config.failure_threshold, jira_config.reset_timeout
+    )
+
+
+def call_jira(fn: Callable[[], T]) -> T:
+    """Call JIRA through the circuit breaker.
+
+    Timeouts, connection errors and calls refused by the open circuit are raised as
+    JIRAError with status code 504 or 503 to be handled like other JIRA errors.
+    """
+
+    def call() -> T:
+        try:
+            return fn()
+        except Timeout as error:
+            raise JIRAError("JIRA did not respond in time", status_code=504) from error
+        except ConnectionError as error:
+            raise JIRAError("JIRA is not reachable", status_code=503) from error
+
+    try:
+        return jira_circuit_breaker.call(call)
+    except CircuitOpenError as error:
+        raise JIRAError("JIRA is temporarily unavailable", status_code=503) from error
+
+
+class _SharedHTTPAdapter(HTTPAdapter):
+    def close(self) -> None:
+        # JIRA connections close their session when they are discarded, which
+        # must not drop the HTTP connections still used by the other ones
+        pass
+
+
+@lru_cache
+def _get_http_adapter(pool_maxsize: int) -> HTTPAdapter:
+    """Get the transport shared by all JIRA connections to reuse HTTP connections."""
+    return _SharedHTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+
+
+# Server info of JIRA, keyed by JIRA URL, to not request it for every connection
+_server_infos: dict[str, dict[str, Any]] = {}
+
+
+def _set_server_info(jira_connection: JIRA, jira_url: str) -> None:
+    """Set the server info JIRA connections created without it depend on."""
+    server_info = _server_infos.get(jira_url)
+    if server_info is None:
+        server_info = _server_infos[jira_url] = jira_connection.server_info()
+    jira_connection.deploymentType = server_info.get("deploymentType")
+    jira_connection._version = tuple(server_info.get("versionNumbers", (0, 0, 0)))
+
+
+def create_jira_connection(
+    username: str, password: str, jira_config: JiraConfig
+) -> JIRA:
+    """Create a JIRA connection using the HTTP connections shared by all users.
+
+    The server info is only requested by the first connection to JIRA.
+    """
+    jira_connection = JIRA(
+        jira_config.url,
+        dict(verify=jira_config.verify_ssl),
+        basic_auth=(username, password),
+        timeout=jira_config.timeout,
+        max_retries=jira_config.max_retries,
+        get_server_info=False,
+    )
+    jira_connection._session.mount(
+        jira_config.url, _get_http_adapter(jira_config.pool_maxsize)
+    )
+    _set_server_info(jira_connection, jira_config.url)
+    return jira_connection
 
 
 def authenticate_jira_user(
@@ -28,13 +120,11 @@ def authenticate_jira_user(
     validate_credentials: bool = False,
 ) -> JIRA:
     try:
-        jira_connection = JIRA(
-            jira_config.url,
-            dict(verify=jira_config.verify_ssl),
-            basic_auth=(username, password),
+        jira_connection = call_jira(
+            lambda: create_jira_connection(username, password, jira_config)
         )
         if validate_credentials:
-            jira_connection.myself()
+            call_jira(jira_connection.myself)
     except JIRAError as error:
         detail = None
         if error.text:
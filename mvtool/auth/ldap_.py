@@ -14,13 +14,19 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from dataclasses import dataclass
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, TypeVar
 
 import ldap
+from cachetools import TTLCache
+from fastapi import HTTPException
 from jira import JIRAError
 
 from ..config import LdapConfig
 from ..utils.errors import ClientError, UnauthorizedError
 
+T = TypeVar("T")
+
 
 @dataclass
 class LdapUserDetails:
@@ -52,6 +58,10 @@ class LdapJiraDummy:
         self._is_cloud = False
         self.__ldap_user_details = ldap_user_details
 
+    @property
+    def ldap_user_details(self) -> LdapUserDetails:
+        return self.__ldap_user_details
+
     def myself(self):
         return dict(
             accountId=self.__ldap_user_details.login,
@@ -81,63 +91,189 @@ class LdapJiraDummy:
         raise JIRAError("Issue not found", 404)
 
 
-def authenticate_ldap_user(username: str, password: str, ldap_config: LdapConfig):
-    # Connect to LDAP server
-    uri = f"{ldap_config.protocol}://{ldap_config.host}:{ldap_config.port}"
-    conn = ldap.initialize(uri)
-
-    # Handle SSL verification
-    if ldap_config.verify_ssl == False:
-        conn.set_option(ldap.OPT_X_TLS_REQUIRE_CERT, ldap.OPT_X_TLS_NEVER)
-        # Apply TLS options, see https://stackoverflow.com/a/38136255/20196429
-        conn.set_option(ldap.OPT_X_TLS_NEWCTX, 0)
-    elif isinstance(ldap_config.verify_ssl, str):
-        # The following option does not work under macOS, see
-        # https://github.com/python-ldap/python-ldap/issues/301#issuecomment-589306427
-        conn.set_option(ldap.OPT_X_TLS_CACERTFILE, ldap_config.verify_ssl)
-        conn.set_option(ldap.OPT_X_TLS_NEWCTX, 0)  # Apply TLS options, see above
-
-    # Bind account if account_dn is provided
-    if ldap_config.account_dn and ldap_config.account_password:
-        conn.simple_bind_s(ldap_config.account_dn, ldap_config.account_password)
-
-    # Search for user
-    search_filter = (
-        f"(&({ldap_config.attributes.login}={username}){ldap_config.user_filter or ''})"
-    )
-    attributes = [
-        attribute
-        for attribute in [
-            ldap_config.attributes.login,
-            ldap_config.attributes.firstname,
-            ldap_config.attributes.lastname,
-            ldap_config.attributes.email,
-        ]
-        if attribute is not None
-    ]
+class LdapConnectionPool:
+    """Bounded pool of LDAP connections bound as the service account if configured.
+
+    Connections are bound again as the service account after checking the
+    credentials of a user. Idle connections closed by the server are replaced once
+    they are used again. Distinguished names and attributes of users are cached by
+    login to not search the directory for every authentication.
+    """
 
-    try:
-        result = conn.search_s(
-            ldap_config.base_dn, ldap.SCOPE_SUBTREE, search_filter, attributes
+    def __init__(self, ldap_config: LdapConfig):
+        self.ldap_config = ldap_config
+        self._idle: list = []
+        self._lock = Lock()
+        self._slots = BoundedSemaphore(ldap_config.pool_size)
+        self._users = TTLCache(
+            maxsize=ldap_config.dn_cache_maxsize, ttl=ldap_config.dn_cache_ttl
         )
-    except ldap.LDAPError as e:
-        raise ClientError(f"Error searching the LDAP directory: {e}")
 
-    if not result:
-        raise UnauthorizedError("User not found")
+    def _connect(self):
+        ldap_config = self.ldap_config
+        uri = f"{ldap_config.protocol}://{ldap_config.host}:{ldap_config.port}"
+        conn = ldap.initialize(uri)
+
+        # Handle SSL verification
+        if ldap_config.verify_ssl == False:
+            conn.set_option(ldap.OPT_X_TLS_REQUIRE_CERT, ldap.OPT_X_TLS_NEVER)
+            # Apply TLS options, see https://stackoverflow.com/a/38136255/20196429
+            conn.set_option(ldap.OPT_X_TLS_NEWCTX, 0)
+        elif isinstance(ldap_config.verify_ssl, str):
+            # The following option does not work under macOS, see
+            # https://github.com/python-ldap/python-ldap/issues/301#issuecomment-589306427
+            conn.set_option(ldap.OPT_X_TLS_CACERTFILE, ldap_config.verify_ssl)
+            conn.set_option(ldap.OPT_X_TLS_NEWCTX, 0)  # Apply TLS options, see above
+
+        # Limit the time to connect and to wait for results of operations
+        if ldap_config.timeout is not None:
+            conn.set_option(ldap.OPT_NETWORK_TIMEOUT, ldap_config.timeout)
+            conn.timeout = ldap_config.timeout
+
+        self._bind_account(conn)
+        return conn
+
+    def _bind_account(self, conn) -> None:
+        # Bind account if account_dn is provided
+        if self.ldap_config.account_dn and self.ldap_config.account_password:
+            conn.simple_bind_s(
+                self.ldap_config.account_dn, self.ldap_config.account_password
+            )
+
+    @staticmethod
+    def _disconnect(conn) -> None:
+        try:
+            conn.unbind_s()
+        except ldap.LDAPError:
+            pass  # connection is discarded anyway
+
+    def _call(self, conn, fn: Callable[[Any], T]) -> T:
+        try:
+            result = fn(conn)
+        except BaseException:
+            self._disconnect(conn)
+            raise
+        with self._lock:
+            self._idle.append(conn)
+        return result
+
+    def call(self, fn: Callable[[Any], T]) -> T:
+        """Call fn with a connection of the pool, which is discarded if fn fails."""
+        if not self._slots.acquire(timeout=self.ldap_config.timeout):
+            raise HTTPException(503, "LDAP directory is busy")
+        try:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is not None:
+                try:
+                    return self._call(conn, fn)
+                except ldap.SERVER_DOWN:
+                    pass  # idle connection was closed, try again with a new one
+            return self._call(self._connect(), fn)
+        finally:
+            self._slots.release()
+
+    def get_cached_user(self, username: str) -> tuple[str, dict] | None:
+        with self._lock:
+            return self._users.get(username)
+
+    def search_user(self, username: str) -> tuple[str, dict] | None:
+        """Search distinguished name and attributes of a user and cache them."""
+        ldap_config = self.ldap_config
+        search_filter = f"(&({ldap_config.attributes.login}={username}){ldap_config.user_filter or ''})"
+        attributes = [
+            attribute
+            for attribute in [
+                ldap_config.attributes.login,
+                ldap_config.attributes.firstname,
+                ldap_config.attributes.lastname,
+                ldap_config.attributes.email,
+            ]
+            if attribute is not None
+        ]
+
+        try:
+            result = self.call(
+                lambda conn: conn.search_s(
+                    ldap_config.base_dn, ldap.SCOPE_SUBTREE, search_filter, attributes
+                )
+            )
+        except ldap.LDAPError as e:
+            raise ClientError(f"Error searching the LDAP directory: {e}")
+
+        with self._lock:
+            if not result:
+                self._users.pop(username, None)
+                return None
+            user = self._users[username] = result[0][0], result[0][1]
+        return user
+
+    def check_credentials(self, user_dn: str, password: str) -> bool:
+        def check(conn) -> bool:
+            # Bind as user to check credentials
+            try:
+                conn.simple_bind_s(user_dn, password)
+            except ldap.INVALID_CREDENTIALS:
+                return False
+            finally:
+                # Bind as account again or drop the user binding
+                if self.ldap_config.account_dn and self.ldap_config.account_password:
+                    self._bind_account(conn)
+                else:
+                    conn.simple_bind_s("", "")
+            return True
+
+        return self.call(check)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._users.clear()
+        for conn in idle:
+            self._disconnect(conn)
+
+
+_ldap_pool: LdapConnectionPool | None = None
+_ldap_pool_lock = Lock()
+
+
+def get_ldap_pool(ldap_config: LdapConfig) -> LdapConnectionPool:
+    global _ldap_pool
+    with _ldap_pool_lock:
+        if _ldap_pool is None or _ldap_pool.ldap_config != ldap_config:
+            if _ldap_pool is not None:
+                _ldap_pool.close()
+            _ldap_pool = LdapConnectionPool(ldap_config.model_copy(deep=True))
+        return _ldap_pool
+
+
+def close_ldap_pool() -> None:
+    global _ldap_pool
+    with _ldap_pool_lock:
+        if _ldap_pool is not None:
+            _ldap_pool.close()
+            _ldap_pool = None
+
+
+def authenticate_ldap_user(username: str, password: str, ldap_config: LdapConfig):
+    ldap_pool = get_ldap_pool(ldap_config)
 
-    # Bind as user to check credentials
-    user_dn = result[0][0]
-    try:
-        conn.simple_bind_s(user_dn, password)
-    except ldap.INVALID_CREDENTIALS:
-        raise UnauthorizedError("Invalid credentials")
+    # Search for user unless cached, or if the cached user might be outdated
+    user = ldap_pool.get_cached_user(username)
+    if user is None or not ldap_pool.check_credentials(user[0], password):
+        cached_dn = None if user is None else user[0]
+        user = ldap_pool.search_user(username)
+        if user is None:
+            raise UnauthorizedError("User not found")
+        # Binding to an unchanged DN again would count a wrong password twice
+        if user[0] == cached_dn or not ldap_pool.check_credentials(user[0], password):
+            raise UnauthorizedError("Invalid credentials")
 
     # Return user details
     decode_ = (
         lambda value: value.decode(ldap_config.attributes_encoding) if value else None
     )
-    user_info = result[0][1]
+    user_info = user[1]
     return LdapJiraDummy(
         LdapUserDetails(
             # fmt: off
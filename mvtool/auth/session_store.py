@@ -0,0 +1,136 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Iterator
+
+from cachetools import TTLCache
+
+from ..config import AuthConfig
+
+
+class SessionStore(ABC):
+    """Stores identities of verified users keyed by token hash.
+
+    Unlike the JIRA and LDAP connections cached per process, identities can be
+    shared across workers, which then restore sessions without authenticating the
+    user again.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> dict[str, Any] | None:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, identity: dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """Session store which keeps identities in the memory of the current process."""
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 5 * 60):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            return self._cache.get(key, None)
+
+    def set(self, key: str, identity: dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[key] = identity
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+class SqliteSessionStore(SessionStore):
+    """Session store which keeps identities in a SQLite file shared by all workers
+    on the same host. If the store is full, the oldest identities are evicted."""
+
+    def __init__(self, filename: str, maxsize: int = 1000, ttl: float = 5 * 60):
+        self._filename = filename
+        self._maxsize = maxsize
+        self._ttl = ttl
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(key TEXT PRIMARY KEY, identity TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_sessions_stored_at "
+                "ON sessions (stored_at)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Connections are not shared between threads, so open one per operation
+        connection = sqlite3.connect(self._filename, timeout=5, isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT identity FROM sessions WHERE key = ? AND stored_at > ?",
+                (key, time.time() - self._ttl),
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set(self, key: str, identity: dict[str, Any]) -> None:
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT OR REPLACE INTO sessions (key, identity, stored_at) "
+                "VALUES (?, ?, ?)",
+                (key, json.dumps(identity), now),
+            )
+            connection.execute(
+                "DELETE FROM sessions WHERE stored_at <= ? OR key NOT IN "
+                "(SELECT key FROM sessions ORDER BY stored_at DESC LIMIT ?)",
+                (now - self._ttl, self._maxsize),
+            )
+            connection.execute("COMMIT")
+
+    def clear(self) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM sessions")
+
+
+def create_session_store(auth_config: AuthConfig) -> SessionStore:
+    if auth_config.session_store == "sqlite":
+        return SqliteSessionStore(
+            auth_config.session_store_filename,
+            auth_config.sessions_maxsize,
+            auth_config.sessions_ttl,
+        )
+    return MemorySessionStore(auth_config.sessions_maxsize, auth_config.sessions_ttl)
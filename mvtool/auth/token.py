@@ -14,13 +14,20 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import json
+from hashlib import sha256
+from threading import Lock
 
+from cachetools import TTLCache
 from cryptography.fernet import InvalidToken
 
 from ..config import AuthConfig
 from ..utils.crypto import decrypt, encrypt
 from ..utils.errors import UnauthorizedError
 
+# Decrypted credentials, keyed by token hash, to not decrypt tokens on every request
+_credentials_cache = TTLCache(maxsize=1000, ttl=60)
+_credentials_cache_lock = Lock()
+
 
 def create_token(username: str, password: str, auth_config: AuthConfig) -> str:
     # encrypt user credentials and return token
@@ -29,8 +36,23 @@ def create_token(username: str, password: str, auth_config: AuthConfig) -> str:
 
 
 def get_credentials_from_token(token: str, auth_config: AuthConfig) -> tuple[str, str]:
+    # include the key so that tokens are decrypted again if the secret changes
+    cache_key = sha256(auth_config.derived_key + token.encode("utf-8")).hexdigest()
+    with _credentials_cache_lock:
+        credentials = _credentials_cache.get(cache_key, None)
+    if credentials is not None:
+        return credentials
+
     try:
         decrypted_token = decrypt(token, auth_config.derived_key)
     except InvalidToken as error:
         raise UnauthorizedError("Invalid token") from error
-    return json.loads(decrypted_token)
+    credentials = tuple(json.loads(decrypted_token))
+    with _credentials_cache_lock:
+        _credentials_cache[cache_key] = credentials
+    return credentials
+
+
+def clear_credentials_cache() -> None:
+    with _credentials_cache_lock:
+        _credentials_cache.clear()
@@ -18,11 +18,11 @@
 import os
 import pathlib
 import ssl
-from functools import lru_cache
-from typing import Annotated, Any
+from functools import cached_property, lru_cache
+from typing import Annotated, Any, Literal
 
 import yaml
-from pydantic import BaseModel, StringConstraints, model_validator
+from pydantic import BaseModel, Field, StringConstraints, model_validator
 from uvicorn.config import LOGGING_CONFIG, SSL_PROTOCOL_VERSION
 
 from .utils.crypto import derive_key
@@ -31,11 +31,44 @@ from .utils.crypto import derive_key
 class DatabaseConfig(BaseModel):
     url: str = "sqlite://"
     echo: bool = False
+    # Pool of connections, not used by in-memory SQLite databases which share a single
+    # connection. Up to pool_size + max_overflow connections are opened, -1 removes
+    # the limit.
+    pool_size: Annotated[int, Field(ge=0)] = 5
+    max_overflow: Annotated[int, Field(ge=-1)] = 10
+    pool_timeout: Annotated[float, Field(gt=0)] = 30  # seconds to wait for connection
+    pool_recycle: int = -1  # seconds until connections are replaced, -1 for never
+    pool_pre_ping: bool = True  # check connections before using them
+    # Statements running longer are cancelled, supported by PostgreSQL and MySQL
+    statement_timeout: Annotated[float, Field(gt=0)] | None = None  # seconds
+    # Bulk inserts send up to insertmanyvalues_page_size rows per INSERT statement
+    use_insertmanyvalues: bool = True
+    insertmanyvalues_page_size: Annotated[int, Field(ge=1)] = 1000
+    # Passed to the psycopg2 driver, e.g. "values_plus_batch", ignored by other drivers
+    executemany_mode: str | None = None
+    # Pragmas of connections to SQLite database files, WAL lets reads run concurrently
+    # to each other and to a write
+    sqlite_journal_mode: Literal["DELETE", "TRUNCATE", "PERSIST", "WAL"] = "WAL"
+    sqlite_synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    sqlite_busy_timeout: Annotated[float, Field(ge=0)] = 5  # seconds to wait for locks
+    sqlite_mmap_size: Annotated[int, Field(ge=0)] = 256 * 1024 * 1024  # bytes
+    sqlite_cache_size: int = -64 * 1024  # pages if positive, KiB if negative
 
 
 class JiraConfig(BaseModel):
     url: str
     verify_ssl: bool | str = True
+    # Requests to JIRA time out after timeout seconds and are retried max_retries times
+    timeout: Annotated[float, Field(gt=0)] | None = 10
+    max_retries: Annotated[int, Field(ge=0)] = 1
+    # Number of keep-alive connections to JIRA shared by the connections of all users
+    pool_maxsize: Annotated[int, Field(ge=1)] = 20
+    # After failure_threshold failed requests in a row, JIRA is considered down and
+    # not requested again for reset_timeout seconds
+    failure_threshold: Annotated[int, Field(ge=1)] = 5
+    reset_timeout: Annotated[float, Field(ge=0)] = 30
+    # Secret expected from JIRA webhooks, which are rejected if it is not set
+    webhook_secret: str | None = None
 
 
 class LdapAttributeConfig(BaseModel):
@@ -58,6 +91,13 @@ class LdapConfig(BaseModel):
     user_filter: str | None = None
     attributes: LdapAttributeConfig
     attributes_encoding: str = "utf-8"
+    # LDAP operations time out after timeout seconds
+    timeout: Annotated[float, Field(gt=0)] | None = 10
+    # Number of connections to LDAP shared by the authentications of all users
+    pool_size: Annotated[int, Field(ge=1)] = 10
+    # Distinguished names and attributes of users are cached by login
+    dn_cache_ttl: Annotated[float, Field(ge=0)] = 15 * 60  # seconds
+    dn_cache_maxsize: Annotated[int, Field(ge=1)] = 1000
 
     @model_validator(mode="after")
     def set_port_automatically(self) -> Any:
@@ -118,11 +158,63 @@ class UvicornConfig(BaseModel):
         return custom_logging_config
 
 
+class JobsConfig(BaseModel):
+    max_workers: Annotated[int, Field(ge=1)] = 2  # Number of jobs running in parallel
+    # Finished jobs and their files are deleted after the TTL, None keeps them
+    ttl: Annotated[float, Field(ge=0)] | None = 24 * 60 * 60  # seconds
+    # Each worker process refreshes the heartbeat and progress of its jobs every
+    # heartbeat_interval seconds. Pending and running jobs without a heartbeat for
+    # heartbeat_timeout seconds were interrupted, e.g. by a crash, and are failed.
+    heartbeat_interval: Annotated[float, Field(gt=0)] = 10  # seconds
+    heartbeat_timeout: Annotated[float, Field(gt=0)] = 60  # seconds
+
+
+class ImportsConfig(BaseModel):
+    # Number of processes validating imported rows, defaults to the number of CPUs
+    validation_workers: Annotated[int, Field(ge=1)] | None = None
+    validation_chunk_size: Annotated[int, Field(ge=1)] = 1000  # rows per process task
+
+
+class CacheConfig(BaseModel):
+    # JIRA issues are cached per user across requests, a TTL of 0 disables the cache
+    jira_issues_ttl: Annotated[float, Field(ge=0)] = 60  # seconds
+    jira_issues_maxsize: Annotated[int, Field(ge=1)] = 10000
+    # Expired JIRA issues and projects are kept for max_stale seconds to be used while
+    # JIRA is unavailable
+    jira_max_stale: Annotated[float, Field(ge=0)] = 60 * 60  # seconds
+    # JIRA projects and issue types are cached per user and refreshed in background
+    jira_projects_ttl: Annotated[float, Field(ge=0)] = 15 * 60  # seconds
+    jira_projects_refresh_after: Annotated[float, Field(ge=0)] | None = 5 * 60
+    jira_projects_maxsize: Annotated[int, Field(ge=1)] = 1000
+    # JIRA users are stored in the database and queried again after their TTL
+    jira_users_ttl: Annotated[float, Field(ge=0)] = 24 * 60 * 60  # seconds
+
+
+class JiraSnapshotsConfig(BaseModel):
+    # Read JIRA issues of measure lists from snapshots stored in the database
+    enabled: bool = False
+    max_age: Annotated[float, Field(ge=0)] = 15 * 60  # seconds until snapshots sync
+
+
 class AuthConfig(BaseModel):
     secret: str | bytes = os.urandom(32)
-
-    @property
+    # Verified users are kept for sessions_ttl seconds. The sqlite session store
+    # shares them across workers, the memory session store only within a worker.
+    session_store: Literal["memory", "sqlite"] = "memory"
+    session_store_filename: str = "sessions.sqlite"
+    sessions_ttl: Annotated[float, Field(gt=0)] = 5 * 60  # seconds
+    sessions_maxsize: Annotated[int, Field(ge=1)] = 1000
+    # Credentials verified by LDAP or JIRA are trusted for credentials_ttl seconds,
+    # a TTL of 0 disables it. Failed credentials are rejected for a backoff which
+    # doubles with every failure up to failed_credentials_max_backoff seconds.
+    credentials_ttl: Annotated[float, Field(ge=0)] = 60 * 60  # seconds
+    credentials_maxsize: Annotated[int, Field(ge=1)] = 10000
+    failed_credentials_backoff: Annotated[float, Field(gt=0)] = 1  # seconds
+    failed_credentials_max_backoff: Annotated[float, Field(gt=0)] = 5 * 60  # seconds
+
+    @cached_property
     def derived_key(self) -> bytes:
+        # Deriving the key is deliberately slow, so it is only done once
         return derive_key(self.secret)
 
 
@@ -133,6 +225,10 @@ class Config(BaseModel):
     fastapi: FastApiConfig = FastApiConfig()
     uvicorn: UvicornConfig = UvicornConfig()
     auth: AuthConfig = AuthConfig()
+    jobs: JobsConfig = JobsConfig()
+    imports: ImportsConfig = ImportsConfig()
+    cache: CacheConfig = CacheConfig()
+    jira_snapshots: JiraSnapshotsConfig = JiraSnapshotsConfig()
 
     @model_validator(mode="before")
     @classmethod
@@ -22,7 +22,13 @@ from sqlalchemy import Column, func
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import Select, select
 
-from ..db.database import delete_from_db, get_session, read_from_db
+from ..db.database import (
+    delete_from_db,
+    get_session,
+    read_from_db,
+    read_many_from_db,
+    set_changed_attrs,
+)
 from ..db.schema import Catalog, CatalogModule
 from ..models.catalog_modules import (
     CatalogModuleImport,
@@ -35,6 +41,7 @@ from ..utils.fallback import fallback
 from ..utils.filtering import filter_for_existence
 from ..utils.iteration import CachedIterable
 from .catalogs import Catalogs
+from .import_planner import preload_imports
 
 
 class CatalogModules:
@@ -142,10 +149,10 @@ class CatalogModules:
         patch: bool = False,
         skip_flush: bool = False,
     ) -> None:
-        for key, value in update.model_dump(
-            exclude_unset=patch, exclude={"id", "catalog"}
-        ).items():
-            setattr(catalog_module, key, value)
+        set_changed_attrs(
+            catalog_module,
+            update.model_dump(exclude_unset=patch, exclude={"id", "catalog"}),
+        )
 
         if not skip_flush:
             self._session.flush()
@@ -176,50 +183,53 @@ class CatalogModules:
     ) -> Iterator[CatalogModule]:
         catalog_module_imports = CachedIterable(catalog_module_imports)
 
-        # Convert catalog imports to catalogs
-        catalogs_map = self._catalogs.convert_catalog_imports(
-            (c.catalog for c in catalog_module_imports if c.catalog is not None),
-            patch=patch,
-        )
+        with preload_imports(self._session, catalog_module_imports):
+            # Convert catalog imports to catalogs
+            catalogs_map = self._catalogs.convert_catalog_imports(
+                (c.catalog for c in catalog_module_imports if c.catalog is not None),
+                patch=patch,
+            )
 
-        # Get catalog modules to be updated from database
-        ids = [c.id for c in catalog_module_imports if c.id is not None]
-        catalog_modules_to_update = {
-            c.id: c
-            for c in (
-                self.list_catalog_modules([CatalogModule.id.in_(ids)]) if ids else []
+            # Get catalog modules to be updated from database
+            ids = [c.id for c in catalog_module_imports if c.id is not None]
+            catalog_modules_to_update = read_many_from_db(
+                self._session, CatalogModule, ids
             )
-        }
-
-        # Create or update catalog modules
-        for catalog_module_import in catalog_module_imports:
-            catalog = get_from_etag_map(catalogs_map, catalog_module_import.catalog)
-
-            if catalog_module_import.id is None:
-                # Create new catalog module
-                yield self.create_catalog_module(
-                    fallback(
-                        catalog, fallback_catalog, "No fallback catalog provided."
-                    ),
-                    catalog_module_import,
-                    skip_flush=True,
-                )
-            else:
-                # Update existing catalog module
-                catalog_module = catalog_modules_to_update.get(catalog_module_import.id)
-                if catalog_module is None:
-                    raise NotFoundError(
-                        f"No catalog module with id={catalog_module_import.id}."
+
+            # Create or update catalog modules
+            for catalog_module_import in catalog_module_imports:
+                catalog = get_from_etag_map(catalogs_map, catalog_module_import.catalog)
+
+                if catalog_module_import.id is None:
+                    # Create new catalog module
+                    yield self.create_catalog_module(
+                        fallback(
+                            catalog, fallback_catalog, "No fallback catalog provided."
+                        ),
+                        catalog_module_import,
+                        skip_flush=True,
+                    )
+                else:
+                    # Update existing catalog module
+                    catalog_module = catalog_modules_to_update.get(
+                        catalog_module_import.id
+                    )
+                    if catalog_module is None:
+                        raise NotFoundError(
+                            f"No catalog module with id={catalog_module_import.id}."
+                        )
+                    self.update_catalog_module(
+                        catalog_module,
+                        catalog_module_import,
+                        patch=patch,
+                        skip_flush=True,
                     )
-                self.update_catalog_module(
-                    catalog_module, catalog_module_import, patch=patch, skip_flush=True
-                )
-                if catalog is not None:
-                    catalog_module.catalog = catalog
-                yield catalog_module
+                    if catalog is not None:
+                        set_changed_attrs(catalog_module, {"catalog": catalog})
+                    yield catalog_module
 
-        if not skip_flush:
-            self._session.flush()
+            if not skip_flush:
+                self._session.flush()
 
     def convert_catalog_module_imports(
         self,
@@ -22,7 +22,13 @@ from sqlalchemy import Column, func
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import Select, select
 
-from ..db.database import delete_from_db, get_session, read_from_db
+from ..db.database import (
+    delete_from_db,
+    get_session,
+    read_from_db,
+    read_many_from_db,
+    set_changed_attrs,
+)
 from ..db.schema import Catalog, CatalogModule, CatalogRequirement
 from ..models.catalog_requirements import (
     CatalogRequirementImport,
@@ -35,6 +41,7 @@ from ..utils.fallback import fallback
 from ..utils.filtering import filter_for_existence
 from ..utils.iteration import CachedIterable
 from .catalog_modules import CatalogModules
+from .import_planner import preload_imports
 
 
 class CatalogRequirements:
@@ -152,10 +159,10 @@ class CatalogRequirements:
         patch: bool = False,
         skip_flush: bool = False,
     ) -> None:
-        for key, value in update.model_dump(
-            exclude_unset=patch, exclude={"id", "catalog_module"}
-        ).items():
-            setattr(catalog_requirement, key, value)
+        set_changed_attrs(
+            catalog_requirement,
+            update.model_dump(exclude_unset=patch, exclude={"id", "catalog_module"}),
+        )
 
         if not skip_flush:
             self._session.flush()
@@ -186,66 +193,64 @@ class CatalogRequirements:
     ) -> Iterator[CatalogRequirement]:
         catalog_requirement_imports = CachedIterable(catalog_requirement_imports)
 
-        # Convert catalog module imports to catalog modules
-        catalog_modules_map = self._catalog_modules.convert_catalog_module_imports(
-            (
-                c.catalog_module
-                for c in catalog_requirement_imports
-                if c.catalog_module is not None
-            ),
-            fallback_catalog_module.catalog if fallback_catalog_module else None,
-            patch=patch,
-        )
-
-        # Get catalog requirements to be updated from database
-        ids = [c.id for c in catalog_requirement_imports if c.id is not None]
-        catalog_requirements_to_update = {
-            c.id: c
-            for c in (
-                self.list_catalog_requirements([CatalogRequirement.id.in_(ids)])
-                if ids
-                else []
+        with preload_imports(self._session, catalog_requirement_imports):
+            # Convert catalog module imports to catalog modules
+            catalog_modules_map = self._catalog_modules.convert_catalog_module_imports(
+                (
+                    c.catalog_module
+                    for c in catalog_requirement_imports
+                    if c.catalog_module is not None
+                ),
+                fallback_catalog_module.catalog if fallback_catalog_module else None,
+                patch=patch,
             )
-        }
 
-        # Create or update catalog requirements
-        for catalog_requirement_import in catalog_requirement_imports:
-            catalog_module = get_from_etag_map(
-                catalog_modules_map, catalog_requirement_import.catalog_module
+            # Get catalog requirements to be updated from database
+            ids = [c.id for c in catalog_requirement_imports if c.id is not None]
+            catalog_requirements_to_update = read_many_from_db(
+                self._session, CatalogRequirement, ids
             )
 
-            if catalog_requirement_import.id is None:
-                # Create new catalog requirement
-                yield self.create_catalog_requirement(
-                    fallback(
-                        catalog_module,
-                        fallback_catalog_module,
-                        "No fallback catalog module provided.",
-                    ),
-                    catalog_requirement_import,
-                    skip_flush=True,
+            # Create or update catalog requirements
+            for catalog_requirement_import in catalog_requirement_imports:
+                catalog_module = get_from_etag_map(
+                    catalog_modules_map, catalog_requirement_import.catalog_module
                 )
-            else:
-                # Update existing catalog requirement
-                catalog_requirement = catalog_requirements_to_update.get(
-                    catalog_requirement_import.id
-                )
-                if catalog_requirement is None:
-                    raise NotFoundError(
-                        f"No catalog requirement with id={catalog_requirement_import.id}."
+
+                if catalog_requirement_import.id is None:
+                    # Create new catalog requirement
+                    yield self.create_catalog_requirement(
+                        fallback(
+                            catalog_module,
+                            fallback_catalog_module,
+                            "No fallback catalog module provided.",
+                        ),
+                        catalog_requirement_import,
+                        skip_flush=True,
                     )
-                self.update_catalog_requirement(
-                    catalog_requirement,
-                    catalog_requirement_import,
-                    patch,
-                    skip_flush=True,
-                )
-                if catalog_module is not None:
-                    catalog_requirement.catalog_module = catalog_module
-                yield catalog_requirement
+                else:
+                    # Update existing catalog requirement
+                    catalog_requirement = catalog_requirements_to_update.get(
+                        catalog_requirement_import.id
+                    )
+                    if catalog_requirement is None:
+                        raise NotFoundError(
+                            f"No catalog requirement with id={catalog_requirement_import.id}."
+                        )
+                    self.update_catalog_requirement(
+                        catalog_requirement,
+                        catalog_requirement_import,
+                        patch,
+                        skip_flush=True,
+                    )
+                    if catalog_module is not None:
+                        set_changed_attrs(
+                            catalog_requirement, {"catalog_module": catalog_module}
+                        )
+                    yield catalog_requirement
 
-        if not skip_flush:
-            self._session.flush()
+            if not skip_flush:
+                self._session.flush()
 
     def convert_catalog_requirement_imports(
         self,
@@ -23,7 +23,13 @@ from sqlalchemy.orm import Session
 from sqlalchemy.sql import Select, select
 
 from ..auth import get_jira
-from ..db.database import delete_from_db, get_session, read_from_db
+from ..db.database import (
+    delete_from_db,
+    get_session,
+    read_from_db,
+    read_many_from_db,
+    set_changed_attrs,
+)
 from ..db.schema import Catalog
 from ..models.catalogs import CatalogImport, CatalogInput, CatalogPatch
 from ..utils.errors import NotFoundError
@@ -129,10 +135,10 @@ class Catalogs:
         skip_flush: bool = False,
     ) -> None:
         """Update a catalog with the values from a given update object."""
-        for key, value in update.model_dump(
-            exclude_unset=patch, exclude={"id"}
-        ).items():
-            setattr(catalog, key, value)
+        set_changed_attrs(
+            catalog,
+            update.model_dump(exclude_unset=patch, exclude={"id"}),
+        )
         if not skip_flush:
             self._session.flush()
 
@@ -175,9 +181,7 @@ class Catalogs:
 
         # Get catalogs to be updated from the database
         ids = [c.id for c in catalog_imports if c.id is not None]
-        catalogs_to_update = {
-            c.id: c for c in (self.list_catalogs([Catalog.id.in_(ids)]) if ids else [])
-        }
+        catalogs_to_update = read_many_from_db(self._session, Catalog, ids)
 
         # Update catalogs
         for catalog_import in catalog_imports:
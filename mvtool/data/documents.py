@@ -23,7 +23,13 @@ from sqlalchemy import Column, func
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import Select, select
 
-from ..db.database import delete_from_db, get_session, read_from_db
+from ..db.database import (
+    delete_from_db,
+    get_session,
+    read_from_db,
+    read_many_from_db,
+    set_changed_attrs,
+)
 from ..db.schema import Document, Project
 from ..models.documents import DocumentImport, DocumentInput, DocumentPatch
 from ..utils.errors import NotFoundError
@@ -31,6 +37,7 @@ from ..utils.etag_map import get_from_etag_map
 from ..utils.fallback import fallback
 from ..utils.filtering import filter_for_existence
 from ..utils.iteration import CachedIterable
+from .import_planner import preload_imports
 from .projects import Projects
 
 
@@ -85,6 +92,7 @@ class Documents:
 
         # set jira project on the project related to each document
         if query_jira:
+            self._projects._cache_jira_projects(d.project for d in documents)
             for document in documents:
                 self._set_jira_project(document)
 
@@ -155,10 +163,10 @@ class Documents:
         patch: bool = False,
         skip_flush: bool = False,
     ) -> None:
-        for key, value in update.model_dump(
-            exclude_unset=patch, exclude={"id", "project"}
-        ).items():
-            setattr(document, key, value)
+        set_changed_attrs(
+            document,
+            update.model_dump(exclude_unset=patch, exclude={"id", "project"}),
+        )
 
         if not skip_flush:
             self._session.flush()
@@ -183,60 +191,66 @@ class Documents:
     ) -> Iterator[Document]:
         document_imports = CachedIterable(document_imports)
 
-        # Convert project imports to projects
-        projects_map = self._projects.convert_project_imports(
-            (d.project for d in document_imports if d.project is not None), patch=patch
-        )
-
-        # Get documents to be updated from database
-        ids = [d.id for d in document_imports if d.id is not None]
-        documents_to_update = {
-            d.id: d
-            for d in (self.list_documents([Document.id.in_(ids)]) if ids else [])
-        }
-
-        # Create or update documents
-        for document_import in document_imports:
-            project = get_from_etag_map(projects_map, document_import.project)
-
-            if document_import.id is None:
-                # Create new document
-                yield self.create_document(
-                    fallback(
-                        project, fallback_project, "No fallback project provided."
-                    ),
-                    document_import,
-                    skip_flush=True,
-                )
-            else:
-                # Update existing document
-                document = documents_to_update.get(document_import.id)
-                if document is None:
-                    raise NotFoundError(f"No document with id={document_import.id}.")
-                self.update_document(
-                    document, document_import, patch=patch, skip_flush=True
-                )
-                if project is not None:
-                    document.project = project
-                yield document
-
-        if not skip_flush:
-            self._session.flush()
+        with preload_imports(self._session, document_imports):
+            # Convert project imports to projects
+            projects_map = self._projects.convert_project_imports(
+                (d.project for d in document_imports if d.project is not None),
+                patch=patch,
+            )
+
+            # Get documents to be updated from database
+            ids = [d.id for d in document_imports if d.id is not None]
+            documents_to_update = read_many_from_db(self._session, Document, ids)
+
+            # Create or update documents
+            for document_import in document_imports:
+                project = get_from_etag_map(projects_map, document_import.project)
+
+                if document_import.id is None:
+                    # Create new document
+                    yield self.create_document(
+                        fallback(
+                            project, fallback_project, "No fallback project provided."
+                        ),
+                        document_import,
+                        skip_flush=True,
+                    )
+                else:
+                    # Update existing document
+                    document = documents_to_update.get(document_import.id)
+                    if document is None:
+                        raise NotFoundError(
+                            f"No document with id={document_import.id}."
+                        )
+                    self.update_document(
+                        document, document_import, patch=patch, skip_flush=True
+                    )
+                    if project is not None:
+                        set_changed_attrs(document, {"project": project})
+                    self._set_jira_project(document)
+                    yield document
+
+            if not skip_flush:
+                self._session.flush()
 
     def convert_document_imports(
         self,
         document_imports: Iterable[DocumentImport],
         fallback_project: Project | None = None,
         patch: bool = False,
+        documents_map: dict[str, Document] | None = None,
     ) -> dict[str, Document]:
-        # Map document imports to their etags
-        documents_map = {d.etag: d for d in document_imports}
+        # Map document imports to their etags, skip imports converted before
+        documents_map = {} if documents_map is None else documents_map
+        imports_map = {
+            d.etag: d for d in document_imports if d.etag not in documents_map
+        }
 
         # Map created and updated documents to the etag of their imports
         for etag, document in zip(
-            documents_map.keys(),
+            imports_map.keys(),
             self.bulk_create_update_documents(
-                documents_map.values(),
+                imports_map.values(),
                 fallback_project,
                 patch=patch,
                 skip_flush=True,
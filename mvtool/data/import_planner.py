@@ -0,0 +1,175 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Collection, Iterable, Iterator
+
+from sqlalchemy.orm import Session
+
+from ..db.database import read_many_from_db
+from ..db.schema import (
+    Base,
+    Catalog,
+    CatalogModule,
+    CatalogRequirement,
+    Document,
+    Measure,
+    Project,
+    Requirement,
+)
+from ..models.catalog_modules import CatalogModuleImport
+from ..models.catalog_requirements import CatalogRequirementImport
+from ..models.catalogs import CatalogImport
+from ..models.common import ETagMixin
+from ..models.documents import DocumentImport
+from ..models.measures import MeasureImport
+from ..models.projects import ProjectImport
+from ..models.requirements import RequirementImport
+
+# Import models, the table they refer to and their fields holding nested imports
+_IMPORT_REFERENCES: dict[type[ETagMixin], tuple[type[Base], tuple[str, ...]]] = {
+    MeasureImport: (Measure, ("requirement", "document")),
+    RequirementImport: (Requirement, ("project", "catalog_requirement")),
+    DocumentImport: (Document, ("project",)),
+    ProjectImport: (Project, ()),
+    CatalogRequirementImport: (CatalogRequirement, ("catalog_module",)),
+    CatalogModuleImport: (CatalogModule, ("catalog",)),
+    CatalogImport: (Catalog, ()),
+}
+
+# Fields of import models that must refer to an item when creating a new item
+_REQUIRED_FIELDS: dict[type[ETagMixin], str] = {
+    MeasureImport: "requirement",
+    RequirementImport: "project",
+    DocumentImport: "project",
+    CatalogRequirementImport: "catalog_module",
+    CatalogModuleImport: "catalog",
+}
+
+# Tables in the order they are loaded and the foreign keys by which their rows
+# reference rows of tables loaded later on
+_LOAD_ORDER: tuple[tuple[type[Base], tuple[tuple[str, type[Base]], ...]], ...] = (
+    (Measure, (("requirement_id", Requirement), ("document_id", Document))),
+    (
+        Requirement,
+        (("project_id", Project), ("catalog_requirement_id", CatalogRequirement)),
+    ),
+    (Document, (("project_id", Project),)),
+    (Project, ()),
+    (CatalogRequirement, (("catalog_module_id", CatalogModule),)),
+    (CatalogModule, (("catalog_id", Catalog),)),
+    (Catalog, ()),
+)
+
+
+class ImportPlanner:
+    """Loads the items referenced by nested imports with one query per table.
+
+    The ids of all imports are collected across all nesting levels first. Then each
+    table is loaded once, without eagerly loading relationships and without
+    querying Jira, and the loaded items are kept in the identity map of the
+    session. Rows referenced by the loaded items are loaded along with them, so
+    that resolving the imports afterwards does not require any further queries.
+    """
+
+    def __init__(self, session: Session):
+        self._session = session
+        self._ids: dict[type[Base], set[int]] = defaultdict(set)
+        self._loaded_ids: dict[type[Base], set[int]] = defaultdict(set)
+
+    def add_imports(self, imports: Iterable[ETagMixin | None]) -> "ImportPlanner":
+        stack = list(imports)
+        while stack:
+            import_ = stack.pop()
+            if import_ is None:
+                continue
+            orm_class, nested_fields = _IMPORT_REFERENCES[type(import_)]
+            if import_.id is not None:
+                self._ids[orm_class].add(import_.id)
+            stack.extend(getattr(import_, field) for field in nested_fields)
+        return self
+
+    def load(self) -> list[Base]:
+        """Load the items of all collected ids and the rows they reference.
+
+        The session only holds weak references to its items, so the returned list
+        must be kept as long as the loaded items are to be resolved from it.
+        """
+        loaded_items = []
+        for orm_class, foreign_keys in _LOAD_ORDER:
+            ids = self._ids.pop(orm_class, None)
+            if not ids:
+                continue
+            items = read_many_from_db(self._session, orm_class, ids).values()
+            loaded_items.extend(items)
+            self._loaded_ids[orm_class].update(item.id for item in items)
+            for item in items:
+                for foreign_key, referenced_class in foreign_keys:
+                    referenced_id = getattr(item, foreign_key)
+                    if referenced_id is not None:
+                        self._ids[referenced_class].add(referenced_id)
+        return loaded_items
+
+    def check_references(
+        self, import_: ETagMixin | None, fallbacks: Collection[str] = ()
+    ) -> list[str]:
+        """Check the references of a loaded import without creating or updating items.
+
+        Args:
+            import_ (ETagMixin | None): The import to be checked with its nested
+                imports.
+            fallbacks (Collection[str], optional): The names of the fields for which
+                a fallback item is provided, e.g. "project". Defaults to ().
+
+        Returns:
+            list[str]: Messages for ids that do not exist and for missing items that
+                are required to create new items.
+        """
+        messages = []
+        stack = [import_]
+        while stack:
+            import_ = stack.pop()
+            if import_ is None:
+                continue
+            orm_class, nested_fields = _IMPORT_REFERENCES[type(import_)]
+            item_name = orm_class.__tablename__.replace("_", " ")
+            if import_.id is not None:
+                if import_.id not in self._loaded_ids[orm_class]:
+                    messages.append(f"No {item_name} with id={import_.id}.")
+            else:
+                required_field = _REQUIRED_FIELDS.get(type(import_))
+                if (
+                    required_field is not None
+                    and getattr(import_, required_field) is None
+                    and required_field not in fallbacks
+                ):
+                    label = required_field.replace("_", " ")
+                    messages.append(f"No fallback {label} provided.")
+            stack.extend(getattr(import_, field) for field in reversed(nested_fields))
+        return list(dict.fromkeys(messages))
+
+
+@contextmanager
+def preload_imports(
+    session: Session, imports: Iterable[ETagMixin | None]
+) -> Iterator[None]:
+    """Load the items referenced by the imports of all nesting levels with one query
+    per table and keep them in the session until the context is left."""
+    preloaded_items = ImportPlanner(session).add_imports(imports).load()
+    yield
+    del preloaded_items
@@ -15,14 +15,17 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Annotated, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from typing import Annotated, Any, Callable, Iterable, Iterator, TypeVar
 
 from fastapi import Depends
 from jira import JIRA, JIRAError
 from jira.resources import Issue, IssueType, Project, Resource, Status, User
 from pydantic import Field
 
-from ..auth import get_jira
+from ..auth import call_jira, get_jira, is_jira_unavailable
+from ..config import CacheConfig
 from ..models import (
     JiraIssue,
     JiraIssueInput,
@@ -31,11 +34,145 @@ from ..models import (
     JiraProject,
     JiraUser,
 )
+from ..utils.cache import CacheStats, SharedCache, SingleFlight
+from .jira_async import AsyncJiraClient
+
+V = TypeVar("V")
+
+# JIRA issues cached across requests, keyed by cache scope and JIRA issue ID
+_shared_jira_issues_cache: SharedCache[tuple, JiraIssue] = SharedCache()
+
+# Whether the user has access to a JIRA issue, keyed by cache scope and JIRA issue ID
+_shared_jira_issue_access_cache: SharedCache[tuple, bool] = SharedCache()
+
+# JIRA projects keyed by cache scope and JIRA issue types keyed by cache scope and
+# JIRA project ID, both cached across requests
+_shared_jira_projects_cache: SharedCache[tuple, list[JiraProject]] = SharedCache()
+_shared_jira_issue_types_cache: SharedCache[tuple, list[JiraIssueType]] = SharedCache()
+
+# Reading JIRA requests in flight, keyed by cache scope, operation and arguments
+_jira_requests_in_flight: SingleFlight[tuple, Any] = SingleFlight()
+
+
+def setup_jira_caches(cache_config: CacheConfig) -> None:
+    for cache in (_shared_jira_issues_cache, _shared_jira_issue_access_cache):
+        cache.configure(
+            cache_config.jira_issues_maxsize,
+            cache_config.jira_issues_ttl,
+            max_stale=cache_config.jira_max_stale,
+        )
+    for cache in (_shared_jira_projects_cache, _shared_jira_issue_types_cache):
+        cache.configure(
+            cache_config.jira_projects_maxsize,
+            cache_config.jira_projects_ttl,
+            cache_config.jira_projects_refresh_after,
+            cache_config.jira_max_stale,
+        )
+
+
+def evict_jira_issue(jira_issue_id: str) -> None:
+    """Removes JIRA issue for all users from the cache shared across requests."""
+    _shared_jira_issues_cache.delete_where(lambda key: key[1] == jira_issue_id)
+    _shared_jira_issue_access_cache.delete_where(lambda key: key[1] == jira_issue_id)
+
+
+def get_jira_cache_stats() -> dict[str, CacheStats]:
+    return {
+        "issues": _shared_jira_issues_cache.stats,
+        "issue_access": _shared_jira_issue_access_cache.stats,
+        "projects": _shared_jira_projects_cache.stats,
+        "issue_types": _shared_jira_issue_types_cache.stats,
+    }
+
+
+def get_jira_requests_in_flight() -> int:
+    return _jira_requests_in_flight.in_flight
+
+
+def clear_jira_caches() -> None:
+    _shared_jira_issues_cache.clear()
+    _shared_jira_issue_access_cache.clear()
+    _shared_jira_projects_cache.clear()
+    _shared_jira_issue_types_cache.clear()
 
 
 class JiraBase:
+    # Maximum number of concurrent requests when getting multiple JIRA items
+    MAX_CONCURRENT_REQUESTS = 8
+
     def __init__(self, jira: JIRA = Depends(get_jira)):
         self.jira = jira
+        # Set if JIRA was unavailable and outdated or no JIRA data was used instead
+        self.jira_unavailable = False
+
+    @property
+    def _cache_scope(self) -> tuple:
+        """Identifies the JIRA server and user to scope data cached across requests.
+
+        If the user cannot be determined, the scope is limited to the connection.
+        """
+        auth = getattr(getattr(self.jira, "_session", None), "auth", None)
+        user = auth[0] if isinstance(auth, tuple) else id(self.jira)
+        return (self.jira.server_url, user)
+
+    def _call_jira(self, operation: str, *args, **kwargs) -> Any:
+        """Call a reading operation of the JIRA connection.
+
+        Identical calls of the same user running concurrently share one request to
+        JIRA and its result, which must therefore not be modified.
+        """
+        key = (self._cache_scope, operation, args, tuple(sorted(kwargs.items())))
+        return _jira_requests_in_flight.do(
+            key,
+            lambda: call_jira(lambda: getattr(self.jira, operation)(*args, **kwargs)),
+        )
+
+    def _get_or_load_shared(
+        self, cache: SharedCache[tuple, V], key: tuple, load: Callable[[], V]
+    ) -> V:
+        """Get data cached across requests or load it. If JIRA is unavailable,
+        expired data is used if it is still cached."""
+        try:
+            return cache.get_or_load(key, load)
+        except JIRAError as error:
+            value = cache.get_stale(key)
+            if not is_jira_unavailable(error) or value is None:
+                raise error
+            self.jira_unavailable = True
+            return value
+
+    def _get_many(
+        self,
+        item_ids: list[str],
+        to_request: Callable[[str], tuple[str, dict[str, Any] | None]],
+        get: Callable[[str], Any],
+    ) -> list[Any | None]:
+        """Get multiple JIRA items by their IDs concurrently.
+
+        Args:
+            item_ids (list[str]): The IDs of the items.
+            to_request (Callable): Maps an ID to the REST API path and query params.
+            get (Callable): Gets an item by its ID through the JIRA connection. Used
+                one at a time if the connection cannot be used for concurrent requests.
+
+        Returns:
+            list[Any | None]: The items in the order of the IDs, None if not found.
+        """
+        client = AsyncJiraClient.from_jira(self.jira, self.MAX_CONCURRENT_REQUESTS)
+        if client is not None:
+            return call_jira(
+                lambda: client.get_many([to_request(item_id) for item_id in item_ids])
+            )
+
+        items = []
+        for item_id in item_ids:
+            try:
+                items.append(call_jira(lambda: get(item_id)))
+            except JIRAError as error:
+                if error.status_code != 404:
+                    raise error
+                items.append(None)
+        return items
 
     def _get_jira_item_url(self, item_key: str) -> str:
         """Generates URL for JIRA project or issue."""
@@ -52,7 +189,14 @@ class JiraBase:
             email_address=data["emailAddress"],
         )
 
-    def _to_jira_project_model(self, data: Project) -> JiraProject:
+    def _to_jira_project_model(self, data: dict | Project) -> JiraProject:
+        if isinstance(data, dict):
+            return JiraProject(
+                id=data["id"],
+                name=data["name"],
+                key=data["key"],
+                url=self._get_jira_item_url(data["key"]),
+            )
         return JiraProject(
             id=data.id,
             name=data.name,
@@ -127,7 +271,8 @@ class JiraUsers(JiraBase):
         offset: int | None = None,
         limit: int | None = None,
     ) -> Iterator[JiraUser]:
-        jira_users_data = self.jira.search_assignable_users_for_issues(
+        jira_users_data = self._call_jira(
+            "search_assignable_users_for_issues",
             project=jira_project_key,  # use JIRA project key to be compatible with JIRA server
             startAt=offset or 0,
             maxResults=limit or 0,
@@ -136,16 +281,26 @@ class JiraUsers(JiraBase):
         )
 
         for jira_user_data in jira_users_data:
-            # TODO: add caching for JIRA users
             yield self._to_jira_user_model(jira_user_data.raw)
 
     def get_jira_user(self, jira_user_id: str | None = None) -> JiraUser:
         if jira_user_id is not None:
-            jira_user_data = self.jira.user(jira_user_id)
+            jira_user_data = self._call_jira("user", jira_user_id)
         else:
-            jira_user_data = self.jira.myself()
+            jira_user_data = self._call_jira("myself")
         return self._to_jira_user_model(jira_user_data)
 
+    def get_jira_users(self, jira_user_ids: list[str]) -> list[JiraUser]:
+        """Get JIRA users by their IDs concurrently. Users not found are left out."""
+        # JIRA user id is either "username" or "accountId" on JIRA server or cloud
+        query_param = "accountId" if self.jira._is_cloud else "username"
+        jira_users_data = self._get_many(
+            jira_user_ids,
+            lambda jira_user_id: ("user", {query_param: jira_user_id}),
+            self.jira.user,
+        )
+        return [self._to_jira_user_model(d) for d in jira_users_data if d is not None]
+
 
 class JiraProjects(JiraBase):
     def __init__(self, jira: JIRA = Depends(get_jira)):
@@ -162,6 +317,14 @@ class JiraProjects(JiraBase):
         try:
             return self._jira_projects_cache[jira_project_id]
         except KeyError:
+            # Look up the JIRA project in the JIRA projects cached across requests
+            for jira_project in (
+                _shared_jira_projects_cache.get(self._cache_scope) or []
+            ):
+                if jira_project.id == jira_project_id:
+                    self._cache_jira_project(jira_project)
+                    return jira_project
+
             if try_to_get:
                 jira_project = self.try_to_get_jira_project(jira_project_id)
                 self._jira_projects_cache[jira_project_id] = jira_project
@@ -169,14 +332,61 @@ class JiraProjects(JiraBase):
             else:
                 return None
 
+    def cache_jira_projects(self, jira_project_ids: Iterable[str]) -> None:
+        """Get the JIRA projects with the given IDs concurrently and cache them.
+
+        JIRA projects which are already cached are not queried again. JIRA projects
+        which are not found are cached as None.
+        """
+        missing_ids = [
+            jira_project_id
+            for jira_project_id in dict.fromkeys(jira_project_ids)
+            if jira_project_id not in self._jira_projects_cache
+            and self.lookup_jira_project(jira_project_id, try_to_get=False) is None
+        ]
+        try:
+            jira_projects_data = self._get_many(
+                missing_ids,
+                lambda jira_project_id: (f"project/{jira_project_id}", None),
+                self.jira.project,
+            )
+        except JIRAError as error:
+            if not is_jira_unavailable(error):
+                raise error
+            # Use expired JIRA projects while JIRA is unavailable, None otherwise
+            self.jira_unavailable = True
+            stale_jira_projects = {
+                jira_project.id: jira_project
+                for jira_project in (
+                    _shared_jira_projects_cache.get_stale(self._cache_scope) or []
+                )
+            }
+            for jira_project_id in missing_ids:
+                self._jira_projects_cache[jira_project_id] = stale_jira_projects.get(
+                    jira_project_id
+                )
+            return
+
+        for jira_project_id, data in zip(missing_ids, jira_projects_data):
+            if data is not None:
+                self._cache_jira_project(self._to_jira_project_model(data))
+            else:
+                self._jira_projects_cache[jira_project_id] = None
+
+    def _load_jira_projects(self) -> list[JiraProject]:
+        return [self._to_jira_project_model(p) for p in self._call_jira("projects")]
+
     def list_jira_projects(self) -> Iterator[JiraProject]:
-        for jira_project_data in self.jira.projects():
-            jira_project = self._to_jira_project_model(jira_project_data)
+        for jira_project in self._get_or_load_shared(
+            _shared_jira_projects_cache, self._cache_scope, self._load_jira_projects
+        ):
             self._cache_jira_project(jira_project)
             yield jira_project
 
     def get_jira_project(self, jira_project_id: str) -> JiraProject:
-        jira_project = self._to_jira_project_model(self.jira.project(jira_project_id))
+        jira_project = self._to_jira_project_model(
+            self._call_jira("project", jira_project_id)
+        )
         self._cache_jira_project(jira_project)
         return jira_project
 
@@ -200,24 +410,55 @@ class JiraProjects(JiraBase):
 
 
 class JiraIssueTypes(JiraBase):
-    def list_jira_issue_types(self, jira_project_id: str):
-        for issue_type_data in self.jira.project(jira_project_id).issueTypes:
-            yield self._to_jira_issue_type_model(issue_type_data)
+    def _load_jira_issue_types(self, jira_project_id: str) -> list[JiraIssueType]:
+        return [
+            self._to_jira_issue_type_model(issue_type_data)
+            for issue_type_data in self._call_jira(
+                "project", jira_project_id
+            ).issueTypes
+        ]
+
+    def list_jira_issue_types(self, jira_project_id: str) -> Iterator[JiraIssueType]:
+        yield from self._get_or_load_shared(
+            _shared_jira_issue_types_cache,
+            (self._cache_scope, jira_project_id),
+            lambda: self._load_jira_issue_types(jira_project_id),
+        )
 
 
 class JiraIssues(JiraBase):
+    # Fields of JIRA issues used by _to_jira_issue_model
+    JIRA_ISSUE_FIELDS = "summary,description,assignee,issuetype,project,status"
+
+    # Number of JIRA issue IDs per JQL query and number of concurrent queries
+    CHUNK_SIZE = 100
+    MAX_WORKERS = 4
+
     def __init__(self, jira: JIRA = Depends(get_jira)):
         super().__init__(jira)
         self._jira_issues_cache = {}
 
-    def _cache_jira_issue(self, jira_issue: JiraIssue) -> None:
+    def _cache_jira_issue(self, jira_issue: JiraIssue, share: bool = True) -> None:
         self._jira_issues_cache[jira_issue.id] = jira_issue
+        if share:
+            _shared_jira_issues_cache.set(
+                (self._cache_scope, jira_issue.id), jira_issue
+            )
+
+    def _lookup_shared_jira_issue(self, jira_issue_id: str) -> JiraIssue | None:
+        jira_issue = _shared_jira_issues_cache.get((self._cache_scope, jira_issue_id))
+        if jira_issue is not None:
+            self._jira_issues_cache[jira_issue_id] = jira_issue
+        return jira_issue
 
     def uncache_jira_issue(self, jira_issue_id: str) -> None:
+        """Removes JIRA issue from the cache of this request and, for all users,
+        from the cache shared across requests."""
         try:
             del self._jira_issues_cache[jira_issue_id]
         except KeyError:
             pass
+        evict_jira_issue(jira_issue_id)
 
     def lookup_jira_issue(
         self, jira_issue_id: str | None, try_to_get: bool = False
@@ -226,7 +467,10 @@ class JiraIssues(JiraBase):
         try:
             return self._jira_issues_cache[jira_issue_id]
         except KeyError:
-            if try_to_get:
+            jira_issue = self._lookup_shared_jira_issue(jira_issue_id)
+            if jira_issue is not None:
+                return jira_issue
+            elif try_to_get:
                 jira_issue = self.try_to_get_jira_issue(jira_issue_id)
                 self._jira_issues_cache[jira_issue_id] = jira_issue
                 return jira_issue
@@ -239,20 +483,29 @@ class JiraIssues(JiraBase):
         offset: int | None = None,
         limit: int | None = None,
     ) -> Iterator[JiraIssue]:
-        jira_issues_data = self.jira.search_issues(
+        for jira_issue_data in self._search_jira_issues(jql_str, offset, limit):
+            jira_issue = self._to_jira_issue_model(jira_issue_data)
+            self._cache_jira_issue(jira_issue)
+            yield jira_issue
+
+    def _search_jira_issues(
+        self,
+        jql_str: str | None = None,
+        offset: int | None = None,
+        limit: int | None = None,
+    ) -> list[Issue]:
+        return self._call_jira(
+            "search_issues",
             jql_str or "",
             startAt=offset or 0,
             maxResults=limit or 0,
             validate_query=False,  # Turn off validation of JQL queries
+            fields=self.JIRA_ISSUE_FIELDS,  # Query only the fields which are used
         )
 
-        for jira_issue_data in jira_issues_data:
-            jira_issue = self._to_jira_issue_model(jira_issue_data)
-            self._cache_jira_issue(jira_issue)
-            yield jira_issue
-
     def count_jira_issues(self, jql_str: str | None = None) -> int:
-        return self.jira.search_issues(
+        return self._call_jira(
+            "search_issues",
             jql_str or "",
             maxResults=1,  # Query only one issue to get the total count, 0 queries all
             validate_query=False,
@@ -261,29 +514,30 @@ class JiraIssues(JiraBase):
     def create_jira_issue(
         self, jira_project_id: str, jira_issue_input: JiraIssueInput
     ) -> JiraIssue:
+        jira_issue_data = self._from_jira_issue_input(jira_issue_input, jira_project_id)
         jira_issue = self._to_jira_issue_model(
-            self.jira.create_issue(
-                self._from_jira_issue_input(jira_issue_input, jira_project_id)
-            )
+            call_jira(lambda: self.jira.create_issue(jira_issue_data))
         )
         self._cache_jira_issue(jira_issue)
         return jira_issue
 
     def get_jira_issue(self, jira_issue_id: str):
-        jira_issue = self._to_jira_issue_model(self.jira.issue(jira_issue_id))
+        jira_issue = self._to_jira_issue_model(self._call_jira("issue", jira_issue_id))
         self._cache_jira_issue(jira_issue)
         return jira_issue
 
     def update_jira_issue(self, jira_issue_id: str, jira_issue_input: JiraIssueInput):
-        jira_issue_data = self.jira.issue(jira_issue_id)
-        jira_issue_data.update(**self._from_jira_issue_input(jira_issue_input))
+        jira_issue_data = call_jira(lambda: self.jira.issue(jira_issue_id))
+        update_data = self._from_jira_issue_input(jira_issue_input)
+        call_jira(lambda: jira_issue_data.update(**update_data))
+        self.uncache_jira_issue(jira_issue_id)
         jira_issue = self._to_jira_issue_model(jira_issue_data)
         self._cache_jira_issue(jira_issue)
         return jira_issue
 
     def delete_jira_issue(self, jira_issue_id: str):
-        jira_issue_data = self.jira.issue(jira_issue_id)
-        jira_issue_data.delete()
+        jira_issue_data = call_jira(lambda: self.jira.issue(jira_issue_id))
+        call_jira(jira_issue_data.delete)
         self.uncache_jira_issue(jira_issue_id)
 
     def get_jira_issues(
@@ -291,9 +545,141 @@ class JiraIssues(JiraBase):
         jira_issue_ids: tuple[str],
         offset: Annotated[int, Field(ge=0)] = 0,
         size: Annotated[int, Field(ge=0)] | None = None,
+        use_shared_cache: bool = True,
     ) -> Iterator[JiraIssue]:
-        jql_str = " OR ".join(f"id = {id}" for id in jira_issue_ids)
-        return self.list_jira_issues(jql_str, offset, size) if jql_str else []
+        """Gets JIRA issues by their IDs or keys.
+
+        JIRA issues cached across requests are not queried again, unless
+        use_shared_cache is False. The others are queried in chunks to keep the JQL
+        queries short. If there are multiple chunks, they are queried concurrently.
+        The JIRA issues are returned in the requested order, a size of 0 or None
+        returns all of them.
+        """
+        requested_ids = list(dict.fromkeys(jira_issue_ids))  # remove duplicates
+        jira_issues_map: dict[str, JiraIssue] = {}
+        missing_ids = []
+        for jira_issue_id in requested_ids:
+            jira_issue = (
+                self._lookup_shared_jira_issue(jira_issue_id)
+                if use_shared_cache
+                else None
+            )
+            if jira_issue is not None:
+                jira_issues_map[jira_issue_id] = jira_issue
+            else:
+                missing_ids.append(jira_issue_id)
+
+        try:
+            jira_issues_data = self._search_by_ids(
+                missing_ids, self._search_jira_issues
+            )
+        except JIRAError as error:
+            if not is_jira_unavailable(error):
+                raise error
+            # Use expired JIRA issues while JIRA is unavailable, leave out the others
+            self.jira_unavailable = True
+            for jira_issue_id in missing_ids:
+                jira_issue = _shared_jira_issues_cache.get_stale(
+                    (self._cache_scope, jira_issue_id)
+                )
+                if jira_issue is not None:
+                    self._jira_issues_cache[jira_issue_id] = jira_issue
+                    jira_issues_map[jira_issue_id] = jira_issue
+        else:
+            for jira_issue_data in jira_issues_data:
+                jira_issue = self._to_jira_issue_model(jira_issue_data)
+                self._cache_jira_issue(jira_issue)
+                # JIRA issues may have been requested by their ID or key
+                jira_issues_map[jira_issue.id] = jira_issue
+                jira_issues_map[jira_issue.key] = jira_issue
+
+        # Restore the requested order, an issue requested by ID and key is kept once
+        jira_issues = {
+            jira_issues_map[i].id: jira_issues_map[i]
+            for i in requested_ids
+            if i in jira_issues_map
+        }
+        stop = offset + size if size else None
+        yield from islice(jira_issues.values(), offset, stop)
+
+    def _search_by_ids(
+        self, jira_issue_ids: list[str], search: Callable[[str], list[Issue]]
+    ) -> list[Issue]:
+        """Search JIRA issues by their IDs in chunks to keep the JQL queries short.
+        If there are multiple chunks, they are queried concurrently."""
+        jql_strs = [
+            f"id in ({', '.join(jira_issue_ids[i : i + self.CHUNK_SIZE])})"
+            for i in range(0, len(jira_issue_ids), self.CHUNK_SIZE)
+        ]
+        if len(jql_strs) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(self.MAX_WORKERS, len(jql_strs))
+            ) as executor:
+                chunks = list(executor.map(search, jql_strs))
+        else:
+            chunks = [search(jql_str) for jql_str in jql_strs]
+        return list(chain(*chunks))
+
+    def _search_jira_issue_ids(self, jql_str: str) -> list[Issue]:
+        return self._call_jira(
+            "search_issues",
+            jql_str,
+            maxResults=0,
+            validate_query=False,
+            fields="id",  # Query no fields, only the IDs are used
+        )
+
+    def get_accessible_jira_issue_ids(self, jira_issue_ids: Iterable[str]) -> set[str]:
+        """Returns the IDs of the given JIRA issues the user has access to.
+
+        Only the IDs are queried from JIRA, which is much cheaper than querying the
+        JIRA issues. JIRA issues cached for the user are known to be accessible. If
+        JIRA is unavailable, access checked before is used while it is still cached.
+        """
+        accessible_ids = set()
+        unknown_ids = []
+        for jira_issue_id in dict.fromkeys(jira_issue_ids):  # remove duplicates
+            key = (self._cache_scope, jira_issue_id)
+            if (
+                self._jira_issues_cache.get(jira_issue_id) is not None
+                or _shared_jira_issues_cache.get(key) is not None
+            ):
+                accessible_ids.add(jira_issue_id)
+                continue
+            accessible = _shared_jira_issue_access_cache.get(key)
+            if accessible is None:
+                unknown_ids.append(jira_issue_id)
+            elif accessible:
+                accessible_ids.add(jira_issue_id)
+
+        try:
+            found_ids = {
+                jira_issue_data.id
+                for jira_issue_data in self._search_by_ids(
+                    unknown_ids, self._search_jira_issue_ids
+                )
+            }
+        except JIRAError as error:
+            if not is_jira_unavailable(error):
+                raise error
+            self.jira_unavailable = True
+            accessible_ids.update(
+                jira_issue_id
+                for jira_issue_id in unknown_ids
+                if _shared_jira_issue_access_cache.get_stale(
+                    (self._cache_scope, jira_issue_id)
+                )
+            )
+            return accessible_ids
+
+        for jira_issue_id in unknown_ids:
+            accessible = jira_issue_id in found_ids
+            _shared_jira_issue_access_cache.set(
+                (self._cache_scope, jira_issue_id), accessible
+            )
+            if accessible:
+                accessible_ids.add(jira_issue_id)
+        return accessible_ids
 
     def check_jira_issue_id(self, jira_issue_id: str | None) -> JiraIssue | None:
         """Raises an Exception if issue ID is not existing or not None."""
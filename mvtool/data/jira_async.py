@@ -0,0 +1,177 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import ssl
+import threading
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Any
+
+import httpx
+from jira import JIRA, JIRAError
+
+
+class _State:
+    loop: asyncio.AbstractEventLoop | None = None
+    thread: threading.Thread | None = None
+    lock = threading.Lock()  # guards loop and thread
+    # HTTP clients keyed by SSL verification, only used in the event loop
+    clients: dict[bool | str, httpx.AsyncClient] = {}
+
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get the event loop running the requests of all clients in a background
+    thread, so that the HTTP clients and their connections can be reused."""
+    with _State.lock:
+        if _State.loop is None:
+            _State.loop = asyncio.new_event_loop()
+            _State.thread = threading.Thread(
+                target=_State.loop.run_forever, name="mvtool-jira-async", daemon=True
+            )
+            _State.thread.start()
+        return _State.loop
+
+
+def _get_http_client(verify: bool | str) -> httpx.AsyncClient:
+    """Get the HTTP client shared by all users with the given SSL verification.
+
+    The credentials are sent with each request. Cookies are not stored, so that no
+    JIRA session of one user is sent with requests of another user.
+    """
+    client = _State.clients.get(verify)
+    if client is None:
+        if isinstance(verify, str):
+            # verify_ssl of the JIRA config can be the path to a CA bundle
+            ssl_verify = ssl.create_default_context(cafile=verify)
+        else:
+            ssl_verify = verify
+        client = _State.clients[verify] = httpx.AsyncClient(
+            verify=ssl_verify,
+            cookies=CookieJar(DefaultCookiePolicy(allowed_domains=[])),
+            headers={"Accept": "application/json"},
+        )
+    return client
+
+
+def close_jira_async_clients() -> None:
+    """Close the shared HTTP clients and stop the event loop running them."""
+    with _State.lock:
+        loop, thread = _State.loop, _State.thread
+        _State.loop = _State.thread = None
+    if loop is None:
+        return
+
+    async def close_clients():
+        clients = list(_State.clients.values())
+        _State.clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    asyncio.run_coroutine_threadsafe(close_clients(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+class AsyncJiraClient:
+    """Sends GET requests to the JIRA REST API concurrently.
+
+    The requests are sent with the credentials and SSL verification of a JIRA
+    connection, at most max_concurrency of them at the same time. The HTTP clients
+    and their connections are shared by all users of the process.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        auth: tuple[str, str] | None = None,
+        verify: bool | str = True,
+        max_concurrency: int = 8,
+        timeout: float | None = None,
+    ):
+        self.base_url = base_url
+        self.auth = auth
+        self.verify = verify
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+    @classmethod
+    def from_jira(
+        cls, jira: JIRA, max_concurrency: int = 8
+    ) -> "AsyncJiraClient | None":
+        """Create a client using the same server, credentials, SSL verification and
+        timeout as the given JIRA connection. Returns None if the connection has no
+        session to take them from, e.g. for LDAP users."""
+        session = getattr(jira, "_session", None)
+        if not isinstance(jira, JIRA) or session is None:
+            return None
+        auth = session.auth if isinstance(session.auth, tuple) else None
+        timeout = getattr(session, "timeout", None)
+        return cls(jira._get_url(""), auth, session.verify, max_concurrency, timeout)
+
+    async def _get(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        path: str,
+        params: dict[str, Any] | None,
+    ) -> dict | None:
+        url = self.base_url.rstrip("/") + "/" + path.lstrip("/")
+        async with semaphore:
+            try:
+                response = await client.get(
+                    url, params=params, auth=self.auth, timeout=self.timeout
+                )
+            except httpx.TimeoutException as error:
+                raise JIRAError(
+                    "JIRA did not respond in time", status_code=504
+                ) from error
+            except httpx.TransportError as error:
+                raise JIRAError("JIRA is not reachable", status_code=503) from error
+        if response.status_code == 404:
+            return None
+        if response.is_error:
+            raise JIRAError(
+                response.text,
+                status_code=response.status_code,
+                url=str(response.url),
+            )
+        return response.json()
+
+    async def _get_many(
+        self, requests: list[tuple[str, dict[str, Any] | None]]
+    ) -> list[dict | None]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        client = _get_http_client(self.verify)
+        return await asyncio.gather(
+            *(self._get(client, semaphore, path, params) for path, params in requests)
+        )
+
+    def get_many(
+        self, requests: list[tuple[str, dict[str, Any] | None]]
+    ) -> list[dict | None]:
+        """Send GET requests given as paths relative to the REST API and query params.
+
+        Returns the JSON responses in the order of the requests. Responses with status
+        404 are returned as None, other errors raise a JIRAError.
+        """
+        if not requests:
+            return []
+        future = asyncio.run_coroutine_threadsafe(
+            self._get_many(requests), _get_event_loop()
+        )
+        return future.result()
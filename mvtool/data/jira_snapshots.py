@@ -0,0 +1,274 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Iterable
+
+from fastapi import Depends
+from jira import JIRA, JIRAError
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ..config import Config, load_config
+from ..db.database import get_session, read_many_from_db, upsert_into_db
+from ..db.schema import JiraIssueSnapshot, Measure
+from ..models import (
+    JiraIssue,
+    JiraIssueStatus,
+    JiraIssueType,
+    JiraProject,
+    JiraUser,
+)
+from ..utils.iteration import batched
+from .jira_ import JiraIssues
+
+logger = logging.getLogger(__name__)
+
+_session_scope = contextmanager(get_session)
+
+
+class _SyncState:
+    thread: threading.Thread | None = None
+    lock = threading.Lock()  # guards thread
+
+
+def _sync_jira_issue_snapshots(jira: JIRA, jira_issue_ids: list[str]) -> None:
+    try:
+        with _session_scope() as session:
+            snapshots = JiraIssueSnapshots(JiraIssues(jira), session)
+            snapshots.refresh_jira_issue_snapshots(jira_issue_ids)
+    except Exception:
+        logger.exception("Failed to sync JIRA issue snapshots")
+
+
+def start_sync_worker(jira: JIRA, jira_issue_ids: Iterable[str]) -> bool:
+    """Refresh the snapshots of the given JIRA issues in a background thread using
+    the given JIRA connection. The user of the connection must have access to the
+    JIRA issues. Returns False if a sync is already running."""
+    with _SyncState.lock:
+        if _SyncState.thread is not None and _SyncState.thread.is_alive():
+            return False
+        _SyncState.thread = threading.Thread(
+            target=_sync_jira_issue_snapshots,
+            args=(jira, list(jira_issue_ids)),
+            name="mvtool-jira-snapshots",
+            daemon=True,
+        )
+        _SyncState.thread.start()
+        return True
+
+
+def wait_for_sync_worker(timeout: float | None = None) -> None:
+    """Block until the running background sync has finished."""
+    thread = _SyncState.thread
+    if thread is not None:
+        thread.join(timeout)
+
+
+class JiraIssueSnapshots:
+    """Stores JIRA issues in the database to list measures without querying JIRA.
+
+    Snapshots are filled when JIRA issues are read and refreshed by syncing them.
+    If max_age is set, read snapshots older than max_age seconds are refreshed in
+    background with the JIRA connection of the user who read them.
+    """
+
+    def __init__(
+        self,
+        jira_issues: JiraIssues,
+        session: Session,
+        max_age: float | None = None,
+    ):
+        self._jira_issues = jira_issues
+        self._session = session
+        self._max_age = max_age
+
+    def _to_jira_issue_model(self, snapshot: JiraIssueSnapshot) -> JiraIssue:
+        return JiraIssue(
+            id=snapshot.id,
+            key=snapshot.key,
+            summary=snapshot.summary,
+            description=snapshot.description,
+            assignee=(
+                JiraUser(
+                    id=snapshot.assignee_id,
+                    display_name=snapshot.assignee_display_name,
+                    email_address=snapshot.assignee_email_address,
+                )
+                if snapshot.assignee_id is not None
+                else None
+            ),
+            issuetype=JiraIssueType(
+                id=snapshot.issuetype_id, name=snapshot.issuetype_name
+            ),
+            project=JiraProject(
+                id=snapshot.project_id,
+                key=snapshot.project_key,
+                name=snapshot.project_name,
+                url=self._jira_issues._get_jira_item_url(snapshot.project_key),
+            ),
+            status=JiraIssueStatus(
+                name=snapshot.status_name,
+                color_name=snapshot.status_color_name,
+                completed=snapshot.status_color_name.lower() == "green",
+            ),
+            url=self._jira_issues._get_jira_item_url(snapshot.key),
+        )
+
+    @staticmethod
+    def _to_snapshot_values(jira_issue: JiraIssue) -> dict:
+        assignee = jira_issue.assignee
+        return dict(
+            key=jira_issue.key,
+            summary=jira_issue.summary,
+            description=jira_issue.description,
+            issuetype_id=jira_issue.issuetype.id,
+            issuetype_name=jira_issue.issuetype.name,
+            project_id=jira_issue.project.id,
+            project_key=jira_issue.project.key,
+            project_name=jira_issue.project.name,
+            status_name=jira_issue.status.name,
+            status_color_name=jira_issue.status.color_name,
+            assignee_id=assignee.id if assignee else None,
+            assignee_display_name=assignee.display_name if assignee else None,
+            assignee_email_address=assignee.email_address if assignee else None,
+        )
+
+    def store_jira_issues(self, jira_issues: Iterable[JiraIssue]) -> None:
+        """Create or update the snapshots of the given JIRA issues."""
+        jira_issues = {jira_issue.id: jira_issue for jira_issue in jira_issues}
+        fetched_at = datetime.utcnow()
+        upsert_into_db(
+            self._session,
+            JiraIssueSnapshot,
+            [
+                dict(
+                    id=jira_issue_id,
+                    fetched_at=fetched_at,
+                    **self._to_snapshot_values(jira_issue),
+                )
+                for jira_issue_id, jira_issue in jira_issues.items()
+            ],
+        )
+
+    def update_jira_issue(self, jira_issue: JiraIssue) -> None:
+        """Update the snapshot of the given JIRA issue if there is one."""
+        if self._session.get(JiraIssueSnapshot, jira_issue.id) is not None:
+            self.store_jira_issues([jira_issue])
+
+    def delete_jira_issue(self, jira_issue_id: str) -> None:
+        self._session.execute(
+            delete(JiraIssueSnapshot).where(JiraIssueSnapshot.id == jira_issue_id)
+        )
+
+    def cache_jira_issues(self, jira_issue_ids: Iterable[str]) -> None:
+        """Cache the JIRA issues with the given IDs from their snapshots.
+
+        Snapshots are stored for all users, so only those of JIRA issues the user
+        has access to are used. JIRA issues without snapshot are queried from JIRA
+        and stored as snapshots.
+        """
+        jira_issue_ids = set(jira_issue_ids)
+        snapshots = read_many_from_db(self._session, JiraIssueSnapshot, jira_issue_ids)
+        missing_ids = jira_issue_ids - snapshots.keys()
+        if snapshots:
+            accessible_ids = self._jira_issues.get_accessible_jira_issue_ids(
+                snapshots.keys()
+            )
+            for jira_issue_id in snapshots.keys() - accessible_ids:
+                del snapshots[jira_issue_id]
+        for snapshot in snapshots.values():
+            # Snapshots were not queried with the user's JIRA connection, so they
+            # are not shared with other requests of the user
+            self._jira_issues._cache_jira_issue(
+                self._to_jira_issue_model(snapshot), share=False
+            )
+
+        if missing_ids:
+            self.store_jira_issues(self._jira_issues.get_jira_issues(missing_ids))
+
+        if self._max_age is not None:
+            outdated = datetime.utcnow() - timedelta(seconds=self._max_age)
+            outdated_ids = [s.id for s in snapshots.values() if s.fetched_at < outdated]
+            if outdated_ids:
+                start_sync_worker(self._jira_issues.jira, outdated_ids)
+
+    def refresh_jira_issue_snapshots(self, jira_issue_ids: Iterable[str]) -> None:
+        """Refresh the snapshots of the given JIRA issues.
+
+        Snapshots of JIRA issues not returned by JIRA are deleted, as the JIRA issues
+        were deleted or the user has no access to them. Users with access store them
+        again when reading them. Raises a JIRAError if JIRA is unavailable.
+        """
+        jira_issue_ids = set(jira_issue_ids)
+        jira_issues = list(
+            self._jira_issues.get_jira_issues(jira_issue_ids, use_shared_cache=False)
+        )
+        if self._jira_issues.jira_unavailable:
+            raise JIRAError("JIRA is unavailable", status_code=503)
+
+        self.store_jira_issues(jira_issues)
+        self._session.execute(
+            delete(JiraIssueSnapshot).where(
+                JiraIssueSnapshot.id.in_(
+                    jira_issue_ids - {jira_issue.id for jira_issue in jira_issues}
+                )
+            )
+        )
+
+    def sync_jira_issue_snapshots(
+        self, report_progress: Callable[[int], None] | None = None
+    ) -> int:
+        """Refresh the snapshots of all JIRA issues linked to measures.
+
+        Snapshots of JIRA issues no longer linked to any measure or not returned by
+        JIRA are deleted. Returns the number of JIRA issues linked to measures.
+        """
+        linked_ids_query = (
+            select(Measure.jira_issue_id)
+            .where(Measure.jira_issue_id.is_not(None))
+            .distinct()
+        )
+        jira_issue_ids = self._session.execute(linked_ids_query).scalars().all()
+
+        count = 0
+        for batch in batched(jira_issue_ids, 1000):
+            self.refresh_jira_issue_snapshots(batch)
+            count += len(batch)
+            if report_progress is not None:
+                report_progress(count)
+
+        self._session.execute(
+            delete(JiraIssueSnapshot).where(
+                JiraIssueSnapshot.id.not_in(linked_ids_query)
+            )
+        )
+        return count
+
+
+def get_jira_issue_snapshots(
+    jira_issues: JiraIssues = Depends(JiraIssues),
+    session: Session = Depends(get_session),
+    config: Config = Depends(load_config),
+) -> JiraIssueSnapshots | None:
+    """Get the JIRA issue snapshots if they are enabled, otherwise None."""
+    if config.jira_snapshots.enabled:
+        return JiraIssueSnapshots(jira_issues, session, config.jira_snapshots.max_age)
+    return None
@@ -0,0 +1,217 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from fastapi import Depends
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from ..config import Config, load_config
+from ..db.database import get_session, read_many_from_db, upsert_into_db
+from ..db.schema import JiraAssignableUser, JiraUserEntry, JiraUserSearch
+from ..models import JiraUser
+from .jira_ import JiraUsers
+
+
+class JiraUserDirectory:
+    """Stores JIRA users in the database to get and search them without querying
+    JIRA.
+
+    The directory is filled from the JIRA users read from JIRA. Stored JIRA users
+    older than ttl seconds are queried from JIRA again. Searches for assignable
+    JIRA users are answered from the directory, if a search for a prefix of the
+    search string has already returned all its results from JIRA.
+    """
+
+    def __init__(self, jira_users: JiraUsers, session: Session, ttl: float):
+        self._jira_users = jira_users
+        self._session = session
+        self._ttl = ttl
+
+    @property
+    def _fresh_after(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=self._ttl)
+
+    @staticmethod
+    def _to_jira_user_model(entry: JiraUserEntry) -> JiraUser:
+        return JiraUser(
+            id=entry.id,
+            display_name=entry.display_name,
+            email_address=entry.email_address,
+        )
+
+    def store_jira_users(
+        self, jira_users: Iterable[JiraUser], jira_project_key: str | None = None
+    ) -> None:
+        """Create or update the entries of the given JIRA users.
+
+        If a JIRA project key is given, the JIRA users are stored as assignable to
+        issues of this JIRA project.
+        """
+        jira_users = {jira_user.id: jira_user for jira_user in jira_users}
+        fetched_at = datetime.utcnow()
+        upsert_into_db(
+            self._session,
+            JiraUserEntry,
+            [
+                dict(
+                    id=jira_user.id,
+                    display_name=jira_user.display_name,
+                    email_address=jira_user.email_address,
+                    fetched_at=fetched_at,
+                )
+                for jira_user in jira_users.values()
+            ],
+        )
+        if jira_project_key is not None:
+            upsert_into_db(
+                self._session,
+                JiraAssignableUser,
+                [
+                    dict(
+                        jira_project_key=jira_project_key,
+                        jira_user_id=jira_user_id,
+                        fetched_at=fetched_at,
+                    )
+                    for jira_user_id in jira_users
+                ],
+            )
+
+    def get_jira_user(self, jira_user_id: str | None = None) -> JiraUser:
+        """Get a JIRA user from the directory or from JIRA.
+
+        The current JIRA user is always queried from JIRA, as the JIRA user ID is
+        not known in advance.
+        """
+        if jira_user_id is not None:
+            jira_users = self.get_jira_users([jira_user_id])
+            if jira_users:
+                return jira_users[0]
+
+        # Raises an error if the JIRA user is not found
+        jira_user = self._jira_users.get_jira_user(jira_user_id)
+        self.store_jira_users([jira_user])
+        return jira_user
+
+    def get_jira_users(self, jira_user_ids: Iterable[str]) -> list[JiraUser]:
+        """Get JIRA users by their IDs from the directory and query the missing and
+        outdated ones from JIRA. JIRA users not found are left out."""
+        jira_user_ids = list(dict.fromkeys(jira_user_ids))
+        fresh_after = self._fresh_after
+        jira_users = {
+            entry.id: self._to_jira_user_model(entry)
+            for entry in read_many_from_db(
+                self._session, JiraUserEntry, jira_user_ids
+            ).values()
+            if entry.fetched_at >= fresh_after
+        }
+
+        missing_ids = [i for i in jira_user_ids if i not in jira_users]
+        if missing_ids:
+            missing_jira_users = self._jira_users.get_jira_users(missing_ids)
+            self.store_jira_users(missing_jira_users)
+            jira_users.update((u.id, u) for u in missing_jira_users)
+
+        return [jira_users[i] for i in jira_user_ids if i in jira_users]
+
+    def _lookup_complete_search(
+        self, search_str: str, jira_project_key: str
+    ) -> JiraUserSearch | None:
+        # Lookup the latest complete search for a prefix of the search string
+        searches = self._session.scalars(
+            select(JiraUserSearch).where(
+                JiraUserSearch.jira_project_key == jira_project_key,
+                JiraUserSearch.fetched_at >= self._fresh_after,
+            )
+        ).all()
+        return max(
+            (s for s in searches if search_str.startswith(s.search_str)),
+            key=lambda s: s.fetched_at,
+            default=None,
+        )
+
+    def _store_complete_search(
+        self, search_str: str, jira_project_key: str, searched_at: datetime
+    ) -> None:
+        upsert_into_db(
+            self._session,
+            JiraUserSearch,
+            [
+                dict(
+                    jira_project_key=jira_project_key,
+                    search_str=search_str,
+                    fetched_at=searched_at,
+                )
+            ],
+        )
+
+    def search_jira_users(
+        self, search_str: str, jira_project_key: str, limit: int | None = None
+    ) -> list[JiraUser]:
+        """Search JIRA users assignable to issues of the given JIRA project.
+
+        Like JIRA, JIRA users are matched by the beginning of their ID, email
+        address or any word of their display name.
+        """
+        search_str = search_str.lower()
+        search = self._lookup_complete_search(search_str, jira_project_key)
+
+        if search is None:
+            searched_at = datetime.utcnow()
+            jira_users = list(
+                self._jira_users.search_jira_users(
+                    search_str, jira_project_key, limit=limit
+                )
+            )
+            self.store_jira_users(jira_users, jira_project_key)
+            # The results are complete if JIRA did not truncate them
+            if limit is None or len(jira_users) < limit:
+                self._store_complete_search(search_str, jira_project_key, searched_at)
+            return jira_users
+
+        # Any matching JIRA user was returned by the complete search or later
+        display_name = func.lower(JiraUserEntry.display_name)
+        query = (
+            select(JiraUserEntry)
+            .join(JiraAssignableUser)
+            .where(
+                JiraAssignableUser.jira_project_key == jira_project_key,
+                JiraAssignableUser.fetched_at >= search.fetched_at,
+                or_(
+                    func.lower(JiraUserEntry.id).startswith(
+                        search_str, autoescape=True
+                    ),
+                    func.lower(JiraUserEntry.email_address).startswith(
+                        search_str, autoescape=True
+                    ),
+                    display_name.startswith(search_str, autoescape=True),
+                    display_name.contains(" " + search_str, autoescape=True),
+                ),
+            )
+            .order_by(JiraUserEntry.display_name)
+            .limit(limit)
+        )
+        return [self._to_jira_user_model(e) for e in self._session.scalars(query)]
+
+
+def get_jira_user_directory(
+    jira_users: JiraUsers = Depends(JiraUsers),
+    session: Session = Depends(get_session),
+    config: Config = Depends(load_config),
+) -> JiraUserDirectory:
+    return JiraUserDirectory(jira_users, session, config.cache.jira_users_ttl)
@@ -0,0 +1,99 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import hmac
+import logging
+
+from fastapi import Depends
+from jira import JIRA
+from jira.resources import Issue
+from sqlalchemy.orm import Session
+
+from ..config import Config, load_config
+from ..db.database import get_session
+from ..models import JiraIssue, JiraWebhookEvent
+from ..utils.errors import NotFoundError, UnauthorizedError
+from .jira_ import JiraIssues, evict_jira_issue
+from .jira_snapshots import JiraIssueSnapshots
+
+logger = logging.getLogger(__name__)
+
+
+class JiraWebhooks:
+    """Applies events sent by JIRA webhooks to the JIRA data kept by the app.
+
+    Updated and deleted JIRA issues are removed from the cache shared across
+    requests. Their snapshots are updated or deleted, respectively.
+    """
+
+    ISSUE_UPDATED = "jira:issue_updated"
+    ISSUE_DELETED = "jira:issue_deleted"
+
+    def __init__(
+        self,
+        session: Session = Depends(get_session),
+        config: Config = Depends(load_config),
+    ):
+        self._session = session
+        self._jira_config = config.jira
+
+    def check_secret(self, secret: str | None) -> None:
+        webhook_secret = self._jira_config and self._jira_config.webhook_secret
+        if not webhook_secret:
+            raise NotFoundError("JIRA webhooks are not enabled")
+        if secret is None or not hmac.compare_digest(
+            secret.encode(), webhook_secret.encode()
+        ):
+            raise UnauthorizedError("Invalid JIRA webhook secret")
+
+    def _get_jira_issues(self) -> JiraIssues:
+        # The connection is not authenticated and only used to convert JIRA issues
+        return JiraIssues(JIRA(self._jira_config.url, get_server_info=False))
+
+    def _to_jira_issue_model(
+        self, jira_issues: JiraIssues, data: dict
+    ) -> JiraIssue | None:
+        jira = jira_issues.jira
+        try:
+            return jira_issues._to_jira_issue_model(
+                Issue(jira._options, jira._session, raw=data)
+            )
+        except (AttributeError, KeyError, TypeError, ValueError):
+            logger.warning("Incomplete JIRA issue %s in webhook", data.get("id"))
+            return None
+
+    def process_event(self, event: JiraWebhookEvent) -> None:
+        """Process a webhook event. Events other than updates and deletions of JIRA
+        issues are ignored."""
+        if event.webhook_event not in (self.ISSUE_UPDATED, self.ISSUE_DELETED):
+            return
+        if event.issue is None or "id" not in event.issue:
+            return
+
+        jira_issue_id = str(event.issue["id"])
+        evict_jira_issue(jira_issue_id)
+
+        jira_issues = self._get_jira_issues()
+        snapshots = JiraIssueSnapshots(jira_issues, self._session)
+        jira_issue = None
+        if event.webhook_event == self.ISSUE_UPDATED:
+            jira_issue = self._to_jira_issue_model(jira_issues, event.issue)
+
+        if jira_issue is not None:
+            snapshots.update_jira_issue(jira_issue)
+        else:
+            # Deleted JIRA issues and those which cannot be read from the event
+            snapshots.delete_jira_issue(jira_issue_id)
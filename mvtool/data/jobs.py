@@ -0,0 +1,281 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable
+
+from fastapi import Depends, HTTPException
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import select, update
+
+from ..auth import get_jira, get_username
+from ..config import JobsConfig
+from ..db.database import create_in_db, delete_from_db, get_session
+from ..db.schema import Job
+from ..utils.errors import ClientError, NotFoundError
+
+# A job function gets its own session and a callback to report the number of
+# processed items. It may return the path of a result file.
+JobFunction = Callable[[Session, Callable[[int], None]], str | None]
+
+logger = logging.getLogger(__name__)
+
+
+class _State:
+    executor: ThreadPoolExecutor | None = None
+    futures: dict[int, Future] = {}
+    progress: dict[int, int] = {}
+    lock = threading.Lock()  # guards futures
+    ttl: float | None = None
+    heartbeat_timeout: float = 60
+    heartbeat_thread: threading.Thread | None = None
+    stop_heartbeat = threading.Event()
+
+
+_session_scope = contextmanager(get_session)
+
+
+def _remove_job_files(job: Job) -> None:
+    """Remove the input and result file owned by the job."""
+    for path in (job.input_path, job.result_path):
+        if path and os.path.exists(path):
+            os.remove(path)
+    job.input_path = None
+    job.result_path = None
+
+
+def _fail_jobs(session: Session, error: str, *conditions) -> None:
+    """Mark pending and running jobs matching the conditions as failed and remove
+    their files."""
+    query = select(Job).where(Job.status.in_(["pending", "running"]), *conditions)
+    for job in session.execute(query).scalars():
+        _remove_job_files(job)
+        job.status = "failed"
+        job.error = error
+
+
+def beat_jobs(session: Session) -> None:
+    """Refresh the heartbeat and store the progress of the jobs of this process."""
+    with _State.lock:
+        job_ids = list(_State.futures)
+    now = datetime.utcnow()
+    for job_id in job_ids:
+        # Jobs finished meanwhile are skipped to not overwrite their final progress
+        session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status.in_(["pending", "running"]))
+            .values(heartbeat=now, processed=_State.progress.get(job_id, 0))
+        )
+
+
+def _beat_jobs_periodically(interval: float, stop: threading.Event) -> None:
+    while not stop.wait(interval):
+        try:
+            with _session_scope() as session:
+                beat_jobs(session)
+        except Exception:
+            logger.exception("Failed to refresh the heartbeat of jobs")
+
+
+def sweep_jobs(session: Session) -> None:
+    """Fail jobs whose worker process has stopped refreshing their heartbeat, and
+    delete finished jobs and their files once they are older than the TTL."""
+    stale = datetime.utcnow() - timedelta(seconds=_State.heartbeat_timeout)
+    _fail_jobs(session, "Job was interrupted", Job.heartbeat < stale)
+    if _State.ttl is not None:
+        expired = datetime.utcnow() - timedelta(seconds=_State.ttl)
+        query = select(Job).where(
+            Job.status.in_(["completed", "failed"]), Job.updated < expired
+        )
+        for job in session.execute(query).scalars():
+            _remove_job_files(job)
+            session.delete(job)
+    session.flush()
+
+
+def setup_job_executor(jobs_config: JobsConfig) -> ThreadPoolExecutor:
+    """Set up the executor running the background jobs.
+
+    The number of workers limits how many jobs run in parallel, so that heavy jobs
+    do not starve the thread pool serving interactive requests. Jobs of other worker
+    processes are left alone as long as their heartbeat is refreshed, jobs of stopped
+    processes are marked as failed and expired jobs are deleted. Therefore, the
+    database connection must be set up before.
+    """
+    if _State.executor is None:
+        _State.ttl = jobs_config.ttl
+        _State.heartbeat_timeout = jobs_config.heartbeat_timeout
+        with _session_scope() as session:
+            sweep_jobs(session)
+
+        _State.executor = ThreadPoolExecutor(
+            max_workers=jobs_config.max_workers, thread_name_prefix="mvtool-job"
+        )
+        _State.stop_heartbeat = threading.Event()
+        _State.heartbeat_thread = threading.Thread(
+            target=_beat_jobs_periodically,
+            args=(jobs_config.heartbeat_interval, _State.stop_heartbeat),
+            name="mvtool-job-heartbeat",
+            daemon=True,
+        )
+        _State.heartbeat_thread.start()
+    return _State.executor
+
+
+def shutdown_job_executor(wait: bool = True):
+    """Shut down the executor. Pending jobs are cancelled and marked as failed,
+    running jobs are finished if wait is True."""
+    if _State.executor is None:
+        raise RuntimeError("Job executor is not initialized")
+
+    _State.executor.shutdown(wait=wait, cancel_futures=True)
+    _State.stop_heartbeat.set()
+    _State.heartbeat_thread.join()
+    _State.heartbeat_thread = None
+    with _State.lock:
+        cancelled_ids = [i for i, f in _State.futures.items() if f.cancelled()]
+        _State.futures.clear()
+    if cancelled_ids:
+        with _session_scope() as session:
+            _fail_jobs(session, "Job was cancelled", Job.id.in_(cancelled_ids))
+    _State.executor = None
+    _State.progress.clear()
+
+
+def wait_for_job(job_id: int, timeout: float | None = None) -> None:
+    """Block until the job with the given id has been run by this process."""
+    with _State.lock:
+        future = _State.futures.get(job_id)
+    if future is not None:
+        future.result(timeout)
+
+
+def _run_job(job_id: int, job_function: JobFunction) -> None:
+    with _session_scope() as session:
+        job = session.get(Job, job_id)
+        if job is not None:
+            job.status = "running"
+    if job is None:
+        # The job has been deleted before it was started
+        with _State.lock:
+            _State.futures.pop(job_id, None)
+        return
+
+    def report_progress(processed: int) -> None:
+        _State.progress[job_id] = processed
+
+    status, error, result_path = "completed", None, None
+    try:
+        with _session_scope() as session:
+            result_path = job_function(session, report_progress)
+    except HTTPException as e:
+        status, error = "failed", str(e.detail)
+    except Exception as e:
+        logger.exception("Job %d failed", job_id)
+        status, error = "failed", f"Unexpected error: {e}"
+    finally:
+        with _session_scope() as session:
+            job = session.get(Job, job_id)
+            processed = _State.progress.pop(job_id, 0)
+            if job is None:
+                # The job has been deleted meanwhile, so nobody owns the result
+                if result_path and os.path.exists(result_path):
+                    os.remove(result_path)
+            else:
+                # The input file has been processed and is no longer needed
+                _remove_job_files(job)
+                job.status = status
+                job.error = error
+                job.processed = processed
+                job.result_path = result_path
+        with _State.lock:
+            _State.futures.pop(job_id, None)
+
+
+class Jobs:
+    def __init__(
+        self,
+        session: Session = Depends(get_session),
+        username: str = Depends(get_username),
+        _=Depends(get_jira),  # get jira to enforce login
+    ):
+        self._session = session
+        self._username = username
+
+    def list_jobs(self) -> list[Job]:
+        query = select(Job).where(Job.owner == self._username).order_by(Job.id)
+        return self._session.execute(query).scalars().all()
+
+    def create_job(
+        self,
+        kind: str,
+        result_filename: str | None = None,
+        input_path: str | None = None,
+    ) -> Job:
+        """Create a job. The job owns the file at input_path, if given, and removes
+        it when it has finished, failed or has been cancelled."""
+        job = Job(
+            kind=kind,
+            owner=self._username,
+            result_filename=result_filename,
+            input_path=input_path,
+        )
+        return create_in_db(self._session, job)
+
+    def get_job(self, job_id: int) -> Job:
+        job = self._session.get(Job, job_id)
+        if job is None or job.owner != self._username:
+            # Jobs of other users are treated as non-existent
+            raise NotFoundError(f"No Job with id={job_id}.")
+        return job
+
+    def get_progress(self, job: Job) -> int:
+        """Get the number of items processed so far, including running jobs. The
+        progress of jobs run by other worker processes is only stored with their
+        heartbeat and may therefore lag behind."""
+        return _State.progress.get(job.id, job.processed)
+
+    def submit_job(self, job: Job, job_function: JobFunction) -> None:
+        if _State.executor is None:
+            raise RuntimeError("Job executor is not initialized")
+
+        sweep_jobs(self._session)
+        # The job runs in a separate session and therefore must be committed first
+        self._session.commit()
+        with _State.lock:
+            _State.futures[job.id] = _State.executor.submit(
+                _run_job, job.id, job_function
+            )
+
+    def delete_job(self, job: Job) -> None:
+        """Delete the job and its files. Running jobs cannot be deleted, even if
+        another worker process runs them."""
+        if job.status == "running":
+            raise ClientError("Cannot delete a running job")
+        with _State.lock:
+            future = _State.futures.get(job.id)
+            if future is not None and not (future.cancel() or future.done()):
+                raise ClientError("Cannot delete a running job")
+            _State.futures.pop(job.id, None)
+
+        _remove_job_files(job)
+        delete_from_db(self._session, job)
@@ -16,14 +16,24 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
-from typing import Any, Iterable, Iterator
+from collections import Counter
+from itertools import chain
+from typing import Annotated, Any, Callable, Iterable, Iterator, Type, TypeVar
 
 from fastapi import Depends
 from sqlalchemy import Column, func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.interfaces import ORMOption
 from sqlalchemy.sql import Select, select
 
-from ..db.database import delete_from_db, get_session, read_from_db
+from ..db.database import (
+    delete_from_db,
+    get_change_state,
+    get_session,
+    read_from_db,
+    read_many_from_db,
+    set_changed_attrs,
+)
 from ..db.schema import (
     Catalog,
     CatalogModule,
@@ -34,15 +44,34 @@ from ..db.schema import (
 )
 from ..handlers.documents import Documents
 from ..handlers.jira_ import JiraIssues
+from ..models.imports import ImportSummary
 from ..models.measures import MeasureImport, MeasureInput, MeasurePatch
 from ..utils.errors import NotFoundError
 from ..utils.etag_map import get_from_etag_map
 from ..utils.fallback import fallback
 from ..utils.filtering import filter_for_existence
-from ..utils.iteration import CachedIterable
+from ..utils.iteration import CachedIterable, batched
 from ..utils.models import field_is_set
+from .import_planner import preload_imports
+from .jira_snapshots import JiraIssueSnapshots, get_jira_issue_snapshots
 from .requirements import Requirements
 
+T = TypeVar("T", Requirement, Document)
+
+
+def _read_etag_map(
+    session: Session,
+    orm_class: Type[T],
+    ids_map: dict[str, int],
+    imports: Iterable[Any],
+) -> dict[str, T]:
+    # Map the etags of the given imports to the items converted from them before
+    ids = {
+        i.etag: ids_map[i.etag] for i in imports if i is not None and i.etag in ids_map
+    }
+    items = read_many_from_db(session, orm_class, ids.values())
+    return {etag: items[id] for etag, id in ids.items() if id in items}
+
 
 class Measures:
     def __init__(
@@ -51,11 +80,24 @@ class Measures:
         requirements: Requirements = Depends(Requirements),
         documents: Documents = Depends(Documents),
         session: Session = Depends(get_session),
+        jira_issue_snapshots: Annotated[
+            JiraIssueSnapshots | None, Depends(get_jira_issue_snapshots)
+        ] = None,
     ):
         self._jira_issues = jira_issues
         self._requirements = requirements
         self._documents = documents
         self.session = session
+        self._jira_issue_snapshots = jira_issue_snapshots
+
+    @property
+    def jira_unavailable(self) -> bool:
+        """Whether JIRA data of listed measures is outdated or missing, because JIRA
+        was unavailable."""
+        return (
+            self._jira_issues.jira_unavailable
+            or self._requirements._projects._jira_projects.jira_unavailable
+        )
 
     @staticmethod
     def _modify_measures_query(
@@ -90,6 +132,7 @@ class Measures:
         offset: int | None = None,
         limit: int | None = None,
         query_jira: bool = True,
+        options: list[ORMOption] | None = None,
     ) -> list[Measure]:
         # construct measures query
         query = self._modify_measures_query(
@@ -99,12 +142,18 @@ class Measures:
             offset,
             limit,
         )
+        if options:
+            query = query.options(*options)
 
         # execute measures query
         measures = self.session.execute(query).scalars().all()
 
         # set jira project and issue on measures
         if query_jira:
+            self._requirements._projects._cache_jira_projects(
+                [m.requirement.project for m in measures]
+                + [m.document.project for m in measures if m.document is not None]
+            )
             jira_issue_ids = set()
             for measure in measures:
                 if measure.jira_issue_id is not None:
@@ -113,7 +162,10 @@ class Measures:
                 self._set_jira_project(measure)
 
             # cache jira issues and return measures
-            list(self._jira_issues.get_jira_issues(jira_issue_ids))
+            if self._jira_issue_snapshots is not None:
+                self._jira_issue_snapshots.cache_jira_issues(jira_issue_ids)
+            else:
+                list(self._jira_issues.get_jira_issues(jira_issue_ids))
         return measures
 
     def count_measures(self, where_clauses: Any = None) -> int:
@@ -199,10 +251,13 @@ class Measures:
                 try_to_get_jira_issue = False
 
         # update measure
-        for key, value in update.model_dump(
-            exclude_unset=patch, exclude={"id", "requirement", "jira_issue", "document"}
-        ).items():
-            setattr(measure, key, value)
+        set_changed_attrs(
+            measure,
+            update.model_dump(
+                exclude_unset=patch,
+                exclude={"id", "requirement", "jira_issue", "document"},
+            ),
+        )
 
         # flush changes
         if not skip_flush:
@@ -239,91 +294,180 @@ class Measures:
         fallback_catalog_module: CatalogModule | None = None,
         patch: bool = False,
         skip_flush: bool = False,
+        requirements_map: dict[str, Requirement] | None = None,
+        documents_map: dict[str, Document] | None = None,
     ) -> Iterator[Measure]:
         measure_imports = CachedIterable(measure_imports)
-        fallback_project = (
-            fallback_requirement.project if fallback_requirement else None
-        )
-
-        # Convert requirement imports to requirements
-        requirements_map = self._requirements.convert_requirement_imports(
-            (m.requirement for m in measure_imports if m.requirement is not None),
-            fallback_project,
-            fallback_catalog_module,
-            patch=patch,
-        )
 
-        # Convert document imports to documents
-        documents_map = self._documents.convert_document_imports(
-            (m.document for m in measure_imports if m.document is not None),
-            fallback_project,
-            patch=patch,
-        )
+        with preload_imports(self.session, measure_imports):
+            fallback_project = (
+                fallback_requirement.project if fallback_requirement else None
+            )
 
-        # Cache jira issues
-        jira_issues_map = {
-            ji.key: ji
-            for ji in self._jira_issues.get_jira_issues(
-                {m.jira_issue.key for m in measure_imports if m.jira_issue is not None}
+            # Convert requirement imports to requirements
+            requirements_map = self._requirements.convert_requirement_imports(
+                (m.requirement for m in measure_imports if m.requirement is not None),
+                fallback_project,
+                fallback_catalog_module,
+                patch=patch,
+                requirements_map=requirements_map,
             )
-        }
-
-        # Get measures to be updated from the database
-        ids = {m.id for m in measure_imports if m.id is not None}
-        measures_to_update = {
-            m.id: m for m in (self.list_measures([Measure.id.in_(ids)]) if ids else [])
-        }
-
-        # Create or update measures
-        for measure_import in measure_imports:
-            requirement = get_from_etag_map(
-                requirements_map, measure_import.requirement
+
+            # Convert document imports to documents
+            documents_map = self._documents.convert_document_imports(
+                (m.document for m in measure_imports if m.document is not None),
+                fallback_project,
+                patch=patch,
+                documents_map=documents_map,
             )
 
-            if measure_import.id is None:
-                # Create measure
-                measure = self.create_measure(
-                    fallback(
-                        requirement,
-                        fallback_requirement,
-                        "No fallback requirement provided.",
-                    ),
-                    measure_import,
-                    skip_flush=True,
+            # Get measures to be updated from the database
+            ids = {m.id for m in measure_imports if m.id is not None}
+            measures_to_update = read_many_from_db(self.session, Measure, ids)
+
+            # Cache jira issues of the imports and of the measures to be updated
+            jira_issue_ids = {
+                m.jira_issue.key for m in measure_imports if m.jira_issue is not None
+            }
+            jira_issue_ids.update(
+                m.jira_issue_id
+                for m in measures_to_update.values()
+                if m.jira_issue_id is not None
+            )
+            jira_issues_map = {
+                ji.key: ji for ji in self._jira_issues.get_jira_issues(jira_issue_ids)
+            }
+
+            # Create or update measures
+            for measure_import in measure_imports:
+                requirement = get_from_etag_map(
+                    requirements_map, measure_import.requirement
                 )
-            else:
-                # Update measure
-                measure = measures_to_update.get(measure_import.id)
-                if measure is None:
-                    raise NotFoundError(f"No measure with id={measure_import.id}.")
-                self.update_measure(
-                    measure,
-                    measure_import,
+
+                if measure_import.id is None:
+                    # Create measure
+                    measure = self.create_measure(
+                        fallback(
+                            requirement,
+                            fallback_requirement,
+                            "No fallback requirement provided.",
+                        ),
+                        measure_import,
+                        skip_flush=True,
+                    )
+                else:
+                    # Update measure
+                    measure = measures_to_update.get(measure_import.id)
+                    if measure is None:
+                        raise NotFoundError(f"No measure with id={measure_import.id}.")
+                    self.update_measure(
+                        measure,
+                        measure_import,
+                        patch=patch,
+                        skip_flush=True,
+                    )
+                    self._set_jira_project(measure)
+
+                # Set document
+                if field_is_set(measure_import, "document") or not patch:
+                    document = get_from_etag_map(documents_map, measure_import.document)
+                    set_changed_attrs(measure, {"document": document})
+
+                # Set jira issue
+                if field_is_set(measure_import, "jira_issue") or not patch:
+                    jira_issue = None
+                    if measure_import.jira_issue is not None:
+                        jira_issue = jira_issues_map.get(measure_import.jira_issue.key)
+                        if jira_issue is None:
+                            raise NotFoundError(
+                                f"No Jira issue with key={measure_import.jira_issue.key}."
+                            )
+                    set_changed_attrs(
+                        measure,
+                        {"jira_issue_id": jira_issue.id if jira_issue else None},
+                    )
+
+                yield measure
+
+            if not skip_flush:
+                self.session.flush()
+
+    def stream_create_update_measures(
+        self,
+        measure_imports: Iterable[MeasureImport],
+        fallback_requirement: Requirement | None = None,
+        fallback_catalog_module: CatalogModule | None = None,
+        patch: bool = False,
+        batch_size: int = 1000,
+        report_progress: Callable[[int], None] | None = None,
+    ) -> ImportSummary:
+        """Create or update measures in batches of a fixed size.
+
+        Each batch is flushed and its measures, requirements and documents are
+        expunged from the session afterwards, so that the memory consumption does not
+        grow with the number of imported measures. All batches are written within the
+        current transaction. Nested requirements and documents are converted only once
+        across all batches; later batches only keep their ids and reload the ones they
+        reference. After each batch, report_progress is called with the number of
+        measures written so far.
+
+        Returns:
+            ImportSummary: The number of imported measures and how many of them were
+                created, updated or left unchanged.
+        """
+        requirement_ids: dict[str, int] = {}
+        document_ids: dict[str, int] = {}
+        change_counts: Counter[str] = Counter()
+        count = 0
+
+        for measure_imports_batch in batched(measure_imports, batch_size):
+            # Reload the nested items converted in previous batches
+            requirements_map = _read_etag_map(
+                self.session,
+                Requirement,
+                requirement_ids,
+                (m.requirement for m in measure_imports_batch),
+            )
+            documents_map = _read_etag_map(
+                self.session,
+                Document,
+                document_ids,
+                (m.document for m in measure_imports_batch),
+            )
+
+            measures = list(
+                self.bulk_create_update_measures(
+                    measure_imports_batch,
+                    fallback_requirement,
+                    fallback_catalog_module,
                     patch=patch,
                     skip_flush=True,
+                    requirements_map=requirements_map,
+                    documents_map=documents_map,
                 )
+            )
 
-            # Set document
-            if field_is_set(measure_import, "document") or not patch:
-                measure.document = get_from_etag_map(
-                    documents_map, measure_import.document
-                )
-
-            # Set jira issue
-            if field_is_set(measure_import, "jira_issue") or not patch:
-                jira_issue = None
-                if measure_import.jira_issue is not None:
-                    jira_issue = jira_issues_map.get(measure_import.jira_issue.key)
-                    if jira_issue is None:
-                        raise NotFoundError(
-                            f"No Jira issue with key={measure_import.jira_issue.key}."
-                        )
-                measure.jira_issue_id = jira_issue.id if jira_issue else None
-
-            yield measure
+            # Count the changes before they are written to the database
+            change_counts.update(get_change_state(m) for m in measures)
 
-        if not skip_flush:
+            # Write batch to the database and release its items from the session
             self.session.flush()
+            requirement_ids.update((e, r.id) for e, r in requirements_map.items())
+            document_ids.update((e, d.id) for e, d in documents_map.items())
+            for item in chain(
+                measures, requirements_map.values(), documents_map.values()
+            ):
+                # Expunging cascades, so items may already have been released
+                if (
+                    object_session(item) is not None
+                    and item is not fallback_requirement
+                ):
+                    self.session.expunge(item)
+            count += len(measures)
+            if report_progress is not None:
+                report_progress(count)
+
+        return ImportSummary(count=count, **change_counts)
 
     def _set_jira_project(self, measure: Measure, try_to_get: bool = True) -> None:
         self._requirements._set_jira_project(measure.requirement, try_to_get)
@@ -22,7 +22,13 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import Select, select
 
-from ..db.database import delete_from_db, get_session, read_from_db
+from ..db.database import (
+    delete_from_db,
+    get_session,
+    read_from_db,
+    read_many_from_db,
+    set_changed_attrs,
+)
 from ..db.schema import Project
 from ..models.projects import ProjectImport, ProjectInput, ProjectPatch
 from ..utils.errors import NotFoundError
@@ -140,10 +146,10 @@ class Projects:
                 try_to_get_jira_project = False  # already loaded
 
         # update project
-        for key, value in update.model_dump(
-            exclude_unset=patch, exclude={"id", "jira_project"}
-        ).items():
-            setattr(project, key, value)
+        set_changed_attrs(
+            project,
+            update.model_dump(exclude_unset=patch, exclude={"id", "jira_project"}),
+        )
 
         if not skip_flush:
             self._session.flush()
@@ -183,14 +189,14 @@ class Projects:
 
         # Get projects to be updated from the database
         ids = [p.id for p in project_imports if p.id is not None]
-        projects_to_update = {
-            p.id: p for p in (self.list_projects([Project.id.in_(ids)]) if ids else [])
-        }
+        projects_to_update = read_many_from_db(self._session, Project, ids)
 
-        # Cache jira projects
-        jira_projects_map = {
-            jp.key: jp for jp in self._jira_projects.list_jira_projects()
-        }
+        # Cache jira projects if any are referenced by the imports
+        jira_projects_map = {}
+        if any(p.jira_project is not None for p in project_imports):
+            jira_projects_map = {
+                jp.key: jp for jp in self._jira_projects.list_jira_projects()
+            }
 
         # Create or update projects
         for project_import in project_imports:
@@ -215,7 +221,10 @@ class Projects:
                         raise NotFoundError(
                             f"No Jira project with key={project_import.jira_project.key}."
                         )
-                project.jira_project_id = jira_project.id if jira_project else None
+                set_changed_attrs(
+                    project,
+                    {"jira_project_id": jira_project.id if jira_project else None},
+                )
 
             yield project
 
@@ -239,6 +248,14 @@ class Projects:
 
         return projects_map
 
+    def _cache_jira_projects(self, projects: Iterable[Project | None]) -> None:
+        """Get the JIRA projects of the given projects concurrently and cache them."""
+        self._jira_projects.cache_jira_projects(
+            project.jira_project_id
+            for project in projects
+            if project is not None and project.jira_project_id is not None
+        )
+
     def _set_jira_project(self, project: Project, try_to_get: bool = True) -> None:
         project._get_jira_project = (
             lambda jira_project_id: self._jira_projects.lookup_jira_project(
@@ -22,7 +22,13 @@ from sqlalchemy import Column, func
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import Select, select
 
-from ..db.database import delete_from_db, get_session, read_from_db
+from ..db.database import (
+    delete_from_db,
+    get_session,
+    read_from_db,
+    read_many_from_db,
+    set_changed_attrs,
+)
 from ..db.schema import Catalog, CatalogModule, CatalogRequirement, Project, Requirement
 from ..models.requirements import RequirementImport, RequirementInput, RequirementPatch
 from ..utils.errors import NotFoundError
@@ -32,6 +38,7 @@ from ..utils.filtering import filter_for_existence
 from ..utils.iteration import CachedIterable
 from ..utils.models import field_is_set
 from .catalog_requirements import CatalogRequirements
+from .import_planner import preload_imports
 from .projects import Projects
 
 
@@ -90,6 +97,7 @@ class Requirements:
         # execute query, set jira_project and return requirements
         requirements = self._session.execute(query).scalars().all()
         if query_jira:
+            self._projects._cache_jira_projects(r.project for r in requirements)
             for requirement in requirements:
                 self._set_jira_project(requirement)
         return requirements
@@ -166,10 +174,12 @@ class Requirements:
         patch: bool = False,
         skip_flush: bool = False,
     ) -> None:
-        for key, value in update.model_dump(
-            exclude_unset=patch, exclude={"id", "project", "catalog_requirement"}
-        ).items():
-            setattr(requirement, key, value)
+        set_changed_attrs(
+            requirement,
+            update.model_dump(
+                exclude_unset=patch, exclude={"id", "project", "catalog_requirement"}
+            ),
+        )
 
         # check catalog_requirement_id and set catalog_requirement
         if isinstance(update, RequirementInput):
@@ -208,66 +218,68 @@ class Requirements:
     ) -> Iterator[Requirement]:
         requirement_imports = CachedIterable(requirement_imports)
 
-        # Convert project imports to projects
-        projects_map = self._projects.convert_project_imports(
-            (r.project for r in requirement_imports if r.project is not None),
-            patch=patch,
-        )
-
-        # Convert catalog requirement imports to catalog requirements
-        catalog_requirements_map = (
-            self._catalog_requirements.convert_catalog_requirement_imports(
-                (
-                    r.catalog_requirement
-                    for r in requirement_imports
-                    if r.catalog_requirement is not None
-                ),
-                fallback_catalog_module,
+        with preload_imports(self._session, requirement_imports):
+            # Convert project imports to projects
+            projects_map = self._projects.convert_project_imports(
+                (r.project for r in requirement_imports if r.project is not None),
                 patch=patch,
             )
-        )
-
-        # Get requirements to be updated from database
-        ids = [r.id for r in requirement_imports if r.id is not None]
-        requirements_to_update = {
-            r.id: r
-            for r in (self.list_requirements([Requirement.id.in_(ids)]) if ids else [])
-        }
 
-        # Create or update requirements
-        for requirement_import in requirement_imports:
-            project = get_from_etag_map(projects_map, requirement_import.project)
-
-            if requirement_import.id is None:
-                # Create requirement
-                requirement = self.create_requirement(
-                    fallback(
-                        project, fallback_project, "No fallback project provided."
+            # Convert catalog requirement imports to catalog requirements
+            catalog_requirements_map = (
+                self._catalog_requirements.convert_catalog_requirement_imports(
+                    (
+                        r.catalog_requirement
+                        for r in requirement_imports
+                        if r.catalog_requirement is not None
                     ),
-                    requirement_import,
-                    skip_flush=True,
+                    fallback_catalog_module,
+                    patch=patch,
                 )
-            else:
-                # Update requirement
-                requirement = requirements_to_update.get(requirement_import.id)
-                if requirement is None:
-                    raise NotFoundError(
-                        f"No requirement with id={requirement_import.id}."
+            )
+
+            # Get requirements to be updated from database
+            ids = [r.id for r in requirement_imports if r.id is not None]
+            requirements_to_update = read_many_from_db(self._session, Requirement, ids)
+
+            # Create or update requirements
+            for requirement_import in requirement_imports:
+                project = get_from_etag_map(projects_map, requirement_import.project)
+
+                if requirement_import.id is None:
+                    # Create requirement
+                    requirement = self.create_requirement(
+                        fallback(
+                            project, fallback_project, "No fallback project provided."
+                        ),
+                        requirement_import,
+                        skip_flush=True,
                     )
-                self.update_requirement(
-                    requirement, requirement_import, patch=patch, skip_flush=True
-                )
+                else:
+                    # Update requirement
+                    requirement = requirements_to_update.get(requirement_import.id)
+                    if requirement is None:
+                        raise NotFoundError(
+                            f"No requirement with id={requirement_import.id}."
+                        )
+                    self.update_requirement(
+                        requirement, requirement_import, patch=patch, skip_flush=True
+                    )
+                    self._set_jira_project(requirement)
 
-            # Set catalog requirement
-            if field_is_set(requirement_import, "catalog_requirement") or not patch:
-                requirement.catalog_requirement = get_from_etag_map(
-                    catalog_requirements_map, requirement_import.catalog_requirement
-                )
+                # Set catalog requirement
+                if field_is_set(requirement_import, "catalog_requirement") or not patch:
+                    catalog_requirement = get_from_etag_map(
+                        catalog_requirements_map, requirement_import.catalog_requirement
+                    )
+                    set_changed_attrs(
+                        requirement, {"catalog_requirement": catalog_requirement}
+                    )
 
-            yield requirement
+                yield requirement
 
-        if not skip_flush:
-            self._session.flush()
+            if not skip_flush:
+                self._session.flush()
 
     def convert_requirement_imports(
         self,
@@ -275,15 +287,19 @@ class Requirements:
         fallback_project: Project | None = None,
         fallback_catalog_module: CatalogModule | None = None,
         patch: bool = False,
+        requirements_map: dict[str, Requirement] | None = None,
     ) -> dict[str, Requirement]:
-        # Map requirement imports to their etags
-        requirements_map = {r.etag: r for r in requirement_imports}
+        # Map requirement imports to their etags, skip imports converted before
+        requirements_map = {} if requirements_map is None else requirements_map
+        imports_map = {
+            r.etag: r for r in requirement_imports if r.etag not in requirements_map
+        }
 
         # Map created and updates requirements to the etag of their imports
         for etag, requirement in zip(
-            requirements_map.keys(),
+            imports_map.keys(),
             self.bulk_create_update_requirements(
-                requirements_map.values(),
+                imports_map.values(),
                 fallback_project,
                 fallback_catalog_module,
                 patch=patch,
@@ -15,15 +15,35 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Type, TypeVar
+import logging
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Iterable, Literal, Mapping, Type, TypeVar
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc, inspect, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.engine.base import Engine
-from sqlalchemy.orm import Session, sessionmaker, registry
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import (
+    Session,
+    joinedload,
+    lazyload,
+    load_only,
+    registry,
+    sessionmaker,
+)
+from sqlalchemy.orm.interfaces import ORMOption
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.pool import QueuePool, StaticPool
 
 from ..config import DatabaseConfig
 from ..utils.errors import NotFoundError
+from ..utils.iteration import batched
+
+logger = logging.getLogger(__name__)
 
 mapper_registry = registry()
 mapper_registry.metadata.naming_convention = {
@@ -36,6 +56,105 @@ mapper_registry.metadata.naming_convention = {
 Base = mapper_registry.generate_base()
 
 
+class TimedQueuePool(QueuePool):
+    """Queue pool which measures how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            wait_time = time.perf_counter() - start
+            with self._stats_lock:
+                self._checkouts += 1
+                self._wait_time += wait_time
+                self._max_wait_time = max(self._max_wait_time, wait_time)
+
+    @property
+    def stats(self) -> "PoolStats":
+        with self._stats_lock:
+            return PoolStats(
+                size=self.size(),
+                checked_out=self.checkedout(),
+                overflow=max(self.overflow(), 0),
+                checkouts=self._checkouts,
+                timeouts=self._timeouts,
+                wait_time=self._wait_time,
+                max_wait_time=self._max_wait_time,
+            )
+
+
+@dataclass
+class PoolStats:
+    size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_time: float  # seconds waited for connections in total, including connecting
+    max_wait_time: float
+
+    @property
+    def mean_wait_time(self) -> float:
+        return self.wait_time / self.checkouts if self.checkouts else 0.0
+
+
+def _set_statement_timeout(engine: Engine, statement_timeout: float) -> None:
+    milliseconds = int(statement_timeout * 1000)
+    if engine.dialect.name == "postgresql":
+        statement = f"SET statement_timeout = {milliseconds}"
+    elif engine.dialect.name in ("mysql", "mariadb"):
+        statement = f"SET SESSION max_execution_time = {milliseconds}"
+    else:
+        logger.warning(
+            "statement_timeout is not supported by %s databases", engine.dialect.name
+        )
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_statement_timeout(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def _is_sqlite_in_memory(url: URL) -> bool:
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def _set_sqlite_pragmas(engine: Engine, database_config: DatabaseConfig) -> None:
+    pragmas = [
+        f"PRAGMA journal_mode = {database_config.sqlite_journal_mode}",
+        f"PRAGMA synchronous = {database_config.sqlite_synchronous}",
+        f"PRAGMA busy_timeout = {int(database_config.sqlite_busy_timeout * 1000)}",
+        f"PRAGMA mmap_size = {database_config.sqlite_mmap_size}",
+        f"PRAGMA cache_size = {database_config.sqlite_cache_size}",
+    ]
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
 class __State:
     engine: Engine | None = None
     session_local: sessionmaker | None = None
@@ -43,19 +162,50 @@ class __State:
 
 def setup_connection(database_config: DatabaseConfig):
     if __State.engine is None:
-        if database_config.url.startswith("sqlite"):
+        engine_options: dict[str, Any] = dict(
+            echo=database_config.echo,
+            use_insertmanyvalues=database_config.use_insertmanyvalues,
+            insertmanyvalues_page_size=database_config.insertmanyvalues_page_size,
+        )
+        url = make_url(database_config.url)
+        if database_config.executemany_mode is not None:
+            driver = url.get_dialect().driver
+            if driver == "psycopg2":
+                engine_options["executemany_mode"] = database_config.executemany_mode
+            else:
+                logger.warning(
+                    "executemany_mode is not supported by the %s driver and ignored",
+                    driver,
+                )
+
+        is_sqlite = url.get_backend_name() == "sqlite"
+        if is_sqlite:
+            # Connections are used by one thread at a time, but not always by the
+            # thread which opened them
+            engine_options["connect_args"] = {"check_same_thread": False}
+
+        if is_sqlite and _is_sqlite_in_memory(url):
             __State.engine = create_engine(
                 database_config.url,
-                connect_args={"check_same_thread": False},  # Needed for SQLite
-                echo=database_config.echo,
                 poolclass=StaticPool,  # Maintain a single connection for all threads
+                **engine_options,
             )
         else:
             __State.engine = create_engine(  # type: ignore
                 database_config.url,
-                echo=database_config.echo,
-                pool_pre_ping=True,  # check connections before using them
+                poolclass=TimedQueuePool,
+                pool_size=database_config.pool_size,
+                max_overflow=database_config.max_overflow,
+                pool_timeout=database_config.pool_timeout,
+                pool_recycle=database_config.pool_recycle,
+                pool_pre_ping=database_config.pool_pre_ping,
+                **engine_options,
             )
+            if is_sqlite:
+                _set_sqlite_pragmas(__State.engine, database_config)
+
+        if database_config.statement_timeout is not None:
+            _set_statement_timeout(__State.engine, database_config.statement_timeout)
 
         # Create sessionmaker instance after engine is initialized
         __State.session_local = sessionmaker(
@@ -65,6 +215,15 @@ def setup_connection(database_config: DatabaseConfig):
     return __State.engine, __State.session_local
 
 
+def get_pool_stats() -> PoolStats | None:
+    """Get statistics of the connection pool, None if connections are not pooled."""
+    if __State.engine is None:
+        raise RuntimeError("Engine is not initialized")
+
+    pool = __State.engine.pool
+    return pool.stats if isinstance(pool, TimedQueuePool) else None
+
+
 def dispose_connection():
     if __State.engine is None:
         raise RuntimeError("Engine is not initialized")
@@ -123,6 +282,149 @@ def read_from_db(session: Session, orm_class: Type[T], id: int) -> T:
         raise NotFoundError(f"No {item_name} with id={id}.")
 
 
+def read_many_from_db(
+    session: Session, orm_class: Type[T], ids: Iterable[int]
+) -> dict[int, T]:
+    """Map the given ids to the items of the given class.
+
+    Items already present in the session are taken from its identity map. The
+    missing items are loaded with a single query which does not eagerly load any
+    relationships. Ids without a matching item are left out of the result.
+    """
+    items: dict[int, T] = {}
+    missing_ids = set()
+    for id in ids:
+        item = session.identity_map.get(identity_key(orm_class, id))
+        if item is not None:
+            items[id] = item
+        else:
+            missing_ids.add(id)
+
+    if missing_ids:
+        query = (
+            select(orm_class)
+            .where(orm_class.id.in_(missing_ids))
+            .options(lazyload("*"))
+        )
+        for item in session.execute(query).scalars():
+            items[item.id] = item
+    return items
+
+
+def get_load_options(
+    orm_class: Type[T], attrs: Mapping[str, Mapping | None]
+) -> list[ORMOption]:
+    """Get loader options to load only the given attributes of an ORM class.
+
+    Nested attributes of relationships are loaded with joins, all other
+    relationships are not loaded. Only the given columns are loaded, unless other
+    attributes, e.g. properties, are given which may depend on any column. A
+    property `x` is assumed to depend only on the column `x_id`, if it exists.
+
+    Args:
+        orm_class (Type[T]): The ORM class to be loaded.
+        attrs (Mapping[str, Mapping | None]): The names of the attributes to be
+            loaded, mapped to the nested attributes in case of relationships.
+
+    Returns:
+        list[ORMOption]: The options to be passed to the query.
+    """
+    mapper = inspect(orm_class)
+    options: list[ORMOption] = []
+    columns = []
+    load_all_columns = False
+
+    for key, nested_attrs in attrs.items():
+        if key in mapper.relationships:
+            related_class = mapper.relationships[key].mapper.class_
+            options.append(
+                joinedload(getattr(orm_class, key)).options(
+                    *get_load_options(related_class, nested_attrs or {})
+                )
+            )
+        elif key in mapper.column_attrs:
+            columns.append(getattr(orm_class, key))
+        elif f"{key}_id" in mapper.column_attrs:
+            columns.append(getattr(orm_class, f"{key}_id"))
+        else:
+            load_all_columns = True
+
+    if not load_all_columns:
+        options.append(load_only(*columns))
+    options.append(lazyload("*"))
+    return options
+
+
+def set_changed_attrs(item: T, values: dict[str, Any]) -> None:
+    """Set only the attributes of an item whose values differ from the given ones.
+
+    Unchanged items are not marked as dirty this way, so they are skipped when
+    flushing and their `updated` timestamps are kept.
+    """
+    for key, value in values.items():
+        if getattr(item, key) != value:
+            setattr(item, key, value)
+
+
+def get_change_state(item: T) -> Literal["created", "updated", "unchanged"]:
+    """Tell whether an item was created, updated or left unchanged since it was
+    last flushed."""
+    state = inspect(item)
+    if state.pending:
+        return "created"
+    if any(state.attrs[key].history.has_changes() for key in state.committed_state):
+        return "updated"
+    return "unchanged"
+
+
+def upsert_into_db(
+    session: Session, orm_class: Type[T], rows: Iterable[dict[str, Any]]
+) -> None:
+    """Insert the given rows or update the existing ones with the same primary key.
+
+    Unlike adding items which were not found before, this does not fail if another
+    transaction inserts an item with the same primary key in the meantime. Items of
+    the rows already present in the session are expired to reload them.
+    """
+    table = orm_class.__table__
+    primary_key = [column.name for column in table.primary_key]
+    dialect = session.get_bind().dialect.name
+    batch_size = 500
+    if dialect == "sqlite":
+        # Older SQLite builds allow only 999 bound parameters per statement
+        batch_size = max(1, 999 // len(table.columns))
+
+    for batch in batched(rows, batch_size):
+        if dialect in ("sqlite", "postgresql"):
+            insert_ = sqlite_insert if dialect == "sqlite" else postgresql_insert
+            statement = insert_(table).values(batch)
+            update = {
+                k: statement.excluded[k] for k in batch[0] if k not in primary_key
+            }
+            statement = (
+                statement.on_conflict_do_update(index_elements=primary_key, set_=update)
+                if update
+                else statement.on_conflict_do_nothing(index_elements=primary_key)
+            )
+        elif dialect in ("mysql", "mariadb"):
+            statement = mysql_insert(table).values(batch)
+            statement = statement.on_duplicate_key_update(
+                {k: statement.inserted[k] for k in batch[0]}
+            )
+        else:
+            for row in batch:
+                session.merge(orm_class(**row))
+            session.flush()
+            continue
+
+        session.execute(statement)
+        for row in batch:
+            key = tuple(row[k] for k in primary_key)
+            item = session.identity_map.get(identity_key(orm_class, key))
+            if item is not None:
+                session.expire(item)
+
+
 def delete_from_db(session: Session, item: T, skip_flush: bool = False) -> None:
     session.delete(item)
     if not skip_flush:
@@ -442,3 +442,68 @@ class Measure(CommonFieldsMixin, Base):
             return "completed"
         else:
             return self.completion_status
+
+
+class Job(CommonFieldsMixin, Base):
+    __tablename__ = "job"
+    kind = Column(String, nullable=False)
+    owner = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="pending")
+    processed = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    result_filename = Column(String, nullable=True)
+    result_path = Column(String, nullable=True)
+    input_path = Column(String, nullable=True)
+    heartbeat = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class JiraIssueSnapshot(Base):
+    """Local copy of a JIRA issue to list measures without querying JIRA."""
+
+    __tablename__ = "jira_issue_snapshot"
+    id = Column(String, primary_key=True)  # JIRA issue ID
+    key = Column(String, nullable=False)
+    summary = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    issuetype_id = Column(String, nullable=False)
+    issuetype_name = Column(String, nullable=False)
+    project_id = Column(String, nullable=False)
+    project_key = Column(String, nullable=False)
+    project_name = Column(String, nullable=False)
+    status_name = Column(String, nullable=False)
+    status_color_name = Column(String, nullable=False)
+    assignee_id = Column(String, nullable=True)
+    assignee_display_name = Column(String, nullable=True)
+    assignee_email_address = Column(String, nullable=True)
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class JiraUserEntry(Base):
+    """Local copy of a JIRA user to get and search JIRA users without querying JIRA."""
+
+    __tablename__ = "jira_user_entry"
+    id = Column(String, primary_key=True)  # JIRA user ID
+    display_name = Column(String, nullable=False, index=True)
+    email_address = Column(String, nullable=True)
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class JiraAssignableUser(Base):
+    """JIRA user found by a search for users assignable to issues of a JIRA project."""
+
+    __tablename__ = "jira_assignable_user"
+    jira_project_key = Column(String, primary_key=True)
+    jira_user_id = Column(
+        String, ForeignKey("jira_user_entry.id", ondelete="CASCADE"), primary_key=True
+    )
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    jira_user = relationship(JiraUserEntry, lazy="joined")
+
+
+class JiraUserSearch(Base):
+    """Search for assignable JIRA users whose results are completely stored."""
+
+    __tablename__ = "jira_user_search"
+    jira_project_key = Column(String, primary_key=True)
+    search_str = Column(String, primary_key=True)  # lower case
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -16,14 +16,28 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
-from typing import Annotated
+from typing import Annotated, Callable
 
-from fastapi import APIRouter, Depends, Query, Response
-from jira import JIRAError
+from fastapi import APIRouter, Depends, Header, Query, Response
+from jira import JIRA
 from pydantic import Field
+from sqlalchemy.orm import Session
 
+from ..auth import get_jira
 from ..data.jira_ import JiraIssues, JiraIssueTypes, JiraProjects, JiraUsers
-from ..models import JiraIssue, JiraIssueInput, JiraIssueType, JiraProject, JiraUser
+from ..data.jira_snapshots import JiraIssueSnapshots
+from ..data.jira_users import JiraUserDirectory, get_jira_user_directory
+from ..data.jira_webhooks import JiraWebhooks
+from ..data.jobs import Jobs
+from ..models import (
+    JiraIssue,
+    JiraIssueInput,
+    JiraIssueType,
+    JiraProject,
+    JiraUser,
+    JiraWebhookEvent,
+)
+from ..models.jobs import JobOutput
 from ..utils.pagination import Page, page_params
 
 router = APIRouter()
@@ -33,8 +47,10 @@ _kwargs_jira_users = dict(tags=["jira-user"])
 
 
 @router.get("/jira-user", response_model=JiraUser, **_kwargs_jira_users)
-def get_jira_user(jira_user_view: JiraUsers = Depends()):
-    return jira_user_view.get_jira_user()
+def get_jira_user(
+    jira_user_directory: JiraUserDirectory = Depends(get_jira_user_directory),
+):
+    return jira_user_directory.get_jira_user()
 
 
 @router.get(
@@ -47,27 +63,20 @@ def search_jira_users(
     search: str,
     limit: Annotated[int, Field(ge=1)] | None = None,
     jira_projects: JiraProjects = Depends(),
-    jira_users: JiraUsers = Depends(),
+    jira_user_directory: JiraUserDirectory = Depends(get_jira_user_directory),
 ):
     jira_project = jira_projects.get_jira_project(jira_project_id)
-    # Convert iterator to a list to force jira request in search_jira_users()
-    return list(jira_users.search_jira_users(search, jira_project.key, limit=limit))
+    return jira_user_directory.search_jira_users(search, jira_project.key, limit=limit)
 
 
 @router.get("/jira-users", response_model=list[JiraUser], **_kwargs_jira_users)
 def get_specific_jira_users(
-    ids: list[str] = Query(min_length=1), jira_users: JiraUsers = Depends()
+    ids: list[str] = Query(min_length=1),
+    jira_user_directory: JiraUserDirectory = Depends(get_jira_user_directory),
 ):
-    # FIXME: This is an inefficient workaround to get a list of JIRA users by their IDs.
-    # Since the JIRA API does not support querying all users or users by their ids, in a
-    # future release users should be cached and updated on the fly when retrieved from
-    # JIRA.
-    for id in ids:
-        try:
-            yield jira_users.get_jira_user(id)
-        except JIRAError as error:
-            if error.status_code != 404:
-                raise error
+    # The JIRA API does not support querying users by their IDs, so users missing
+    # in the directory are queried one by one, but concurrently
+    return jira_user_directory.get_jira_users(ids)
 
 
 _kwargs_jira_projects = dict(tags=["jira-project"])
@@ -209,3 +218,33 @@ def update_jira_issue(
 )
 def delete_jira_issue(jira_issue_id: str, jira_issues_view: JiraIssues = Depends()):
     jira_issues_view.delete_jira_issue(jira_issue_id)
+
+
+@router.post(
+    "/jira-issue-snapshots/sync-jobs",
+    status_code=202,
+    response_model=JobOutput,
+    **_kwargs_jira_issues,
+)
+def sync_jira_issue_snapshots(
+    jobs: Jobs = Depends(), jira: JIRA = Depends(get_jira)
+) -> JobOutput:
+    def sync(session: Session, report_progress: Callable) -> None:
+        snapshots = JiraIssueSnapshots(JiraIssues(jira), session)
+        snapshots.sync_jira_issue_snapshots(report_progress)
+
+    job = jobs.create_job("sync-jira-issue-snapshots")
+    jobs.submit_job(job, sync)
+    return job
+
+
+@router.post("/jira/webhook", status_code=204, tags=["jira-webhook"])
+def receive_jira_webhook(
+    event: JiraWebhookEvent,
+    secret: str | None = None,
+    x_jira_webhook_secret: Annotated[str | None, Header()] = None,
+    jira_webhooks: JiraWebhooks = Depends(),
+) -> None:
+    # JIRA server webhooks cannot send headers, so the secret can be part of the URL
+    jira_webhooks.check_secret(x_jira_webhook_secret or secret)
+    jira_webhooks.process_event(event)
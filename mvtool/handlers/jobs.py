@@ -0,0 +1,59 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import FileResponse
+
+from ..data.jobs import Jobs
+from ..models.jobs import JobOutput
+from ..utils.errors import ClientError
+
+router = APIRouter(tags=["job"])
+
+
+def _to_job_output(job, jobs: Jobs) -> JobOutput:
+    job_output = JobOutput.model_validate(job)
+    job_output.processed = jobs.get_progress(job)
+    return job_output
+
+
+@router.get("/jobs", response_model=list[JobOutput])
+def get_jobs(jobs: Jobs = Depends()) -> list[JobOutput]:
+    return [_to_job_output(job, jobs) for job in jobs.list_jobs()]
+
+
+@router.get("/jobs/{job_id}", response_model=JobOutput)
+def get_job(job_id: int, jobs: Jobs = Depends()) -> JobOutput:
+    return _to_job_output(jobs.get_job(job_id), jobs)
+
+
+@router.get("/jobs/{job_id}/result", response_class=FileResponse)
+def download_job_result(job_id: int, jobs: Jobs = Depends()) -> FileResponse:
+    job = jobs.get_job(job_id)
+    if job.status != "completed" or not job.result_path:
+        raise ClientError(f"Job with id={job_id} has no result to download.")
+    return FileResponse(
+        job.result_path,
+        filename=job.result_filename,
+        headers={"Content-Type": "application/octet-stream"},  # Enforce download
+    )
+
+
+@router.delete("/jobs/{job_id}", status_code=204)
+def delete_job(job_id: int, jobs: Jobs = Depends()) -> None:
+    job = jobs.get_job(job_id)
+    jobs.delete_job(job)
@@ -18,7 +18,7 @@
 
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import StringConstraints
 from sqlalchemy import Column
 
@@ -273,10 +273,14 @@ def get_measures(
     order_by_clauses=Depends(get_measure_sort),
     page_params=Depends(page_params),
     measures: Measures = Depends(),
+    response: Response = None,
 ):
     measures_list = measures.list_measures(
         where_clauses, order_by_clauses, **page_params
     )
+    if response is not None and measures.jira_unavailable:
+        # Tell the client that JIRA data is outdated or missing
+        response.headers["X-Jira-Unavailable"] = "true"
     if page_params:
         return Page[MeasureOutput](
             items=measures_list,
@@ -0,0 +1,44 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from fastapi import APIRouter, Depends
+
+from ..auth import get_jira
+from ..auth.jira_ import jira_circuit_breaker
+from ..data.jira_ import get_jira_cache_stats, get_jira_requests_in_flight
+from ..db.database import get_pool_stats
+from ..models import CacheMetrics, DatabasePoolMetrics, JiraMetrics, Metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_model=Metrics)
+def get_metrics(_=Depends(get_jira)) -> Metrics:  # get jira to enforce login
+    pool_stats = get_pool_stats()
+    return Metrics(
+        database_pool=(
+            DatabasePoolMetrics.model_validate(pool_stats) if pool_stats else None
+        ),
+        jira=JiraMetrics(
+            circuit_breaker=jira_circuit_breaker.state,
+            requests_in_flight=get_jira_requests_in_flight(),
+            caches={
+                name: CacheMetrics.model_validate(stats)
+                for name, stats in get_jira_cache_stats().items()
+            },
+        ),
+    )
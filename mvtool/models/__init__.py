@@ -39,6 +39,9 @@ from .documents import (
     DocumentOutput,
     DocumentRepresentation,
 )
+from .imports import ImportPreview, ImportRowReport, ImportSummary
+from .jobs import JobOutput
+from .metrics import CacheMetrics, DatabasePoolMetrics, JiraMetrics, Metrics
 from .jira_ import (
     JiraIssue,
     JiraIssueImport,
@@ -48,6 +51,7 @@ from .jira_ import (
     JiraProject,
     JiraProjectImport,
     JiraUser,
+    JiraWebhookEvent,
 )
 from .measures import (
     AbstractMeasureInput,
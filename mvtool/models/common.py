@@ -15,8 +15,7 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import json
-from hashlib import md5
+from hashlib import blake2b
 from typing import Annotated, Any
 
 from pydantic import (
@@ -28,15 +27,57 @@ from pydantic import (
 )
 
 
+def _to_etag_value(value: Any) -> Any:
+    # Nested models are represented by their etag instead of their whole subtree
+    if isinstance(value, ETagMixin):
+        return value.etag
+    if isinstance(value, (list, tuple)):
+        return [_to_etag_value(v) for v in value]
+    return value
+
+
 class ETagMixin(BaseModel):
+    """Mixin providing an etag that identifies a model by its values.
+
+    The etag is computed once and cached until a field of the model is assigned or
+    the etag of a nested model changes. Nested models contribute their own (cached)
+    etags instead of being serialized again.
+    """
+
+    # A slot is used instead of a private attribute, because it is much faster to
+    # access. Its value is neither copied nor pickled, so copies recompute the etag.
+    __slots__ = ("_etag_cache",)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            object.__setattr__(self, "_etag_cache", None)
+
     @property
     def etag(self) -> str:
-        model_json = json.dumps(
-            self.model_dump(),
-            sort_keys=True,
-            ensure_ascii=False,
-        ).encode("utf-8")
-        return md5(model_json).hexdigest()
+        try:
+            cache = self._etag_cache
+        except AttributeError:
+            cache = None
+
+        # Use cached etag if the etags of the nested models did not change
+        if cache is not None:
+            etag, children = cache
+            if all(child.etag == child_etag for child, child_etag in children):
+                return etag
+
+        # Pydantic keeps the field values in __dict__ in the order of the fields
+        values = [_to_etag_value(value) for value in self.__dict__.values()]
+        etag = blake2b(repr(values).encode("utf-8"), digest_size=16).hexdigest()
+
+        # Remember the nested models, whose etags are part of the etag
+        children = []
+        for value in self.__dict__.values():
+            for item in value if isinstance(value, (list, tuple)) else (value,):
+                if isinstance(item, ETagMixin):
+                    children.append((item, item.etag))
+        object.__setattr__(self, "_etag_cache", (etag, tuple(children)))
+        return etag
 
     def __eq__(self, other: Any):
         return isinstance(other, self.__class__) and self.etag == other.etag
@@ -0,0 +1,40 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class ImportSummary(BaseModel):
+    count: int
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+
+class ImportRowReport(BaseModel):
+    row: int
+    action: Literal["create", "update"] | None = None  # None if blank or invalid
+    errors: list[str] = []
+
+
+class ImportPreview(BaseModel):
+    created: int = 0
+    updated: int = 0
+    invalid: int = 0
+    rows: list[ImportRowReport] = []
@@ -15,7 +15,9 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from pydantic import ConfigDict, BaseModel
+from typing import Any
+
+from pydantic import ConfigDict, BaseModel, Field
 
 
 class JiraUser(BaseModel):
@@ -69,3 +71,9 @@ class JiraIssue(BaseModel):
     project: JiraProject
     status: JiraIssueStatus
     url: str
+
+
+class JiraWebhookEvent(BaseModel):
+    # Payload sent by JIRA webhooks, properties not needed are ignored
+    webhook_event: str = Field(alias="webhookEvent")
+    issue: dict[str, Any] | None = None
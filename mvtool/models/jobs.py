@@ -0,0 +1,33 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class JobOutput(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    created: datetime
+    updated: datetime
+    kind: str
+    status: str
+    processed: int
+    error: str | None = None
+    result_filename: str | None = None
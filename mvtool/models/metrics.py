@@ -0,0 +1,51 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from pydantic import BaseModel, ConfigDict
+
+
+class DatabasePoolMetrics(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_time: float  # seconds
+    max_wait_time: float
+    mean_wait_time: float
+
+
+class CacheMetrics(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    hits: int
+    misses: int
+    size: int
+    hit_rate: float
+
+
+class JiraMetrics(BaseModel):
+    circuit_breaker: str
+    requests_in_flight: int
+    caches: dict[str, CacheMetrics]
+
+
+class Metrics(BaseModel):
+    database_pool: DatabasePoolMetrics | None  # None if connections are not pooled
+    jira: JiraMetrics
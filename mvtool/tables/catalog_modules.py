@@ -42,6 +42,7 @@ from .handlers import (
     get_export_labels_handler,
     hide_columns,
 )
+from .validation import validation_params
 
 
 def get_catalog_module_columns(
@@ -118,6 +119,7 @@ def _get_upload_catalog_modules_dataframe_handler(
         df: DataFrame = Depends(get_uploaded_dataframe),
         skip_blanks: bool = False,  # skip blank cells
         dry_run: bool = False,  # don't save to database
+        validation_params=Depends(validation_params),
         session: Session = Depends(get_session),
     ) -> list[CatalogModule]:
         fallback_catalog = (
@@ -128,7 +130,7 @@ def _get_upload_catalog_modules_dataframe_handler(
 
         # Import data frame into database
         catalog_module_imports = columns.import_from_dataframe(
-            df, skip_none=skip_blanks
+            df, skip_none=skip_blanks, **validation_params
         )
         catalog_modules = list(
             catalog_modules_view.bulk_create_update_catalog_modules(
@@ -45,6 +45,7 @@ from .handlers import (
     hide_columns,
 )
 from .rw_excel import write_excel
+from .validation import validation_params
 
 
 def get_catalog_requirement_columns(
@@ -124,6 +125,7 @@ def _get_upload_catalog_requirements_dataframe_handler(
         df: DataFrame = Depends(get_uploaded_dataframe),
         skip_blanks: bool = False,  # skip blank cells
         dry_run: bool = False,  # don't save to database
+        validation_params=Depends(validation_params),
         session: Session = Depends(get_session),
     ) -> list[CatalogRequirement]:
         fallback_catalog_module = (
@@ -134,7 +136,7 @@ def _get_upload_catalog_requirements_dataframe_handler(
 
         # Import data frame into database
         catalog_requirement_imports = columns.import_from_dataframe(
-            df, skip_none=skip_blanks
+            df, skip_none=skip_blanks, **validation_params
         )
         catalog_requirements = list(
             catalog_requirements_view.bulk_create_update_catalog_requirements(
@@ -35,6 +35,7 @@ from .handlers import (
     get_export_labels_handler,
     hide_columns,
 )
+from .validation import validation_params
 
 
 def get_catalog_columns() -> ColumnGroup[CatalogImport, Catalog]:
@@ -95,10 +96,13 @@ def _get_upload_catalogs_dataframe_handler(
         df: DataFrame = Depends(get_uploaded_dataframe),
         skip_blanks: bool = False,  # skip blank cells
         dry_run: bool = False,  # don't save to database
+        validation_params=Depends(validation_params),
         session: Session = Depends(get_session),
     ) -> list[Catalog]:
         # Import data frame into database
-        catalog_imports = columns.import_from_dataframe(df, skip_none=skip_blanks)
+        catalog_imports = columns.import_from_dataframe(
+            df, skip_none=skip_blanks, **validation_params
+        )
         catalogs = list(
             catalogs_view.bulk_create_update_catalogs(
                 catalog_imports, patch=True, skip_flush=dry_run
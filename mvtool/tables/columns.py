@@ -15,13 +15,17 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Collection, Generator, Generic, Iterable, Iterator, TypeVar
+import itertools
+import os
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Collection, Generator, Generic, Iterable, Iterator, TypeVar
 
 from pydantic import BaseModel, ValidationError
 
 from ..utils.errors import ValueHttpError
-from ..utils.iteration import CachedIterable
-from .dataframe import Cell, DataFrame
+from ..utils.iteration import CachedIterable, batched
+from .dataframe import Cell, DataFrame, Row
 
 E = TypeVar("E", bound=BaseModel)  # Export model
 I = TypeVar("I", bound=BaseModel)  # Import model
@@ -51,12 +55,20 @@ class RowValidationError(ValueHttpError):
     Attributes:
         column_group (ColumnGroup): The column group associated with the validation error.
         validation_error (ValidationError): The validation error from Pydantic.
+        row_number (int | None): The number of the row in the file, if known.
     """
 
     def __init__(
-        self, column_group: "ColumnGroup", validation_error: ValidationError
+        self,
+        column_group: "ColumnGroup",
+        validation_error: ValidationError,
+        row_number: int | None = None,
     ) -> None:
+        self.column_group = column_group
+        self.validation_error = validation_error
+        self.row_number = row_number
         columns = {c.attr_name: c for c in column_group.columns if c.attr_name}
+        prefix = f"Row {row_number}: " if row_number is not None else ""
         messages = []
 
         for error in validation_error.errors():
@@ -64,9 +76,11 @@ class RowValidationError(ValueHttpError):
             message = error["msg"]
             column = columns.get(attr_name, None)
             if column is not None:
-                messages.append(f'Invalid value in "{column.label}": f{message}')
+                messages.append(
+                    f'{prefix}Invalid value in "{column.label}": f{message}'
+                )
             else:
-                messages.append(message)
+                messages.append(prefix + message)
 
         super().__init__(messages)
 
@@ -80,6 +94,7 @@ class Column:
         mode (int | None): The mode of the column (import/export, import only, or export only).
         required (bool): Whether the column is required for import (default: False).
         hidden (bool): Whether the column is hidden for export and not required for import columns (default: False).
+        value_type (type | None): The type of the exported values, only needed if the attribute is not a field of the import model.
     """
 
     IMPORT_EXPORT = 0
@@ -93,12 +108,14 @@ class Column:
         mode: int | None = None,
         required: bool = False,  # only used for import
         hidden: bool = False,  # only used for export and not required import columns
+        value_type: type | None = None,  # only used for export
     ):
         self.label = label
         self.attr_name = attr_name
         self._mode = mode or self.IMPORT_EXPORT
         self.required = required
         self.hidden = hidden
+        self.value_type = value_type
 
     @property
     def is_export(self) -> bool:
@@ -217,6 +234,45 @@ class ColumnGroup(Generic[I, E]):
             else:
                 yield from column.import_labels
 
+    @property
+    def export_attrs(self) -> "dict[str, dict | None]":
+        """Get the attribute names of the export columns of the column group.
+
+        Returns:
+            dict[str, dict | None]: A dict mapping the attribute names of export
+                columns to None and those of column groups with export columns to
+                their export attributes.
+        """
+        export_attrs = {}
+        for column in self.export_columns:
+            if isinstance(column, Column):
+                export_attrs[column.attr_name] = None
+            elif column.is_export:
+                export_attrs[column.attr_name] = column.export_attrs
+        return export_attrs
+
+    @property
+    def export_types(self) -> "dict[str, Any]":
+        """Get the types of the values of the export columns of the column group.
+
+        The type of a column is its value type or, if not set, the annotation of the
+        corresponding field of the import model. Unknown types are Any.
+
+        Returns:
+            dict[str, Any]: A dict mapping the labels of export columns to the types
+                of their values.
+        """
+        export_types = {}
+        for column in self.export_columns:
+            if isinstance(column, Column):
+                field = self.import_model.model_fields.get(column.attr_name)
+                export_types[f"{self.label} {column.label}"] = column.value_type or (
+                    field.annotation if field is not None else Any
+                )
+            else:
+                export_types.update(column.export_types)
+        return export_types
+
     def hide_columns(self, labels: Collection[str] | None = None) -> None:
         """Hide or unhide columns in the column group based on the provided labels.
 
@@ -327,18 +383,147 @@ class ColumnGroup(Generic[I, E]):
         except ValidationError as e:
             raise RowValidationError(self, e)
 
-    def import_from_dataframe(self, df: DataFrame, skip_none=True) -> Iterator[I]:
+    def import_from_dataframe(
+        self,
+        df: DataFrame,
+        skip_none=True,
+        executor: Executor | None = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[I]:
         """Import data from a Pandas DataFrame using the import columns of the column
         group and create instances of the import model.
 
         Args:
             df (pd.DataFrame): A Pandas DataFrame containing the data to import.
             skip_nan (bool, optional): Ignore cells with NaN values. Defaults to True.
+            executor (Executor | None, optional): Executor to validate the rows in
+                parallel, see `import_from_rows`. Defaults to None.
+            chunk_size (int, optional): Number of rows per parallel task. Defaults to
+                1000.
+
+        Returns:
+            Iterator[I]: An iterator of instances of the import model.
+        """
+        return self.import_from_rows(df, skip_none, executor, chunk_size)
+
+    def import_from_rows(
+        self,
+        rows: Iterable[Row],
+        skip_none=True,
+        executor: Executor | None = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[I]:
+        """Import data from an iterable of rows using the import columns of the column
+        group and create instances of the import model.
+
+        In contrast to `import_from_dataframe`, the rows are processed one by one, so
+        that rows streamed from a file do not have to be loaded into memory at once.
+
+        If an executor is given, the rows are validated in chunks by the executor,
+        e.g. a process pool to use all cores. The instances are still returned in the
+        order of the rows. Inputs that fit into a single chunk are validated directly,
+        as the overhead of passing them to the executor would outweigh the gain.
+
+        Args:
+            rows (Iterable[Row]): An iterable of rows, each being an iterable of cells.
+            skip_none (bool, optional): Ignore cells with None values. Defaults to True.
+            executor (Executor | None, optional): Executor to validate the rows in
+                parallel. Defaults to None.
+            chunk_size (int, optional): Number of rows per parallel task. Defaults to
+                1000.
 
         Returns:
             Iterator[I]: An iterator of instances of the import model.
+
+        Raises:
+            RowValidationError: If a row is invalid. The rows are numbered as in the
+                file, i.e. the first row after the header row is row 2.
+        """
+        if executor is None:
+            return self._import_from_rows(rows, skip_none)
+        return self._import_from_rows_parallel(rows, skip_none, executor, chunk_size)
+
+    def validate_rows(
+        self, rows: Iterable[Row], skip_none=True
+    ) -> Iterator[tuple[int, I | None, list[str]]]:
+        """Validate an iterable of rows without stopping at invalid rows.
+
+        Args:
+            rows (Iterable[Row]): An iterable of rows, each being an iterable of cells.
+            skip_none (bool, optional): Ignore cells with None values. Defaults to True.
+
+        Returns:
+            Iterator[tuple[int, I | None, list[str]]]: An iterator of the row number,
+                the instance of the import model (None if the row is blank or
+                invalid) and the validation error messages of each row.
+
+        Raises:
+            MissingColumnsError: If required columns are missing, as this affects all
+                rows.
         """
-        for row in df:
+        for row_number, row in enumerate(rows, start=2):
             if skip_none:
                 row = (cell for cell in row if cell.value is not None)
-            yield self.import_from_row(row)
+            try:
+                yield row_number, self.import_from_row(row), []
+            except RowValidationError as e:
+                yield row_number, None, e.detail
+
+    def _import_from_rows(
+        self, rows: Iterable[Row], skip_none: bool, first_row_number: int = 2
+    ) -> Iterator[I]:
+        for row_number, row in enumerate(rows, start=first_row_number):
+            if skip_none:
+                row = (cell for cell in row if cell.value is not None)
+            try:
+                import_obj = self.import_from_row(row)
+            except RowValidationError as e:
+                raise RowValidationError(
+                    e.column_group, e.validation_error, row_number
+                ) from e
+            yield import_obj
+
+    def _import_from_rows_parallel(
+        self,
+        rows: Iterable[Row],
+        skip_none: bool,
+        executor: Executor,
+        chunk_size: int,
+    ) -> Iterator[I]:
+        # Cells of rows from a DataFrame are generators and have to be materialized
+        chunks = ([list(row) for row in chunk] for chunk in batched(rows, chunk_size))
+
+        # Validate small inputs directly
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            return
+        if len(first_chunk) < chunk_size:
+            yield from self._import_from_rows(first_chunk, skip_none)
+            return
+
+        # Keep a limited number of chunks in flight to bound the memory consumption
+        max_pending = 2 * (os.cpu_count() or 1)
+        pending: deque[Future] = deque()
+        first_row_number = 2
+        for chunk in itertools.chain([first_chunk], chunks):
+            pending.append(
+                executor.submit(
+                    _import_rows_chunk, self, chunk, skip_none, first_row_number
+                )
+            )
+            first_row_number += len(chunk)
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+
+def _import_rows_chunk(
+    column_group: ColumnGroup,
+    rows: list[list[Cell]],
+    skip_none: bool,
+    first_row_number: int,
+) -> list:
+    """Import a chunk of rows, this is run by the executor of parallel imports."""
+    return list(column_group._import_from_rows(rows, skip_none, first_row_number))
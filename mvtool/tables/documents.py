@@ -38,6 +38,7 @@ from .handlers import (
 )
 from .projects import get_project_only_columns
 from .status import get_status_columns
+from .validation import validation_params
 
 
 def get_document_only_columns() -> ColumnGroup[DocumentImport, Document]:
@@ -114,6 +115,7 @@ def _get_upload_documents_dataframe_handler(
         df: DataFrame = Depends(get_uploaded_dataframe),
         skip_blanks: bool = False,  # skip blank cells
         dry_run: bool = False,  # don't save to database
+        validation_params=Depends(validation_params),
         session: Session = Depends(get_session),
     ) -> list[Document]:
         fallback_project = (
@@ -123,7 +125,9 @@ def _get_upload_documents_dataframe_handler(
         )
 
         # Import data frame into database
-        document_imports = columns.import_from_dataframe(df, skip_none=skip_blanks)
+        document_imports = columns.import_from_dataframe(
+            df, skip_none=skip_blanks, **validation_params
+        )
         documents = list(
             documents_view.bulk_create_update_documents(
                 document_imports, fallback_project, patch=True, skip_flush=dry_run
@@ -16,25 +16,32 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
-from typing import Callable
+from contextlib import contextmanager
+from typing import IO, Callable, Iterable, Iterator
 
 from fastapi import APIRouter, Depends, Query, Response
 from fastapi.responses import FileResponse
 from starlette.background import BackgroundTask
 
 from ..auth import get_jira
-from ..utils.temp_file import copy_upload_to_temp_file, get_temp_file
+from ..utils.temp_file import (
+    copy_upload_to_persistent_temp_file,
+    copy_upload_to_temp_file,
+    get_temp_file,
+)
 from .columns import ColumnGroup
-from .dataframe import DataFrame
+from .dataframe import DataFrame, Row
 from .rw_csv import (
     CSVDialect,
     EncodingOption,
     get_encoding_options,
+    iter_csv,
     read_csv,
     sniff_csv_dialect,
     write_csv,
 )
-from .rw_excel import read_excel, write_excel
+from .rw_arrow import write_arrow, write_parquet
+from .rw_excel import iter_excel, read_excel, write_excel
 
 
 def hide_columns(get_columns: Callable) -> Callable:
@@ -75,6 +82,59 @@ def get_dataframe_from_uploaded_csv(
     return read_csv(temp_file, encoding, dialect)
 
 
+def get_rows_from_uploaded_excel(
+    temp_file=Depends(copy_upload_to_temp_file),
+) -> Iterator[Row]:
+    return iter_excel(temp_file)
+
+
+def get_rows_from_uploaded_csv(
+    temp_file=Depends(copy_upload_to_temp_file),
+    encoding: str = "utf-8-sig",
+    sniff_dialect: bool = True,
+    dialect=Depends(CSVDialect),
+) -> Iterator[Row]:
+    if sniff_dialect:
+        dialect = sniff_csv_dialect(temp_file, encoding, dialect.delimiter)
+    return iter_csv(temp_file, encoding, dialect)
+
+
+class UploadedRows:
+    """Rows of an uploaded file that can be read after the request has finished.
+
+    The uploaded file is kept, which allows to import it in a background job. The
+    job owns the file and removes it.
+    """
+
+    def __init__(self, filename: str, read_rows: Callable[[IO[bytes]], Iterator[Row]]):
+        self.filename = filename
+        self._read_rows = read_rows
+
+    @contextmanager
+    def open(self) -> Iterator[Iterator[Row]]:
+        with open(self.filename, "rb") as file_obj:
+            yield self._read_rows(file_obj)
+
+
+def get_uploaded_rows_from_excel(
+    temp_file=Depends(copy_upload_to_persistent_temp_file),
+) -> UploadedRows:
+    return UploadedRows(temp_file.name, iter_excel)
+
+
+def get_uploaded_rows_from_csv(
+    temp_file=Depends(copy_upload_to_persistent_temp_file),
+    encoding: str = "utf-8-sig",
+    sniff_dialect: bool = True,
+    dialect=Depends(CSVDialect),
+) -> UploadedRows:
+    if sniff_dialect:
+        dialect = sniff_csv_dialect(temp_file, encoding, dialect.delimiter)
+    return UploadedRows(
+        temp_file.name, lambda file_obj: iter_csv(file_obj, encoding, dialect)
+    )
+
+
 def get_uploaded_dataframe_handler(format: str) -> Callable:
     if format == "excel":
         return get_dataframe_from_uploaded_excel
@@ -125,6 +185,64 @@ def get_download_csv_handler(
     return handler
 
 
+def get_download_parquet_handler(
+    get_columns: Callable,
+    get_objects: Callable,
+    filename="data.parquet",
+) -> Callable:
+    def handler(
+        columns: ColumnGroup = Depends(get_columns),
+        objs: Iterable = Depends(get_objects),
+        temp_file=Depends(get_temp_file(".parquet", delete=False)),
+        filename=filename,
+    ) -> FileResponse:
+        write_parquet(columns, objs, temp_file.name)
+        return FileResponse(
+            temp_file.name,
+            background=BackgroundTask(os.remove, temp_file.name),  # Delete temp file
+            filename=filename,
+            media_type="application/vnd.apache.parquet",
+        )
+
+    return handler
+
+
+def get_download_arrow_handler(
+    get_columns: Callable,
+    get_objects: Callable,
+    filename="data.arrow",
+) -> Callable:
+    def handler(
+        columns: ColumnGroup = Depends(get_columns),
+        objs: Iterable = Depends(get_objects),
+        temp_file=Depends(get_temp_file(".arrow", delete=False)),
+        filename=filename,
+    ) -> FileResponse:
+        write_arrow(columns, objs, temp_file.name)
+        return FileResponse(
+            temp_file.name,
+            background=BackgroundTask(os.remove, temp_file.name),  # Delete temp file
+            filename=filename,
+            media_type="application/vnd.apache.arrow.file",
+        )
+
+    return handler
+
+
+def get_excel_writer(sheet_name="Data") -> Callable:
+    def get_writer() -> Callable[[DataFrame, IO[bytes]], None]:
+        return lambda df, file_obj: write_excel(df, file_obj, sheet_name)
+
+    return get_writer
+
+
+def get_csv_writer(
+    encoding="utf-8-sig",
+    dialect=Depends(CSVDialect),
+) -> Callable[[DataFrame, IO[bytes]], None]:
+    return lambda df, file_obj: write_csv(df, file_obj, encoding, dialect)
+
+
 router = APIRouter(tags=["common"])
 
 
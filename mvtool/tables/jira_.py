@@ -26,8 +26,8 @@ def get_jira_project_columns() -> ColumnGroup[JiraProjectImport, JiraProject]:
         "Jira Project",
         [
             Column("Key", "key", required=True),
-            Column("Name", "name", Column.EXPORT_ONLY),
-            Column("Link", "url", Column.EXPORT_ONLY),
+            Column("Name", "name", Column.EXPORT_ONLY, value_type=str),
+            Column("Link", "url", Column.EXPORT_ONLY, value_type=str),
         ],
     )
 
@@ -38,6 +38,6 @@ def get_jira_issue_columns() -> ColumnGroup[JiraIssueImport, JiraIssue]:
         "Jira Issue",
         [
             Column("Key", "key", required=True),
-            Column("Link", "url", Column.EXPORT_ONLY),
+            Column("Link", "url", Column.EXPORT_ONLY, value_type=str),
         ],
     )
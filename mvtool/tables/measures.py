@@ -15,31 +15,59 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Callable
+import os
+from tempfile import NamedTemporaryFile
+from typing import IO, Annotated, Any, Callable, Iterator
 
 from fastapi import APIRouter, Depends
 from fastapi.responses import FileResponse
+from jira import JIRA
+from pydantic import Field
 from sqlalchemy.orm import Session
 
-from ..db.database import get_session
-from ..db.schema import Measure
+from ..auth import get_jira
+from ..data.jobs import Jobs
+from ..db.database import get_load_options, get_session
+from ..db.schema import CatalogModule, Measure, Requirement
 from ..handlers.catalog_modules import CatalogModules
+from ..handlers.catalog_requirements import CatalogRequirements
+from ..handlers.catalogs import Catalogs
+from ..handlers.documents import Documents
+from ..handlers.jira_ import JiraIssues, JiraProjects
 from ..handlers.measures import Measures, get_measure_filters, get_measure_sort
+from ..handlers.projects import Projects
 from ..handlers.requirements import Requirements
-from ..models import MeasureImport, MeasureOutput
+from ..models import (
+    ImportPreview,
+    ImportSummary,
+    JobOutput,
+    MeasureImport,
+    MeasureOutput,
+)
 from .columns import Column, ColumnGroup
-from .dataframe import DataFrame
+from .dataframe import DataFrame, Row
 from .documents import get_document_only_columns
 from .handlers import (
+    UploadedRows,
     get_dataframe_from_uploaded_csv,
     get_dataframe_from_uploaded_excel,
     get_download_csv_handler,
+    get_download_arrow_handler,
     get_download_excel_handler,
+    get_download_parquet_handler,
     get_export_labels_handler,
+    get_csv_writer,
+    get_excel_writer,
+    get_rows_from_uploaded_csv,
+    get_rows_from_uploaded_excel,
+    get_uploaded_rows_from_csv,
+    get_uploaded_rows_from_excel,
     hide_columns,
 )
 from .jira_ import get_jira_issue_columns
+from .preview import check_import, preview_import
 from .requirements import get_requirement_without_status_columns
+from .validation import validation_params
 
 
 def get_measure_columns(
@@ -83,13 +111,56 @@ router.get(
 )(get_export_labels_handler(get_measure_columns))
 
 
-def _get_measures_dataframe(
+def _get_measure_export_params(columns: ColumnGroup) -> dict[str, Any]:
+    """Get the params to list only the measure data needed by the export columns."""
+    attrs = columns.export_attrs
+    requirement_attrs = attrs.get("requirement") or {}
+    document_attrs = attrs.get("document") or {}
+    requirement_project_attrs = requirement_attrs.get("project") or {}
+    document_project_attrs = document_attrs.get("project") or {}
+    query_jira = (
+        "jira_issue" in attrs
+        or "jira_project" in requirement_project_attrs
+        or "jira_project" in document_project_attrs
+    )
+
+    # Jira issues are cached by their ids and Jira projects are set on the projects
+    # of requirements and documents, so these have to be loaded as well
+    if query_jira:
+        attrs["jira_issue_id"] = None
+        attrs["requirement"] = {
+            **requirement_attrs,
+            "project": {**requirement_project_attrs, "jira_project": None},
+        }
+        attrs["document"] = {
+            **document_attrs,
+            "project": {**document_project_attrs, "jira_project": None},
+        }
+
+    return dict(
+        query_jira=query_jira,
+        options=get_load_options(Measure, attrs),
+    )
+
+
+_get_measure_export_columns = hide_columns(get_measure_columns)
+
+
+def _list_measures_to_export(
     measures: Measures = Depends(),
     where_clauses=Depends(get_measure_filters),
     sort_clauses=Depends(get_measure_sort),
-    columns: ColumnGroup = Depends(hide_columns(get_measure_columns)),
+    columns: ColumnGroup = Depends(_get_measure_export_columns),
+) -> list[Measure]:
+    return measures.list_measures(
+        where_clauses, sort_clauses, **_get_measure_export_params(columns)
+    )
+
+
+def _get_measures_dataframe(
+    measure_list: list[Measure] = Depends(_list_measures_to_export),
+    columns: ColumnGroup = Depends(_get_measure_export_columns),
 ) -> DataFrame:
-    measure_list = measures.list_measures(where_clauses, sort_clauses)
     return columns.export_to_dataframe(measure_list)
 
 
@@ -111,6 +182,47 @@ router.get(
     response_class=FileResponse,
 )(get_download_csv_handler(_get_measures_dataframe, filename="measures.csv"))
 
+router.get(
+    "/parquet/measures",
+    summary="Get measures as Parquet file",
+    response_class=FileResponse,
+)(
+    get_download_parquet_handler(
+        _get_measure_export_columns,
+        _list_measures_to_export,
+        filename="measures.parquet",
+    )
+)
+
+router.get(
+    "/arrow/measures",
+    summary="Get measures as Arrow IPC file",
+    response_class=FileResponse,
+)(
+    get_download_arrow_handler(
+        _get_measure_export_columns,
+        _list_measures_to_export,
+        filename="measures.arrow",
+    )
+)
+
+
+def _get_measure_fallbacks(
+    fallback_requirement: Requirement | None,
+    fallback_catalog_module: CatalogModule | None,
+) -> set[str]:
+    """Get the names of the fields for which fallback items are provided."""
+    fallbacks = set()
+    if fallback_requirement is not None:
+        fallbacks.add("requirement")
+        if fallback_requirement.project is not None:
+            fallbacks.add("project")
+    if fallback_catalog_module is not None:
+        fallbacks.add("catalog_module")
+        if fallback_catalog_module.catalog is not None:
+            fallbacks.add("catalog")
+    return fallbacks
+
 
 def _get_upload_measures_dataframe_handler(
     get_uploaded_dataframe: Callable,
@@ -125,6 +237,7 @@ def _get_upload_measures_dataframe_handler(
         df: DataFrame = Depends(get_uploaded_dataframe),
         skip_blanks: bool = False,  # skip blank cells
         dry_run: bool = False,  # don't save to database
+        validation_params=Depends(validation_params),
         session: Session = Depends(get_session),
     ) -> list[Measure]:
         fallback_requirement = (
@@ -138,24 +251,30 @@ def _get_upload_measures_dataframe_handler(
             else None
         )
 
+        # Only validate the data frame if dry run
+        if dry_run:
+            check_import(
+                session,
+                columns,
+                df,
+                skip_blanks,
+                _get_measure_fallbacks(fallback_requirement, fallback_catalog_module),
+            )
+            return []
+
         # Import the data frame
-        measure_imports = columns.import_from_dataframe(df, skip_none=skip_blanks)
-        measures = list(
+        measure_imports = columns.import_from_dataframe(
+            df, skip_none=skip_blanks, **validation_params
+        )
+        return list(
             measures_view.bulk_create_update_measures(
                 measure_imports,
                 fallback_requirement,
                 fallback_catalog_module,
                 patch=True,
-                skip_flush=dry_run,
             )
         )
 
-        # Rollback if dry run
-        if dry_run:
-            session.rollback()
-            return []
-        return measures
-
     return upload_measures_dataframe
 
 
@@ -172,3 +291,268 @@ router.post(
     status_code=201,
     response_model=list[MeasureOutput],
 )(_get_upload_measures_dataframe_handler(get_dataframe_from_uploaded_csv))
+
+
+def _get_stream_upload_measures_handler(get_uploaded_rows: Callable) -> Callable:
+    def stream_upload_measures(
+        fallback_requirement_id: int | None = None,
+        fallback_catalog_module_id: int | None = None,
+        measures_view: Measures = Depends(),
+        requirements_view: Requirements = Depends(),
+        catalog_modules_view: CatalogModules = Depends(),
+        columns: ColumnGroup = Depends(get_measure_columns),
+        rows: Iterator[Row] = Depends(get_uploaded_rows),
+        skip_blanks: bool = False,  # skip blank cells
+        dry_run: bool = False,  # don't save to database
+        validation_params=Depends(validation_params),
+        batch_size: Annotated[int, Field(ge=1)] = 1000,  # rows per flush
+        session: Session = Depends(get_session),
+    ) -> ImportSummary:
+        fallback_requirement = (
+            requirements_view.get_requirement(fallback_requirement_id)
+            if fallback_requirement_id is not None
+            else None
+        )
+        fallback_catalog_module = (
+            catalog_modules_view.get_catalog_module(fallback_catalog_module_id)
+            if fallback_catalog_module_id is not None
+            else None
+        )
+
+        # Only validate the rows if dry run
+        if dry_run:
+            preview = check_import(
+                session,
+                columns,
+                rows,
+                skip_blanks,
+                _get_measure_fallbacks(fallback_requirement, fallback_catalog_module),
+            )
+            return ImportSummary(
+                count=preview.created + preview.updated,
+                created=preview.created,
+                updated=preview.updated,
+            )
+
+        # Stream the rows through validation into the database
+        measure_imports = columns.import_from_rows(
+            rows, skip_none=skip_blanks, **validation_params
+        )
+        return measures_view.stream_create_update_measures(
+            measure_imports,
+            fallback_requirement,
+            fallback_catalog_module,
+            patch=True,
+            batch_size=batch_size,
+        )
+
+    return stream_upload_measures
+
+
+router.post(
+    "/excel/measures/stream",
+    summary="Upload measures from Excel file in batches",
+    status_code=201,
+    response_model=ImportSummary,
+)(_get_stream_upload_measures_handler(get_rows_from_uploaded_excel))
+
+router.post(
+    "/csv/measures/stream",
+    summary="Upload measures from CSV file in batches",
+    status_code=201,
+    response_model=ImportSummary,
+)(_get_stream_upload_measures_handler(get_rows_from_uploaded_csv))
+
+
+def _get_preview_measures_handler(get_uploaded_rows: Callable) -> Callable:
+    def preview_measures(
+        fallback_requirement_id: int | None = None,
+        fallback_catalog_module_id: int | None = None,
+        requirements_view: Requirements = Depends(),
+        catalog_modules_view: CatalogModules = Depends(),
+        columns: ColumnGroup = Depends(get_measure_columns),
+        rows: Iterator[Row] = Depends(get_uploaded_rows),
+        skip_blanks: bool = False,  # skip blank cells
+        session: Session = Depends(get_session),
+    ) -> ImportPreview:
+        fallback_requirement = (
+            requirements_view.get_requirement(fallback_requirement_id)
+            if fallback_requirement_id is not None
+            else None
+        )
+        fallback_catalog_module = (
+            catalog_modules_view.get_catalog_module(fallback_catalog_module_id)
+            if fallback_catalog_module_id is not None
+            else None
+        )
+        return preview_import(
+            session,
+            columns,
+            rows,
+            skip_blanks,
+            _get_measure_fallbacks(fallback_requirement, fallback_catalog_module),
+        )
+
+    return preview_measures
+
+
+router.post(
+    "/excel/measures/preview",
+    summary="Preview the upload of measures from Excel file",
+    response_model=ImportPreview,
+)(_get_preview_measures_handler(get_rows_from_uploaded_excel))
+
+router.post(
+    "/csv/measures/preview",
+    summary="Preview the upload of measures from CSV file",
+    response_model=ImportPreview,
+)(_get_preview_measures_handler(get_rows_from_uploaded_csv))
+
+
+def _create_views(
+    jira: JIRA, session: Session
+) -> tuple[Measures, Requirements, CatalogModules]:
+    """Create the views needed by jobs, which run outside of a request."""
+    projects = Projects(JiraProjects(jira), session)
+    catalog_modules = CatalogModules(Catalogs(session, None), session)
+    requirements = Requirements(
+        projects, CatalogRequirements(catalog_modules, session), session
+    )
+    documents = Documents(projects, session)
+    measures = Measures(JiraIssues(jira), requirements, documents, session)
+    return measures, requirements, catalog_modules
+
+
+def _get_import_measures_job_handler(get_uploaded_rows: Callable) -> Callable:
+    def import_measures_job(
+        fallback_requirement_id: int | None = None,
+        fallback_catalog_module_id: int | None = None,
+        columns: ColumnGroup = Depends(get_measure_columns),
+        uploaded_rows: UploadedRows = Depends(get_uploaded_rows),
+        skip_blanks: bool = False,  # skip blank cells
+        dry_run: bool = False,  # don't save to database
+        validation_params=Depends(validation_params),
+        batch_size: Annotated[int, Field(ge=1)] = 1000,  # rows per flush
+        jobs: Jobs = Depends(),
+        jira: JIRA = Depends(get_jira),
+    ) -> JobOutput:
+        def import_measures(session: Session, report_progress: Callable) -> None:
+            measures_view, requirements_view, catalog_modules_view = _create_views(
+                jira, session
+            )
+            with uploaded_rows.open() as rows:
+                fallback_requirement = (
+                    requirements_view.get_requirement(fallback_requirement_id)
+                    if fallback_requirement_id is not None
+                    else None
+                )
+                fallback_catalog_module = (
+                    catalog_modules_view.get_catalog_module(fallback_catalog_module_id)
+                    if fallback_catalog_module_id is not None
+                    else None
+                )
+
+                # Only validate the rows if dry run
+                if dry_run:
+                    preview = check_import(
+                        session,
+                        columns,
+                        rows,
+                        skip_blanks,
+                        _get_measure_fallbacks(
+                            fallback_requirement, fallback_catalog_module
+                        ),
+                    )
+                    report_progress(len(preview.rows))
+                    return
+
+                # Stream the rows through validation into the database
+                measure_imports = columns.import_from_rows(
+                    rows, skip_none=skip_blanks, **validation_params
+                )
+                measures_view.stream_create_update_measures(
+                    measure_imports,
+                    fallback_requirement,
+                    fallback_catalog_module,
+                    patch=True,
+                    batch_size=batch_size,
+                    report_progress=report_progress,
+                )
+
+        job = jobs.create_job("import-measures", input_path=uploaded_rows.filename)
+        jobs.submit_job(job, import_measures)
+        return job
+
+    return import_measures_job
+
+
+router.post(
+    "/excel/measures/jobs",
+    summary="Upload measures from Excel file in a background job",
+    status_code=202,
+    response_model=JobOutput,
+)(_get_import_measures_job_handler(get_uploaded_rows_from_excel))
+
+router.post(
+    "/csv/measures/jobs",
+    summary="Upload measures from CSV file in a background job",
+    status_code=202,
+    response_model=JobOutput,
+)(_get_import_measures_job_handler(get_uploaded_rows_from_csv))
+
+
+def _get_export_measures_job_handler(get_writer: Callable, filename: str) -> Callable:
+    def export_measures_job(
+        where_clauses=Depends(get_measure_filters),
+        sort_clauses=Depends(get_measure_sort),
+        columns: ColumnGroup = Depends(hide_columns(get_measure_columns)),
+        write: Callable[[DataFrame, IO[bytes]], None] = Depends(get_writer),
+        jobs: Jobs = Depends(),
+        jira: JIRA = Depends(get_jira),
+    ) -> JobOutput:
+        def export_measures(session: Session, report_progress: Callable) -> str:
+            measures_view, _, _ = _create_views(jira, session)
+            measure_list = measures_view.list_measures(
+                where_clauses, sort_clauses, **_get_measure_export_params(columns)
+            )
+
+            def iter_measures() -> Iterator[Measure]:
+                for count, measure in enumerate(measure_list, start=1):
+                    yield measure
+                    report_progress(count)
+
+            # Write the result to a file, which is deleted together with the job
+            suffix = "." + filename.rsplit(".", 1)[-1]
+            with NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
+                try:
+                    write(columns.export_to_dataframe(iter_measures()), temp_file)
+                except Exception:
+                    temp_file.close()
+                    os.remove(temp_file.name)
+                    raise
+            return temp_file.name
+
+        job = jobs.create_job("export-measures", result_filename=filename)
+        jobs.submit_job(job, export_measures)
+        return job
+
+    return export_measures_job
+
+
+router.post(
+    "/excel/measures/export-jobs",
+    summary="Get measures as Excel file in a background job",
+    status_code=202,
+    response_model=JobOutput,
+)(
+    _get_export_measures_job_handler(
+        get_excel_writer(sheet_name="Measures"), filename="measures.xlsx"
+    )
+)
+
+router.post(
+    "/csv/measures/export-jobs",
+    summary="Get measures as CSV file in a background job",
+    status_code=202,
+    response_model=JobOutput,
+)(_get_export_measures_job_handler(get_csv_writer, filename="measures.csv"))
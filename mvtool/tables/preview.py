@@ -0,0 +1,99 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from typing import Collection, Iterable
+
+from sqlalchemy.orm import Session
+
+from ..data.import_planner import ImportPlanner
+from ..models.imports import ImportPreview, ImportRowReport
+from ..utils.errors import ValueHttpError
+from ..utils.iteration import batched
+from .columns import ColumnGroup
+from .dataframe import Row
+
+
+def preview_import(
+    session: Session,
+    columns: ColumnGroup,
+    rows: Iterable[Row],
+    skip_none: bool = True,
+    fallbacks: Collection[str] = (),
+    batch_size: int = 1000,
+) -> ImportPreview:
+    """Validate rows and resolve their references without writing to the database.
+
+    The rows are validated one by one and the ids they refer to are looked up in
+    batches with read-only queries, one per table and batch. No items are created
+    or updated, so no write locks are taken. Jira issues and projects referenced
+    by the rows are not checked.
+
+    Args:
+        session (Session): The session to look up the referenced items.
+        columns (ColumnGroup): The column group to validate the rows.
+        rows (Iterable[Row]): The rows to be previewed.
+        skip_none (bool, optional): Ignore cells with None values. Defaults to True.
+        fallbacks (Collection[str], optional): The names of the fields for which a
+            fallback item is provided, e.g. "requirement". Defaults to ().
+        batch_size (int, optional): Number of rows per lookup. Defaults to 1000.
+
+    Returns:
+        ImportPreview: The number of items to be created and updated, the number of
+            invalid rows and a report for each row.
+    """
+    preview = ImportPreview()
+
+    for batch in batched(columns.validate_rows(rows, skip_none), batch_size):
+        planner = ImportPlanner(session)
+        planner.add_imports(import_obj for _, import_obj, _ in batch)
+        loaded_items = planner.load()  # keep loaded items referenced
+
+        for row_number, import_obj, errors in batch:
+            report = ImportRowReport(row=row_number, errors=errors)
+            if import_obj is not None:
+                report.errors = planner.check_references(import_obj, fallbacks)
+                if not report.errors:
+                    report.action = "create" if import_obj.id is None else "update"
+
+            if report.errors:
+                preview.invalid += 1
+            elif report.action == "create":
+                preview.created += 1
+            elif report.action == "update":
+                preview.updated += 1
+            preview.rows.append(report)
+
+    return preview
+
+
+def check_import(
+    session: Session,
+    columns: ColumnGroup,
+    rows: Iterable[Row],
+    skip_none: bool = True,
+    fallbacks: Collection[str] = (),
+) -> ImportPreview:
+    """Preview an import like `preview_import` and raise an error for invalid rows.
+
+    Raises:
+        ValueHttpError: If any row is invalid, listing the errors of all rows.
+    """
+    preview = preview_import(session, columns, rows, skip_none, fallbacks)
+    messages = [f"Row {r.row}: {e}" for r in preview.rows for e in r.errors]
+    if messages:
+        raise ValueHttpError(messages)
+    return preview
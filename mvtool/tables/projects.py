@@ -35,6 +35,7 @@ from .handlers import (
 )
 from .jira_ import get_jira_project_columns
 from .status import get_status_columns
+from .validation import validation_params
 
 
 def get_project_only_columns(
@@ -107,10 +108,13 @@ def _get_upload_projects_dataframe_handler(
         df: DataFrame = Depends(get_uploaded_dataframe),
         skip_blanks: bool = False,  # skip blank cells
         dry_run: bool = False,  # don't save to database
+        validation_params=Depends(validation_params),
         session: Session = Depends(get_session),
     ) -> list[Project]:
         # Import the data frame
-        project_imports = columns.import_from_dataframe(df, skip_none=skip_blanks)
+        project_imports = columns.import_from_dataframe(
+            df, skip_none=skip_blanks, **validation_params
+        )
         projects = list(
             projects_view.bulk_create_update_projects(
                 project_imports, patch=True, skip_flush=dry_run
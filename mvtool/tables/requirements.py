@@ -45,6 +45,7 @@ from .handlers import (
 )
 from .projects import get_project_only_columns
 from .status import get_status_columns
+from .validation import validation_params
 
 
 def get_requirement_only_columns() -> ColumnGroup[RequirementImport, Requirement]:
@@ -135,6 +136,7 @@ def _get_upload_requirements_dataframe_handler(
         df: DataFrame = Depends(get_uploaded_dataframe),
         skip_blanks: bool = False,  # skip blank cells
         dry_run: bool = False,  # don't save to database
+        validation_params=Depends(validation_params),
         session: Session = Depends(get_session),
     ) -> list[Requirement]:
         fallback_project = (
@@ -149,7 +151,9 @@ def _get_upload_requirements_dataframe_handler(
         )
 
         # Import the data frame
-        requirement_imports = columns.import_from_dataframe(df, skip_none=skip_blanks)
+        requirement_imports = columns.import_from_dataframe(
+            df, skip_none=skip_blanks, **validation_params
+        )
         requirements = list(
             requirements_view.bulk_create_update_requirements(
                 requirement_imports,
@@ -0,0 +1,163 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+from datetime import date, datetime
+from types import UnionType
+from typing import IO, Annotated, Any, Iterable, Iterator, Union, get_args, get_origin
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..utils.iteration import batched
+from .columns import ColumnGroup
+
+_ARROW_TYPES = {
+    bool: pa.bool_(),
+    int: pa.int64(),
+    float: pa.float64(),
+    str: pa.string(),
+    date: pa.date32(),
+    datetime: pa.timestamp("us"),
+}
+
+_DICTIONARY_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+# Pattern of strings constrained to a few choices, like "^(C|PC|NC|N/A)$"
+_CHOICES_PATTERN = re.compile(r"\^\(([\w /-]+(?:\|[\w /-]+)*)\)\$")
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    if get_origin(annotation) in (Union, UnionType):
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        return args[0] if len(args) == 1 else Any
+    return annotation
+
+
+def _get_choices(annotation: Any) -> list[str] | None:
+    """Get the choices of a string annotation constrained to a pattern of choices."""
+    annotation = _unwrap_optional(annotation)
+    if get_origin(annotation) is not Annotated:
+        return None
+    _, *metadata = get_args(annotation)
+    for item in metadata:
+        match = _CHOICES_PATTERN.fullmatch(getattr(item, "pattern", None) or "")
+        if match is not None:
+            return match.group(1).split("|")
+    return None
+
+
+def _to_arrow_field(label: str, annotation: Any) -> pa.Field:
+    """Convert the type of the values of a column to an Arrow field.
+
+    Strings constrained to a few choices, like status columns, are dictionary-encoded.
+    Values of unknown types are written as strings.
+    """
+    annotation = _unwrap_optional(annotation)
+    if _get_choices(annotation) is not None:
+        return pa.field(label, _DICTIONARY_TYPE)
+    if get_origin(annotation) is Annotated:
+        annotation = get_args(annotation)[0]
+    return pa.field(label, _ARROW_TYPES.get(annotation, pa.string()))
+
+
+def get_arrow_schema(columns: ColumnGroup) -> pa.Schema:
+    """Get the Arrow schema of the export columns of a column group.
+
+    The schema only depends on the columns, so all exports of the same columns have
+    the same schema, including columns without values.
+    """
+    return pa.schema(
+        _to_arrow_field(label, annotation)
+        for label, annotation in columns.export_types.items()
+    )
+
+
+class _RecordBatchBuilder:
+    """Builds record batches of a fixed schema from objects exported to rows.
+
+    The dictionaries of dictionary-encoded columns are only extended, so that the
+    record batches can be written to Arrow IPC files as dictionary deltas.
+    """
+
+    def __init__(self, columns: ColumnGroup):
+        self._columns = columns
+        self.schema = get_arrow_schema(columns)
+        self._dictionaries: dict[str, dict[str, int]] = {}
+        for label, annotation in columns.export_types.items():
+            if self.schema.field(label).type == _DICTIONARY_TYPE:
+                choices = _get_choices(annotation) or []
+                self._dictionaries[label] = {c: i for i, c in enumerate(choices)}
+
+    def _to_arrow_array(self, field: pa.Field, values: list[Any]) -> pa.Array:
+        dictionary = self._dictionaries.get(field.name)
+        if dictionary is not None:
+            indices = [
+                None if v is None else dictionary.setdefault(str(v), len(dictionary))
+                for v in values
+            ]
+            return pa.DictionaryArray.from_arrays(
+                pa.array(indices, pa.int32()), pa.array(list(dictionary), pa.string())
+            )
+        if field.type == pa.string():
+            values = [None if v is None else str(v) for v in values]
+        return pa.array(values, field.type)
+
+    def build(self, objs: list[Any]) -> pa.RecordBatch:
+        data = {label: [None] * len(objs) for label in self.schema.names}
+        for index, obj in enumerate(objs):
+            for cell in self._columns.export_to_row(obj):
+                data[cell.label][index] = cell.value
+        return pa.record_batch(
+            [self._to_arrow_array(field, data[field.name]) for field in self.schema],
+            schema=self.schema,
+        )
+
+    def iter_batches(
+        self, objs: Iterable[Any], batch_size: int
+    ) -> Iterator[pa.RecordBatch]:
+        for batch in batched(objs, batch_size):
+            yield self.build(batch)
+
+
+def write_parquet(
+    columns: ColumnGroup,
+    objs: Iterable[Any],
+    file_obj: str | IO[bytes],
+    batch_size: int = 10000,
+):
+    """Writes objects exported by the columns to a Parquet file with one row group
+    per batch of objects. Only one batch is kept in memory at a time."""
+    builder = _RecordBatchBuilder(columns)
+    with pq.ParquetWriter(file_obj, builder.schema) as writer:
+        for batch in builder.iter_batches(objs, batch_size):
+            writer.write_batch(batch)
+
+
+def write_arrow(
+    columns: ColumnGroup,
+    objs: Iterable[Any],
+    file_obj: str | IO[bytes],
+    batch_size: int = 10000,
+):
+    """Writes objects exported by the columns to an Arrow IPC file in record batches.
+    Only one batch is kept in memory at a time."""
+    builder = _RecordBatchBuilder(columns)
+    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+    with pa.ipc.new_file(file_obj, builder.schema, options=options) as writer:
+        for batch in builder.iter_batches(objs, batch_size):
+            writer.write_batch(batch)
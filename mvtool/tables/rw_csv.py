@@ -15,13 +15,13 @@
 
 import codecs
 import csv
-from typing import Annotated, BinaryIO
+from typing import Annotated, BinaryIO, Iterator
 
 from pydantic import BaseModel, StringConstraints
 
 from ..utils.errors import ValueHttpError
 from ..utils.temp_file import preserved_cursor_position
-from .dataframe import DataFrame
+from .dataframe import Cell, DataFrame, Row
 
 
 class EncodingOption(BaseModel):
@@ -244,6 +244,51 @@ def read_csv(
     return df
 
 
+def iter_csv(
+    file_obj: BinaryIO,
+    encoding: str = "utf-8-sig",  # Use UTF-8 with BOM to be compatible with Excel
+    dialect: CSVDialect | None = None,
+) -> Iterator[Row]:
+    """Read the rows of a CSV file one by one without loading them into a DataFrame,
+    so that large files can be processed in bounded memory."""
+    try:
+        csv_stream_reader = codecs.getreader(encoding)(file_obj)
+    except LookupError:
+        raise ValueHttpError(f"Unsupported encoding: {encoding}")
+
+    csv_reader = csv.reader(
+        csv_stream_reader,
+        **(dialect.to_dialect_kwargs() if dialect else {}),
+        strict=True,
+    )
+
+    def iter_rows():
+        try:
+            labels = next(csv_reader, None)
+            if labels is None:
+                return  # The file is empty
+
+            for values in csv_reader:
+                if len(values) > len(labels):
+                    raise ValueHttpError(
+                        f"Error reading CSV due to: line {csv_reader.line_num} "
+                        "contains more values than the header"
+                    )
+                yield [
+                    # represent empty strings as None
+                    Cell(l, None if isinstance(v, str) and v.strip() == "" else v)
+                    for l, v in zip(labels, values)
+                ]
+        except UnicodeDecodeError as e:
+            raise ValueHttpError(
+                f"Error decoding the CSV file using the '{encoding}' encoding: {str(e)}"
+            )
+        except csv.Error as e:
+            raise ValueHttpError(f"Error reading CSV due to: {str(e)}")
+
+    return iter_rows()
+
+
 def write_csv(
     df: DataFrame,
     file_obj: BinaryIO,
@@ -14,14 +14,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import re
-from typing import IO
+from typing import IO, Iterator
 
 from openpyxl import Workbook, load_workbook
 from openpyxl.worksheet.table import Table
 from openpyxl.worksheet.worksheet import Worksheet
 
 from ..utils.errors import ValueHttpError
-from .dataframe import Cell, DataFrame
+from .dataframe import Cell, DataFrame, Row
 
 
 def _iter_rows(worksheet: Worksheet):
@@ -34,19 +34,38 @@ def _iter_rows(worksheet: Worksheet):
             yield (Cell(l, v) for l, v in zip(labels, values))
 
 
-def read_excel(file_obj: str | IO[bytes]) -> DataFrame:
+def _load_workbook(file_obj: str | IO[bytes]) -> Workbook:
     # carefully open the Excel file
     try:
-        workbook = load_workbook(file_obj, read_only=True)
+        return load_workbook(file_obj, read_only=True)
     except Exception:
         # have to catch all exceptions, because openpyxl does raise several
         # exceptions when reading an invalid Excel file
         raise ValueHttpError("Excel file seems to be corrupted")
 
+
+def read_excel(file_obj: str | IO[bytes]) -> DataFrame:
+    workbook = _load_workbook(file_obj)
+
     # Load data from workbook
     return DataFrame(_iter_rows(workbook.active))
 
 
+def iter_excel(file_obj: str | IO[bytes]) -> Iterator[Row]:
+    """Read the rows of an Excel file one by one without loading them into a
+    DataFrame, so that large files can be processed in bounded memory."""
+    # Open the workbook before iterating, so that corrupted files are detected early
+    workbook = _load_workbook(file_obj)
+
+    def iter_rows():
+        try:
+            yield from _iter_rows(workbook.active)
+        finally:
+            workbook.close()
+
+    return iter_rows()
+
+
 def write_excel(
     df: DataFrame, file_obj: str | IO[bytes], sheet_name: str | None = None
 ):
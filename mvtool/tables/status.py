@@ -18,16 +18,30 @@ from .columns import Column
 
 def get_completion_columns() -> tuple[Column]:
     return (
-        Column("Open Count", "open_count", Column.EXPORT_ONLY),
-        Column("In Progress Count", "in_progress_count", Column.EXPORT_ONLY),
-        Column("Completed Count", "completed_count", Column.EXPORT_ONLY),
-        Column("Completion Progress", "completion_progress", Column.EXPORT_ONLY),
+        Column("Open Count", "open_count", Column.EXPORT_ONLY, value_type=int),
+        Column(
+            "In Progress Count", "in_progress_count", Column.EXPORT_ONLY, value_type=int
+        ),
+        Column(
+            "Completed Count", "completed_count", Column.EXPORT_ONLY, value_type=int
+        ),
+        Column(
+            "Completion Progress",
+            "completion_progress",
+            Column.EXPORT_ONLY,
+            value_type=float,
+        ),
     )
 
 
 def get_verification_columns() -> tuple[Column]:
     return (
-        Column("Verification Progress", "verification_progress", Column.EXPORT_ONLY),
+        Column(
+            "Verification Progress",
+            "verification_progress",
+            Column.EXPORT_ONLY,
+            value_type=float,
+        ),
     )
 
 
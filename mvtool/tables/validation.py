@@ -0,0 +1,58 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from ..config import ImportsConfig
+
+
+class _State:
+    executor: ProcessPoolExecutor | None = None
+    chunk_size: int = 1000
+
+
+def setup_validation_executor(
+    imports_config: ImportsConfig,
+) -> ProcessPoolExecutor | None:
+    """Set up the process pool validating imported rows in parallel.
+
+    No process pool is set up if only a single worker is available, in which case
+    the rows are validated in the process handling the request.
+    """
+    workers = imports_config.validation_workers or os.cpu_count() or 1
+    if _State.executor is None and workers > 1:
+        # Forking a process running threads is unsafe, so spawn the workers instead
+        _State.executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    _State.chunk_size = imports_config.validation_chunk_size
+    return _State.executor
+
+
+def shutdown_validation_executor():
+    if _State.executor is not None:
+        _State.executor.shutdown(cancel_futures=True)
+        _State.executor = None
+
+
+def validation_params() -> dict[str, Any]:
+    if _State.executor is None:
+        return dict()
+    return dict(executor=_State.executor, chunk_size=_State.chunk_size)
@@ -0,0 +1,201 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from threading import Lock, Thread
+from typing import Callable, Generic, Hashable, TypeVar
+
+from cachetools import TTLCache
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class SharedCache(Generic[K, V]):
+    """Thread-safe TTL cache to share data across requests.
+
+    If the cache is full, the least recently used entries are evicted. Lookups are
+    counted to monitor the hit rate of the cache. If refresh_after is set, entries
+    loaded with get_or_load are reloaded in the background once they are older than
+    refresh_after seconds, while the cached value is still returned. Expired entries
+    are kept for another max_stale seconds to be read with get_stale.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1000,
+        ttl: float = 60,
+        refresh_after: float | None = None,
+        max_stale: float = 0,
+    ):
+        self._lock = Lock()
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl + max_stale)
+        self._ttl = ttl
+        self._refresh_after = refresh_after
+        self._refreshing: set[K] = set()
+        self._hits = 0
+        self._misses = 0
+
+    def configure(
+        self,
+        maxsize: int,
+        ttl: float,
+        refresh_after: float | None = None,
+        max_stale: float = 0,
+    ) -> None:
+        """Set size and time to live of the cache. Cached entries are dropped."""
+        with self._lock:
+            self._cache = TTLCache(maxsize=maxsize, ttl=ttl + max_stale)
+            self._ttl = ttl
+            self._refresh_after = refresh_after
+
+    def _lookup(self, key: K) -> tuple[V, float] | None:
+        entry = self._cache.get(key)
+        if entry is not None and time.monotonic() - entry[1] >= self._ttl:
+            entry = None  # expired, but kept for get_stale
+        if entry is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return entry
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        with self._lock:
+            entry = self._lookup(key)
+        return default if entry is None else entry[0]
+
+    def get_stale(self, key: K, default: V | None = None) -> V | None:
+        """Get the value from the cache even if it is expired, but not yet dropped."""
+        with self._lock:
+            entry = self._cache.get(key)
+        return default if entry is None else entry[0]
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._cache[key] = (value, time.monotonic())
+
+    def get_or_load(self, key: K, load: Callable[[], V]) -> V:
+        """Get the value from the cache or load and cache it if it is missing."""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                value, loaded_at = entry
+                refresh = (
+                    self._refresh_after is not None
+                    and time.monotonic() - loaded_at >= self._refresh_after
+                    and key not in self._refreshing
+                )
+                if refresh:
+                    self._refreshing.add(key)
+
+        if entry is None:
+            value = load()
+            self.set(key, value)
+        elif refresh:
+            Thread(target=self._refresh, args=(key, load), daemon=True).start()
+        return value
+
+    def _refresh(self, key: K, load: Callable[[], V]) -> None:
+        try:
+            self.set(key, load())
+        except Exception:
+            # Keep the cached value until it expires
+            logger.exception("Failed to refresh cache entry %r", key)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[K], bool]) -> None:
+        """Delete all entries whose key matches the predicate."""
+        with self._lock:
+            for key in [k for k in self._cache.keys() if predicate(k)]:
+                del self._cache[key]
+
+    def clear(self) -> None:
+        """Drop all entries and reset the statistics."""
+        with self._lock:
+            self._cache.clear()
+            self._hits = 0
+            self._misses = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            self._cache.expire()
+            return CacheStats(self._hits, self._misses, len(self._cache))
+
+
+class SingleFlight(Generic[K, V]):
+    """Runs a function only once at a time for the same key.
+
+    Callers with the same key arriving while the function is running wait for it
+    and share its result or exception instead of running the function again.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: dict[K, Future] = {}
+
+    def do(self, key: K, fn: Callable[[], V]) -> V:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                leader = False
+            else:
+                leader = True
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
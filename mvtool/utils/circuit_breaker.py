@@ -0,0 +1,113 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import time
+from threading import Lock
+from typing import Callable, Literal, TypeVar
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Fails fast instead of calling a remote service which keeps failing.
+
+    After failure_threshold failed calls in a row, the circuit opens and calls
+    raise CircuitOpenError without calling the service. After reset_timeout
+    seconds, a single trial call is let through. If it succeeds, the circuit
+    closes again, otherwise it stays open for another reset_timeout seconds.
+    Errors for which is_failure returns False are passed through and count as
+    success, since the service responded.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        is_failure: Callable[[Exception], bool] = lambda _: True,
+    ):
+        self._lock = Lock()
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._is_failure = is_failure
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_running = False
+
+    def configure(self, failure_threshold: int, reset_timeout: float) -> None:
+        """Set the thresholds and close the circuit."""
+        with self._lock:
+            self._failure_threshold = failure_threshold
+            self._reset_timeout = reset_timeout
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    @property
+    def state(self) -> Literal["closed", "open", "half-open"]:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            elif self._trial_running or (
+                time.monotonic() - self._opened_at >= self._reset_timeout
+            ):
+                return "half-open"
+            else:
+                return "open"
+
+    def _before_call(self) -> bool:
+        """Raises CircuitOpenError or returns whether the call is a trial call."""
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if (
+                self._trial_running
+                or time.monotonic() - self._opened_at < self._reset_timeout
+            ):
+                raise CircuitOpenError("Circuit is open")
+            self._trial_running = True
+            return True
+
+    def _after_call(self, failed: bool, trial: bool) -> None:
+        with self._lock:
+            if trial:
+                self._trial_running = False
+            if not failed:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._opened_at is not None or (
+                self._failures >= self._failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+
+    def call(self, fn: Callable[[], T]) -> T:
+        trial = self._before_call()
+        try:
+            result = fn()
+        except Exception as error:
+            self._after_call(self._is_failure(error), trial)
+            raise
+        self._after_call(False, trial)
+        return result
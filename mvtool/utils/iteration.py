@@ -42,3 +42,29 @@ class CachedIterable(Generic[T]):
                 break
             self.cache.append(item)
             yield item
+
+
+def batched(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Split an iterable into consecutive batches of at most the given size.
+
+    Only one batch is kept in memory at a time, so this can be used to process
+    iterables of arbitrary length in bounded memory.
+
+    Args:
+        iterable (Iterable[T]): The iterable to split into batches.
+        size (int): The maximum number of elements in a batch.
+
+    Returns:
+        Iterator[list[T]]: An iterator of batches.
+    """
+    if size < 1:
+        raise ValueError("size must be at least 1")
+
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -71,3 +71,23 @@ def copy_upload_to_temp_file(
     shutil.copyfileobj(upload_file.file, temp_file.file)
     temp_file.file.seek(0)  # Reset cursor after copying
     return temp_file
+
+
+def copy_upload_to_persistent_temp_file(
+    upload_file: UploadFile,
+    temp_file: _TemporaryFileWrapper = Depends(get_temp_file(delete=False)),
+) -> _TemporaryFileWrapper:
+    """Copies the contents of an upload file to a temporary file that is kept.
+
+    Unlike copy_upload_to_temp_file(), the temporary file is not deleted at the end
+    of the request, so that it can be processed afterwards. The caller is responsible
+    for deleting it.
+
+    Args:
+        upload_file (UploadFile): The upload file to copy.
+        temp_file (NamedTemporaryFile, optional): The temporary file to copy to.
+
+    Returns:
+        NamedTemporaryFile: The temporary file.
+    """
+    return copy_upload_to_temp_file(upload_file, temp_file)
@@ -29,6 +29,12 @@ from mvtool.config import (
     LdapAttributeConfig,
     LdapConfig,
 )
+from mvtool.auth.cache import clear_session_caches
+from mvtool.auth.credentials import verified_credentials
+from mvtool.auth.jira_ import jira_circuit_breaker
+from mvtool.auth.ldap_ import close_ldap_pool
+from mvtool.auth.token import clear_credentials_cache
+from mvtool.data.jira_ import clear_jira_caches
 from mvtool.db import database
 from mvtool.db.schema import Catalog, CatalogModule, Project, Requirement
 from mvtool.handlers.catalog_modules import CatalogModules
@@ -55,6 +61,18 @@ from mvtool.models.jira_ import JiraIssueType, JiraProject
 from mvtool.utils.temp_file import get_temp_file
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Prevents data cached across requests from leaking into other tests."""
+    yield
+    clear_jira_caches()
+    clear_credentials_cache()
+    clear_session_caches()
+    verified_credentials.clear()
+    close_ldap_pool()
+    jira_circuit_breaker.reset()
+
+
 @pytest.fixture
 def config():
     return Config(
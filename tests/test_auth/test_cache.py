@@ -13,9 +13,17 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from dataclasses import asdict
 from unittest.mock import Mock, patch
 
-from mvtool.auth.cache import cache_session, get_cached_session
+from mvtool.auth.cache import (
+    cache_session,
+    get_cached_identity,
+    get_cached_session,
+    setup_session_store,
+)
+from mvtool.auth.ldap_ import LdapJiraDummy, LdapUserDetails
+from mvtool.config import AuthConfig
 
 
 def test_cache_jira():
@@ -35,3 +43,31 @@ def test_get_cached_jira():
 def test_get_cached_jira_fails():
     with patch("mvtool.auth.cache._sessions_cache", {}):
         assert get_cached_session("token") is None
+
+
+def test_cache_session_stores_identity():
+    ldap_user_details = LdapUserDetails("user", email="user@example.com")
+    cache_session("token", LdapJiraDummy(ldap_user_details))
+    cache_session("other token", Mock())
+
+    assert get_cached_identity("token") == dict(
+        source="ldap", user=asdict(ldap_user_details)
+    )
+    assert get_cached_identity("other token") == dict(source="jira")
+    assert get_cached_identity("unknown token") is None
+
+
+def test_setup_session_store(tmp_path):
+    auth_config = AuthConfig(
+        session_store="sqlite",
+        session_store_filename=str(tmp_path / "sessions.sqlite"),
+    )
+    setup_session_store(auth_config)
+    try:
+        cache_session("token", Mock())
+        # Another worker shares the identity, but not the connection
+        setup_session_store(auth_config)
+        assert get_cached_session("token") is None
+        assert get_cached_identity("token") == dict(source="jira")
+    finally:
+        setup_session_store(AuthConfig())
@@ -0,0 +1,101 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from mvtool.auth.credentials import VerifiedCredentials
+
+
+def _assert_backoff(credentials: VerifiedCredentials, retry_after: str) -> None:
+    with pytest.raises(HTTPException) as error_info:
+        credentials.check_backoff("user", "wrong")
+    assert error_info.value.status_code == 429
+    assert error_info.value.headers == {"Retry-After": retry_after}
+
+
+def test_verified_credentials_get_identity():
+    credentials = VerifiedCredentials()
+    credentials.set_identity("user", "password", dict(source="jira"))
+
+    assert credentials.get_identity("user", "password") == dict(source="jira")
+    assert credentials.get_identity("user", "wrong") is None
+    assert credentials.get_identity("other", "password") is None
+
+
+def test_verified_credentials_do_not_keep_password():
+    credentials = VerifiedCredentials()
+    credentials.set_identity("user", "password", dict(source="jira"))
+
+    salt, digest, _ = credentials._verified["user"]
+    assert len(salt) == 16
+    assert b"password" not in digest
+
+
+def test_verified_credentials_expire():
+    credentials = VerifiedCredentials(ttl=0.01)
+    credentials.set_identity("user", "password", dict(source="jira"))
+    time.sleep(0.02)
+    assert credentials.get_identity("user", "password") is None
+
+
+def test_verified_credentials_disabled():
+    credentials = VerifiedCredentials(ttl=0)
+    credentials.set_identity("user", "password", dict(source="jira"))
+    assert credentials.get_identity("user", "password") is None
+
+
+def test_failed_credentials_backoff():
+    credentials = VerifiedCredentials(backoff=2, max_backoff=5)
+    with patch("mvtool.auth.credentials.time.monotonic", return_value=1000):
+        credentials.check_backoff("user", "wrong")
+        credentials.add_failure("user", "wrong")
+        _assert_backoff(credentials, "2")
+        credentials.add_failure("user", "wrong")
+        _assert_backoff(credentials, "4")
+        credentials.add_failure("user", "wrong")
+        _assert_backoff(credentials, "5")
+
+        # Other credentials of the user are not rejected
+        credentials.check_backoff("user", "password")
+
+    with patch("mvtool.auth.credentials.time.monotonic", return_value=1005):
+        credentials.check_backoff("user", "wrong")
+
+
+def test_failed_credentials_reset_on_success():
+    credentials = VerifiedCredentials()
+    credentials.add_failure("user", "wrong")
+    credentials.set_identity("user", "password", dict(source="jira"))
+    credentials.check_backoff("user", "wrong")
+
+
+def test_failed_credentials_backoff_of_other_credentials():
+    credentials = VerifiedCredentials(backoff=2)
+    with patch("mvtool.auth.credentials.time.monotonic", return_value=1000):
+        credentials.add_failure("user", "wrong")
+        credentials.add_failure("user", "wrong")
+        credentials.add_failure("user", "also wrong")
+
+        # The failures of the previous credentials do not count
+        credentials.check_backoff("user", "wrong")
+        with pytest.raises(HTTPException) as error_info:
+            credentials.check_backoff("user", "also wrong")
+        assert error_info.value.headers == {"Retry-After": "2"}
@@ -13,9 +13,16 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from dataclasses import asdict
 from unittest.mock import DEFAULT, Mock, patch
 
-from mvtool.auth import get_jira, login_for_access_token
+import pytest
+from fastapi import HTTPException
+
+from mvtool.auth import _authenticate_user, get_jira, login_for_access_token
+from mvtool.auth.credentials import verified_credentials
+from mvtool.auth.ldap_ import LdapJiraDummy, LdapUserDetails
+from mvtool.utils.errors import UnauthorizedError
 
 
 def test_get_jira(config):
@@ -66,3 +73,127 @@ def test_login_for_access_token(config):
         )
         mocks["create_token"].assert_called_once_with("user", "password", config.auth)
         mocks["cache_session"].assert_called_once_with("token", jira_mock)
+
+
+def test_get_jira_restores_verified_ldap_user(config):
+    identity = dict(source="ldap", user=dict(login="user", email="user@example.com"))
+    with patch.multiple(
+        "mvtool.auth",
+        get_credentials_from_token=DEFAULT,
+        get_cached_identity=DEFAULT,
+        _authenticate_user=DEFAULT,
+        cache_session=DEFAULT,
+    ) as mocks:
+        mocks["get_credentials_from_token"].return_value = ("user", "password")
+        mocks["get_cached_identity"].return_value = identity
+
+        for result in get_jira("token", config):
+            break
+
+        assert isinstance(result, LdapJiraDummy)
+        assert result.myself()["emailAddress"] == "user@example.com"
+        mocks["_authenticate_user"].assert_not_called()
+        mocks["cache_session"].assert_called_once_with(
+            "token", result, store_identity=False
+        )
+
+
+def test_get_jira_restores_verified_jira_user(config):
+    with patch.multiple(
+        "mvtool.auth",
+        get_credentials_from_token=DEFAULT,
+        get_cached_identity=DEFAULT,
+        authenticate_jira_user=DEFAULT,
+        authenticate_ldap_user=DEFAULT,
+    ) as mocks:
+        mocks["get_credentials_from_token"].return_value = ("user", "password")
+        mocks["get_cached_identity"].return_value = dict(source="jira")
+        jira_mock = Mock()
+        mocks["authenticate_jira_user"].return_value = jira_mock
+
+        for result in get_jira("token", config):
+            break
+
+        assert result is jira_mock
+        mocks["authenticate_jira_user"].assert_called_once_with(
+            "user", "password", config.jira
+        )
+        mocks["authenticate_ldap_user"].assert_not_called()
+
+
+def test_get_jira_authenticates_user_of_unconfigured_source(config):
+    config.ldap = None
+    with patch.multiple(
+        "mvtool.auth",
+        get_credentials_from_token=DEFAULT,
+        get_cached_identity=DEFAULT,
+        _authenticate_user=DEFAULT,
+    ) as mocks:
+        mocks["get_credentials_from_token"].return_value = ("user", "password")
+        mocks["get_cached_identity"].return_value = dict(
+            source="ldap", user=dict(login="user")
+        )
+        jira_mock = Mock()
+        mocks["_authenticate_user"].return_value = jira_mock
+
+        for result in get_jira("token", config):
+            break
+
+        assert result is jira_mock
+        mocks["_authenticate_user"].assert_called_once_with("user", "password", config)
+
+
+def test_get_jira_restores_user_with_verified_credentials(config):
+    verified_credentials.set_identity(
+        "user", "password", dict(source="ldap", user=dict(login="user"))
+    )
+    with patch.multiple(
+        "mvtool.auth",
+        get_credentials_from_token=DEFAULT,
+        _authenticate_user=DEFAULT,
+    ) as mocks:
+        mocks["get_credentials_from_token"].return_value = ("user", "password")
+
+        for result in get_jira("token", config):
+            break
+
+        assert isinstance(result, LdapJiraDummy)
+        mocks["_authenticate_user"].assert_not_called()
+
+
+def test_authenticate_user_remembers_verified_credentials(config):
+    with patch("mvtool.auth.authenticate_ldap_user") as authenticate_ldap_user_mock:
+        ldap_user = LdapJiraDummy(LdapUserDetails(login="user"))
+        authenticate_ldap_user_mock.return_value = ldap_user
+
+        assert _authenticate_user("user", "password", config) is ldap_user
+
+    assert verified_credentials.get_identity("user", "password") == dict(
+        source="ldap", user=asdict(ldap_user.ldap_user_details)
+    )
+
+
+def test_authenticate_user_remembers_only_validated_jira_credentials(config):
+    config.ldap = None
+    with patch("mvtool.auth.authenticate_jira_user"):
+        _authenticate_user("user", "password", config)
+        assert verified_credentials.get_identity("user", "password") is None
+
+        _authenticate_user("user", "password", config, validate_credentials=True)
+        assert verified_credentials.get_identity("user", "password") == dict(
+            source="jira"
+        )
+
+
+def test_authenticate_user_backs_off_failed_credentials(config):
+    config.ldap = None
+    with patch("mvtool.auth.authenticate_jira_user") as authenticate_jira_user_mock:
+        authenticate_jira_user_mock.side_effect = UnauthorizedError("Unauthorized")
+        with pytest.raises(HTTPException) as error_info:
+            _authenticate_user("user", "wrong", config, validate_credentials=True)
+        assert error_info.value.status_code == 401
+
+        with pytest.raises(HTTPException) as error_info:
+            _authenticate_user("user", "wrong", config, validate_credentials=True)
+        assert error_info.value.status_code == 429
+        authenticate_jira_user_mock.assert_called_once()
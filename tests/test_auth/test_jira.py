@@ -16,10 +16,29 @@
 from unittest.mock import Mock, patch
 
 import pytest
+import requests
 from fastapi import HTTPException
 from jira import JIRAError
 
-from mvtool.auth.jira_ import authenticate_jira_user
+from mvtool.auth import jira_
+from mvtool.auth.jira_ import (
+    authenticate_jira_user,
+    call_jira,
+    create_jira_connection,
+    is_jira_unavailable,
+    jira_circuit_breaker,
+    setup_jira_circuit_breaker,
+)
+from mvtool.config import JiraConfig
+
+SERVER_INFO = dict(deploymentType="Server", versionNumbers=[9, 4, 0])
+
+
+@pytest.fixture(autouse=True)
+def server_infos(monkeypatch):
+    server_infos = {}
+    monkeypatch.setattr(jira_, "_server_infos", server_infos)
+    return server_infos
 
 
 def test_authenticate_jira_user(config):
@@ -30,6 +49,9 @@ def test_authenticate_jira_user(config):
             jira_config.url,
             dict(verify=jira_config.verify_ssl),
             basic_auth=(username, password),
+            timeout=jira_config.timeout,
+            max_retries=jira_config.max_retries,
+            get_server_info=False,
         )
 
 
@@ -37,6 +59,7 @@ def test_authenticate_jira_user_validate_credentials(config):
     username, password, jira_config = ("user", "password", config.jira)
     with patch("mvtool.auth.jira_.JIRA") as jira_mock:
         jira_mock.return_value = Mock()
+        jira_mock.return_value.server_info.return_value = SERVER_INFO
         authenticate_jira_user(
             username, password, jira_config, validate_credentials=True
         )
@@ -44,6 +67,9 @@ def test_authenticate_jira_user_validate_credentials(config):
             jira_config.url,
             dict(verify=jira_config.verify_ssl),
             basic_auth=(username, password),
+            timeout=jira_config.timeout,
+            max_retries=jira_config.max_retries,
+            get_server_info=False,
         )
         jira_mock.return_value.myself.assert_called_once()
 
@@ -55,3 +81,85 @@ def test_authenticate_jira_user_raise_jira_error(config):
         with pytest.raises(HTTPException) as error_info:
             authenticate_jira_user(username, password, jira_config)
         assert "Jira error" in error_info.value.detail
+
+
+def test_create_jira_connection(config):
+    with patch("mvtool.auth.jira_.JIRA") as jira_mock:
+        jira_mock.return_value.server_info.return_value = SERVER_INFO
+        jira_connection = create_jira_connection("user", "password", config.jira)
+
+    jira_connection._session.mount.assert_called_once()
+    url, adapter = jira_connection._session.mount.call_args.args
+    assert url == config.jira.url
+    assert adapter._pool_maxsize == config.jira.pool_maxsize
+    assert jira_connection.deploymentType == "Server"
+    assert jira_connection._version == (9, 4, 0)
+
+
+def test_create_jira_connection_shares_transport_and_server_info(config):
+    def create_jira_mock(*args, **kwargs):
+        return Mock(server_info=Mock(return_value=SERVER_INFO))
+
+    with patch("mvtool.auth.jira_.JIRA", side_effect=create_jira_mock):
+        alice, bob = [
+            create_jira_connection(username, "password", config.jira)
+            for username in ("alice", "bob")
+        ]
+
+    alice.server_info.assert_called_once()
+    bob.server_info.assert_not_called()
+    assert bob._version == (9, 4, 0)
+    assert (
+        alice._session.mount.call_args.args[1] is bob._session.mount.call_args.args[1]
+    )
+
+
+@pytest.fixture
+def jira_config(config):
+    yield config.jira
+    # Restore the default thresholds of the circuit breaker
+    setup_jira_circuit_breaker(JiraConfig(url=config.jira.url))
+
+
+def test_call_jira():
+    assert call_jira(lambda: "value") == "value"
+
+
+@pytest.mark.parametrize(
+    "error, status_code",
+    [(requests.ConnectTimeout(), 504), (requests.ConnectionError(), 503)],
+)
+def test_call_jira_converts_request_errors(error, status_code):
+    with pytest.raises(JIRAError) as error_info:
+        call_jira(Mock(side_effect=error))
+    assert error_info.value.status_code == status_code
+
+
+def test_call_jira_open_circuit(jira_config):
+    jira_config.failure_threshold = 2
+    setup_jira_circuit_breaker(jira_config)
+    for _ in range(2):
+        with pytest.raises(JIRAError):
+            call_jira(Mock(side_effect=JIRAError("error", status_code=502)))
+
+    fn = Mock()
+    with pytest.raises(JIRAError) as error_info:
+        call_jira(fn)
+    assert error_info.value.status_code == 503
+    fn.assert_not_called()
+
+
+def test_call_jira_client_errors_do_not_open_circuit(jira_config):
+    jira_config.failure_threshold = 1
+    setup_jira_circuit_breaker(jira_config)
+    with pytest.raises(JIRAError):
+        call_jira(Mock(side_effect=JIRAError("error", status_code=404)))
+    assert jira_circuit_breaker.state == "closed"
+
+
+@pytest.mark.parametrize(
+    "status_code, expected", [(None, False), (404, False), (500, True), (503, True)]
+)
+def test_is_jira_unavailable(status_code, expected):
+    assert is_jira_unavailable(JIRAError(status_code=status_code)) == expected
+    assert not is_jira_unavailable(ValueError())
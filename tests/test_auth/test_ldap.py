@@ -19,7 +19,14 @@ import ldap
 import pytest
 from jira import JIRAError
 
-from mvtool.auth.ldap_ import LdapJiraDummy, LdapUserDetails, authenticate_ldap_user
+from fastapi import HTTPException
+
+from mvtool.auth.ldap_ import (
+    LdapJiraDummy,
+    LdapUserDetails,
+    authenticate_ldap_user,
+    get_ldap_pool,
+)
 from mvtool.config import Config
 from mvtool.utils.errors import ClientError, UnauthorizedError
 
@@ -61,7 +68,7 @@ def test_ssl_verification_enabled(ldap_initialize_mock, config: Config):
     config.ldap.verify_ssl = True
     authenticate_ldap_user("jdoe", "password", config.ldap)
     ldap_conn_mock = ldap_initialize_mock.return_value
-    ldap_conn_mock.set_option.assert_not_called()
+    ldap_conn_mock.set_option.assert_called_once_with(ldap.OPT_NETWORK_TIMEOUT, 10)
 
 
 def test_ssl_cert_path(ldap_initialize_mock, config: Config):
@@ -88,11 +95,12 @@ def test_with_account_dn(ldap_initialize_mock, config: Config):
 
     authenticate_ldap_user("jdoe", "password", config.ldap)
 
-    # Check if simple_bind_s is called twice with the expected arguments
-    assert ldap_conn_mock.simple_bind_s.call_count == 2
+    # Check if simple_bind_s binds the account again after checking the user
+    assert ldap_conn_mock.simple_bind_s.call_count == 3
     calls = [
         call("cn=admin,dc=local", "admin_password"),
         call("uid=jdoe,ou=people,dc=local", "password"),
+        call("cn=admin,dc=local", "admin_password"),
     ]
     ldap_conn_mock.simple_bind_s.assert_has_calls(calls)
 
@@ -108,10 +116,10 @@ def test_without_account_dn(ldap_initialize_mock, config: Config):
 
     authenticate_ldap_user("jdoe", "password", config.ldap)
 
-    # Check if simple_bind_s is called only once with the expected arguments
-    assert ldap_conn_mock.simple_bind_s.call_count == 1
-    ldap_conn_mock.simple_bind_s.assert_called_with(
-        "uid=jdoe,ou=people,dc=local", "password"
+    # Check if simple_bind_s drops the user binding after checking the user
+    assert ldap_conn_mock.simple_bind_s.call_count == 2
+    ldap_conn_mock.simple_bind_s.assert_has_calls(
+        [call("uid=jdoe,ou=people,dc=local", "password"), call("", "")]
     )
 
 
@@ -126,16 +134,16 @@ def test_invalid_credentials(ldap_initialize_mock, config: Config):
     config.ldap.account_dn = None
     config.ldap.account_password = None
 
-    # Let simple_bind_s raise an exception
-    ldap_conn_mock.simple_bind_s.side_effect = ldap.INVALID_CREDENTIALS
+    # Let simple_bind_s raise an exception when binding the user
+    ldap_conn_mock.simple_bind_s.side_effect = [ldap.INVALID_CREDENTIALS, None]
 
     with pytest.raises(UnauthorizedError, match="Invalid credentials"):
         authenticate_ldap_user("jdoe", "wrong_password", config.ldap)
 
-    # Check if simple_bind_s is called only once with the expected arguments
-    assert ldap_conn_mock.simple_bind_s.call_count == 1
-    ldap_conn_mock.simple_bind_s.assert_called_with(
-        "uid=jdoe,ou=people,dc=local", "wrong_password"
+    # Check if simple_bind_s is called with the expected arguments
+    assert ldap_conn_mock.simple_bind_s.call_count == 2
+    ldap_conn_mock.simple_bind_s.assert_has_calls(
+        [call("uid=jdoe,ou=people,dc=local", "wrong_password"), call("", "")]
     )
 
 
@@ -159,6 +167,118 @@ def test_authenticate_ldap_user_ldap_error(ldap_initialize_mock, config: Config)
     assert "Error searching the LDAP directory" in error_info.value.detail
 
 
+def _search_result(uid: str = "jdoe"):
+    return [(f"uid={uid},ou=people,dc=local", {"uid": [uid.encode()]})]
+
+
+def test_connections_reused(ldap_initialize_mock, config: Config):
+    ldap_conn_mock = ldap_initialize_mock.return_value
+    ldap_conn_mock.search_s.side_effect = lambda *args: _search_result(
+        args[2].split("=")[1].split(")")[0]  # uid from search filter
+    )
+
+    for uid in ("jdoe", "mmuster", "jdoe"):
+        ldap_user = authenticate_ldap_user(uid, "password", config.ldap)
+        assert ldap_user.myself()["accountId"] == uid
+
+    ldap_initialize_mock.assert_called_once()
+    ldap_conn_mock.unbind_s.assert_not_called()
+    # jdoe is searched only once, because the DN is cached
+    assert ldap_conn_mock.search_s.call_count == 2
+
+
+def test_cached_dn_searched_again_on_failed_bind(ldap_initialize_mock, config: Config):
+    config.ldap.account_dn = None
+    config.ldap.account_password = None
+    ldap_conn_mock = ldap_initialize_mock.return_value
+    ldap_conn_mock.search_s.return_value = _search_result()
+    authenticate_ldap_user("jdoe", "password", config.ldap)
+
+    # The user moved to another DN, which makes binding to the cached DN fail
+    ldap_conn_mock.search_s.return_value = [
+        ("uid=jdoe,ou=staff,dc=local", {"uid": [b"jdoe"]})
+    ]
+    ldap_conn_mock.simple_bind_s.reset_mock()
+    ldap_conn_mock.simple_bind_s.side_effect = [ldap.INVALID_CREDENTIALS] + [None] * 3
+    authenticate_ldap_user("jdoe", "password", config.ldap)
+
+    assert ldap_conn_mock.search_s.call_count == 2
+    ldap_conn_mock.simple_bind_s.assert_has_calls(
+        [
+            call("uid=jdoe,ou=people,dc=local", "password"),
+            call("", ""),
+            call("uid=jdoe,ou=staff,dc=local", "password"),
+            call("", ""),
+        ]
+    )
+
+
+def test_cached_dn_bound_once_on_invalid_password(ldap_initialize_mock, config: Config):
+    config.ldap.account_dn = None
+    config.ldap.account_password = None
+    ldap_conn_mock = ldap_initialize_mock.return_value
+    ldap_conn_mock.search_s.return_value = _search_result()
+    authenticate_ldap_user("jdoe", "password", config.ldap)
+
+    ldap_conn_mock.simple_bind_s.reset_mock()
+    ldap_conn_mock.simple_bind_s.side_effect = [ldap.INVALID_CREDENTIALS] + [None] * 3
+    with pytest.raises(UnauthorizedError) as error_info:
+        authenticate_ldap_user("jdoe", "wrong", config.ldap)
+
+    assert error_info.value.detail == "Invalid credentials"
+    assert ldap_conn_mock.search_s.call_count == 2
+    # The wrong password is sent to the directory only once
+    binds = [c for c in ldap_conn_mock.simple_bind_s.call_args_list if c.args[1]]
+    assert binds == [call("uid=jdoe,ou=people,dc=local", "wrong")]
+
+
+def test_closed_idle_connection_replaced(ldap_initialize_mock, config: Config):
+    closed_conn_mock, ldap_conn_mock = Mock(), Mock()
+    ldap_initialize_mock.side_effect = [closed_conn_mock, ldap_conn_mock]
+    closed_conn_mock.search_s.return_value = _search_result()
+    authenticate_ldap_user("jdoe", "password", config.ldap)
+
+    closed_conn_mock.search_s.side_effect = ldap.SERVER_DOWN
+    ldap_conn_mock.search_s.return_value = _search_result("mmuster")
+    ldap_user = authenticate_ldap_user("mmuster", "password", config.ldap)
+
+    assert ldap_user.myself()["accountId"] == "mmuster"
+    closed_conn_mock.unbind_s.assert_called_once()
+    assert ldap_initialize_mock.call_count == 2
+
+
+def test_failed_connection_discarded(ldap_initialize_mock, config: Config):
+    ldap_conn_mock = ldap_initialize_mock.return_value
+    ldap_conn_mock.search_s.side_effect = ldap.LDAPError("Something went wrong")
+
+    for _ in range(2):
+        with pytest.raises(ClientError):
+            authenticate_ldap_user("jdoe", "password", config.ldap)
+
+    assert ldap_conn_mock.unbind_s.call_count == 2
+    assert ldap_initialize_mock.call_count == 2
+
+
+def test_pool_bounded(ldap_initialize_mock, config: Config):
+    config.ldap.pool_size = 1
+    config.ldap.timeout = 0.01
+    ldap_pool = get_ldap_pool(config.ldap)
+
+    def call_in_call(conn):
+        return ldap_pool.call(lambda conn: None)
+
+    with pytest.raises(HTTPException) as error_info:
+        ldap_pool.call(call_in_call)
+    assert error_info.value.status_code == 503
+
+
+def test_get_ldap_pool_replaced_on_config_change(config: Config):
+    ldap_pool = get_ldap_pool(config.ldap)
+    assert get_ldap_pool(config.ldap) is ldap_pool
+    config.ldap.host = "other"
+    assert get_ldap_pool(config.ldap) is not ldap_pool
+
+
 def test_ldap_jira_dummy_myself():
     ldap_details = LdapUserDetails(
         login="jdoe", firstname="John", lastname="Doe", email="johndoe@local"
@@ -0,0 +1,94 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest.mock import patch
+
+import pytest
+
+from mvtool.auth.session_store import (
+    MemorySessionStore,
+    SessionStore,
+    SqliteSessionStore,
+    create_session_store,
+)
+from mvtool.config import AuthConfig
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def session_store(request, tmp_path):
+    if request.param == "sqlite":
+        return SqliteSessionStore(str(tmp_path / "sessions.sqlite"), maxsize=2)
+    return MemorySessionStore(maxsize=2)
+
+
+def test_session_store_requires_all_methods():
+    class IncompleteSessionStore(SessionStore):
+        def get(self, key):
+            return None
+
+        def set(self, key, identity):
+            pass
+
+    with pytest.raises(TypeError):
+        IncompleteSessionStore()
+
+
+def test_session_store_set_and_get(session_store):
+    identity = dict(source="ldap", user=dict(login="user"))
+    session_store.set("key", identity)
+    assert session_store.get("key") == identity
+    assert session_store.get("other key") is None
+
+
+def test_session_store_evicts_when_full(session_store):
+    for i in range(3):
+        session_store.set(f"key {i}", dict(source="jira"))
+    assert sum(session_store.get(f"key {i}") is not None for i in range(3)) == 2
+    assert session_store.get("key 2") is not None
+
+
+def test_session_store_clear(session_store):
+    session_store.set("key", dict(source="jira"))
+    session_store.clear()
+    assert session_store.get("key") is None
+
+
+def test_sqlite_session_store_expires(tmp_path):
+    session_store = SqliteSessionStore(str(tmp_path / "sessions.sqlite"), ttl=60)
+    with patch("mvtool.auth.session_store.time.time", return_value=1000):
+        session_store.set("key", dict(source="jira"))
+    with patch("mvtool.auth.session_store.time.time", return_value=1059):
+        assert session_store.get("key") == dict(source="jira")
+    with patch("mvtool.auth.session_store.time.time", return_value=1060):
+        assert session_store.get("key") is None
+
+
+def test_sqlite_session_store_shared(tmp_path):
+    filename = str(tmp_path / "sessions.sqlite")
+    SqliteSessionStore(filename).set("key", dict(source="jira"))
+    assert SqliteSessionStore(filename).get("key") == dict(source="jira")
+
+
+def test_create_session_store(tmp_path):
+    assert isinstance(create_session_store(AuthConfig()), MemorySessionStore)
+    session_store = create_session_store(
+        AuthConfig(
+            session_store="sqlite",
+            session_store_filename=str(tmp_path / "sessions.sqlite"),
+        )
+    )
+    assert isinstance(session_store, SqliteSessionStore)
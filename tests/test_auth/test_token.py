@@ -20,6 +20,8 @@ from cryptography.fernet import InvalidToken
 from fastapi import HTTPException
 
 from mvtool.auth.token import create_token, get_credentials_from_token
+from mvtool.config import AuthConfig
+from mvtool.utils.crypto import decrypt
 
 
 def test_create_token(config):
@@ -46,3 +48,27 @@ def test_get_credentials_from_token_invalid_token(config):
         with pytest.raises(HTTPException) as error_info:
             get_credentials_from_token("token", config.auth)
         assert error_info.value.status_code == 401
+
+
+def test_get_credentials_from_token_cached(config):
+    token = create_token("user", "password", config.auth)
+    with patch("mvtool.auth.token.decrypt", wraps=decrypt) as decrypt_mock:
+        assert get_credentials_from_token(token, config.auth) == ("user", "password")
+        assert get_credentials_from_token(token, config.auth) == ("user", "password")
+        decrypt_mock.assert_called_once()
+
+
+def test_get_credentials_from_token_cached_per_secret(config):
+    token = create_token("user", "password", config.auth)
+    get_credentials_from_token(token, config.auth)
+    with pytest.raises(HTTPException) as error_info:
+        get_credentials_from_token(token, AuthConfig(secret="other secret"))
+    assert error_info.value.status_code == 401
+
+
+def test_derived_key_cached():
+    auth_config = AuthConfig(secret="secret")
+    with patch("mvtool.config.derive_key", return_value=b"key") as derive_key_mock:
+        assert auth_config.derived_key == b"key"
+        assert auth_config.derived_key == b"key"
+        derive_key_mock.assert_called_once_with("secret")
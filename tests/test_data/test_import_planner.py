@@ -0,0 +1,262 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from mvtool.data.import_planner import ImportPlanner, preload_imports
+from mvtool.data.measures import Measures
+from mvtool.data.requirements import Requirements
+from mvtool.db.schema import (
+    Catalog,
+    CatalogModule,
+    CatalogRequirement,
+    Document,
+    Measure,
+    Project,
+    Requirement,
+)
+from mvtool.models.catalog_modules import CatalogModuleImport
+from mvtool.models.catalog_requirements import CatalogRequirementImport
+from mvtool.models.catalogs import CatalogImport
+from mvtool.models.documents import DocumentImport
+from mvtool.models.measures import MeasureImport
+from mvtool.models.projects import ProjectImport
+from mvtool.models.requirements import RequirementImport
+
+
+@contextmanager
+def count_queries(session: Session):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _nested_measure_import(
+    measure: Measure, catalog_requirement: CatalogRequirement, document: Document
+) -> MeasureImport:
+    catalog_module = catalog_requirement.catalog_module
+    return MeasureImport(
+        id=measure.id,
+        summary="updated summary",
+        requirement=RequirementImport(
+            id=measure.requirement.id,
+            summary="updated summary",
+            project=ProjectImport(id=measure.requirement.project.id, name="name"),
+            catalog_requirement=CatalogRequirementImport(
+                id=catalog_requirement.id,
+                summary="updated summary",
+                catalog_module=CatalogModuleImport(
+                    id=catalog_module.id,
+                    title="updated title",
+                    catalog=CatalogImport(
+                        id=catalog_module.catalog.id, title="updated title"
+                    ),
+                ),
+            ),
+        ),
+        document=DocumentImport(
+            id=document.id,
+            title="updated title",
+            project=ProjectImport(id=document.project.id, name="name"),
+        ),
+    )
+
+
+def test_import_planner_loads_each_table_once(
+    session: Session,
+    measure: Measure,
+    catalog_requirement: CatalogRequirement,
+    document: Document,
+):
+    measure_import = _nested_measure_import(measure, catalog_requirement, document)
+    ids = {
+        Measure: measure.id,
+        Requirement: measure.requirement.id,
+        Project: measure.requirement.project.id,
+        CatalogRequirement: catalog_requirement.id,
+        CatalogModule: catalog_requirement.catalog_module.id,
+        Catalog: catalog_requirement.catalog_module.catalog.id,
+        Document: document.id,
+    }
+    session.flush()
+    session.expunge_all()
+
+    with count_queries(session) as statements:
+        loaded_items = ImportPlanner(session).add_imports([measure_import]).load()
+
+        # All referenced items are in the session without further queries
+        for orm_class, id in ids.items():
+            assert session.get(orm_class, id) is not None
+
+    assert len(statements) == len(ids)
+    assert len(loaded_items) == len(ids)
+
+
+def test_import_planner_loads_referenced_rows(
+    session: Session, measure: Measure, catalog_requirement: CatalogRequirement
+):
+    measure.requirement.catalog_requirement = catalog_requirement
+    session.flush()
+    session.expunge_all()
+
+    with count_queries(session) as statements:
+        measure_import = MeasureImport(id=measure.id, summary="summary")
+        loaded_items = ImportPlanner(session).add_imports([measure_import]).load()
+        loaded_measure = session.get(Measure, measure.id)
+        catalog = loaded_measure.requirement.catalog_requirement.catalog_module.catalog
+
+    assert catalog.id == catalog_requirement.catalog_module.catalog.id
+    assert len(loaded_items) == 6
+    assert len(statements) == 6  # one query per table except for documents
+
+
+def test_preload_imports(
+    session: Session,
+    measure: Measure,
+    catalog_requirement: CatalogRequirement,
+    document: Document,
+):
+    measure_import = _nested_measure_import(measure, catalog_requirement, document)
+    measure_id = measure.id
+    session.flush()
+    session.expunge_all()
+    del measure, catalog_requirement, document
+
+    with preload_imports(session, [measure_import]):
+        # The preloaded items are kept although nothing else refers to them
+        with count_queries(session) as statements:
+            assert session.get(Measure, measure_id) is not None
+        assert statements == []
+
+
+def test_import_planner_skips_imports_without_id(session: Session):
+    with count_queries(session) as statements:
+        loaded_items = (
+            ImportPlanner(session)
+            .add_imports([MeasureImport(summary="summary"), None])
+            .load()
+        )
+
+    assert loaded_items == []
+    assert statements == []
+
+
+def test_bulk_create_update_measures_query_count_is_constant(
+    session: Session,
+    measures: Measures,
+    measure: Measure,
+    catalog_requirement: CatalogRequirement,
+    document: Document,
+):
+    measure_import = _nested_measure_import(measure, catalog_requirement, document)
+    session.flush()
+    session.expunge_all()
+
+    with count_queries(session) as statements:
+        updated_measures = list(
+            measures.bulk_create_update_measures([measure_import], patch=True)
+        )
+
+    assert len(updated_measures) == 1
+    assert updated_measures[0].requirement.catalog_requirement.summary == (
+        "updated summary"
+    )
+    assert len(statements) == 7  # one query per table
+
+
+def test_bulk_create_update_requirements_query_count_is_constant(
+    session: Session,
+    requirements: Requirements,
+    requirement: Requirement,
+    catalog_requirement: CatalogRequirement,
+):
+    requirement_import = RequirementImport(
+        id=requirement.id,
+        summary="updated summary",
+        catalog_requirement=CatalogRequirementImport(
+            id=catalog_requirement.id,
+            summary="updated summary",
+            catalog_module=CatalogModuleImport(
+                id=catalog_requirement.catalog_module.id, title="updated title"
+            ),
+        ),
+    )
+    session.flush()
+    session.expunge_all()
+
+    with count_queries(session) as statements:
+        updated_requirements = list(
+            requirements.bulk_create_update_requirements(
+                [requirement_import], patch=True
+            )
+        )
+
+    assert len(updated_requirements) == 1
+    assert len(statements) == 5  # requirement, project, catalog tables
+
+
+def test_import_planner_check_references(
+    session: Session, measure: Measure, document: Document
+):
+    measure_import = MeasureImport(
+        id=measure.id,
+        summary="summary",
+        requirement=RequirementImport(
+            summary="summary", project=ProjectImport(id=-1, name="name")
+        ),
+        document=DocumentImport(id=document.id, title="title"),
+    )
+    planner = ImportPlanner(session).add_imports([measure_import])
+    loaded_items = planner.load()
+
+    assert len(loaded_items) > 0
+    assert planner.check_references(measure_import) == ["No project with id=-1."]
+
+
+def test_import_planner_check_references_fallbacks(session: Session):
+    measure_import = MeasureImport(
+        summary="summary",
+        requirement=RequirementImport(
+            summary="summary",
+            catalog_requirement=CatalogRequirementImport(summary="summary"),
+        ),
+    )
+    planner = ImportPlanner(session).add_imports([measure_import])
+    planner.load()
+
+    assert planner.check_references(measure_import) == [
+        "No fallback project provided.",
+        "No fallback catalog module provided.",
+    ]
+    assert planner.check_references(measure_import, {"project"}) == [
+        "No fallback catalog module provided."
+    ]
+    assert planner.check_references(MeasureImport(summary="summary")) == [
+        "No fallback requirement provided."
+    ]
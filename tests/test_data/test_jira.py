@@ -15,15 +15,19 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from unittest.mock import Mock
+
 import pytest
 from jira import JIRA, JIRAError
 
+from mvtool.config import CacheConfig
 from mvtool.data.jira_ import (
     JiraBase,
     JiraIssues,
     JiraIssueTypes,
     JiraProjects,
     JiraUsers,
+    setup_jira_caches,
 )
 from mvtool.models import (
     JiraIssue,
@@ -34,6 +38,13 @@ from mvtool.models import (
 )
 
 
+def _jira_connection(jira, username: str):
+    connection = Mock(wraps=jira)
+    connection.server_url = jira.server_url
+    connection._session = Mock(auth=(username, "password"))
+    return connection
+
+
 def test_get_jira_item_url(jira):
     item_key = "key"
     item_url = JiraBase(jira)._get_jira_item_url(item_key)
@@ -116,6 +127,35 @@ def test_get_jira_user(jira, jira_user_data):
     assert result.email_address == jira_user_data["emailAddress"]
 
 
+def test_get_jira_users(jira, jira_user_data):
+    def user(jira_user_id):
+        if jira_user_id == "missing":
+            raise JIRAError("User not found", 404)
+        return jira_user_data
+
+    jira.user = Mock(side_effect=user)
+    results = JiraUsers(jira).get_jira_users(["1", "missing"])
+    assert [r.id for r in results] == [jira_user_data["accountId"]]
+
+
+def test_get_jira_users_fails(jira):
+    jira.user = Mock(side_effect=JIRAError("error", 500))
+    with pytest.raises(JIRAError):
+        JiraUsers(jira).get_jira_users(["1"])
+
+
+def test_cache_jira_projects(jira, jira_project_data):
+    jira.project.return_value = jira_project_data
+    jira_projects_view = JiraProjects(jira)
+
+    jira_projects_view.cache_jira_projects([jira_project_data.id] * 2)
+    jira_projects_view.cache_jira_projects([jira_project_data.id])
+
+    jira.project.assert_called_once_with(jira_project_data.id)
+    result = jira_projects_view.lookup_jira_project(jira_project_data.id, False)
+    assert result.id == jira_project_data.id
+
+
 def test_lookup_or_try_to_get_jira_project(jira, jira_project_data):
     jira.project.return_value = jira_project_data
     jira_projects_view = JiraProjects(jira)
@@ -148,6 +188,28 @@ def test_list_jira_projects(jira, jira_project_data):
     assert results[0].id == jira_project_data.id
 
 
+def test_list_jira_projects_shared_cache(jira, jira_project_data):
+    jira.projects.return_value = [jira_project_data]
+    list(JiraProjects(_jira_connection(jira, "alice")).list_jira_projects())
+    list(JiraProjects(_jira_connection(jira, "alice")).list_jira_projects())
+    jira.projects.assert_called_once()
+
+    list(JiraProjects(_jira_connection(jira, "bob")).list_jira_projects())
+    assert jira.projects.call_count == 2
+
+
+def test_lookup_jira_project_shared_cache(jira, jira_project_data):
+    jira.projects.return_value = [jira_project_data]
+    list(JiraProjects(_jira_connection(jira, "alice")).list_jira_projects())
+
+    jira_projects_view = JiraProjects(_jira_connection(jira, "alice"))
+    result = jira_projects_view.lookup_jira_project(jira_project_data.id)
+
+    assert result.id == jira_project_data.id
+    assert jira_projects_view._jira_projects_cache == {jira_project_data.id: result}
+    jira.project.assert_not_called()
+
+
 def test_get_jira_project(jira, jira_project_data):
     jira.project.return_value = jira_project_data
     result = JiraProjects(jira).get_jira_project(jira_project_data.id)
@@ -204,6 +266,14 @@ def test_list_jira_issue_types(jira, jira_project_data, jira_issue_type_data):
     jira.project.assert_called_once_with(jira_project_data.id)
 
 
+def test_list_jira_issue_types_shared_cache(jira, jira_project_data):
+    jira.project.return_value = jira_project_data
+    for _ in range(2):
+        jira_issue_types_view = JiraIssueTypes(_jira_connection(jira, "alice"))
+        list(jira_issue_types_view.list_jira_issue_types(jira_project_data.id))
+    jira.project.assert_called_once_with(jira_project_data.id)
+
+
 def test_convert_to_jira_issue(jira, jira_issue_data):
     result = JiraIssues(jira)._to_jira_issue_model(jira_issue_data)
     assert isinstance(result, JiraIssue)
@@ -268,7 +338,11 @@ def test_get_jira_issues_single_issue(jira, jira_issue_data):
     assert isinstance(results[0], JiraIssue)
     assert results[0].id == jira_issue_data.id
     jira.search_issues.assert_called_once_with(
-        "id = 1", validate_query=False, startAt=0, maxResults=0
+        "id in (1)",
+        validate_query=False,
+        startAt=0,
+        maxResults=0,
+        fields=JiraIssues.JIRA_ISSUE_FIELDS,
     )
 
 
@@ -277,9 +351,110 @@ def test_get_jira_issues_multiple_issues(jira):
     result = list(JiraIssues(jira).get_jira_issues(("1", "2")))
     assert result == []
     jira.search_issues.assert_called_once_with(
-        "id = 1 OR id = 2", validate_query=False, startAt=0, maxResults=0
+        "id in (1, 2)",
+        validate_query=False,
+        startAt=0,
+        maxResults=0,
+        fields=JiraIssues.JIRA_ISSUE_FIELDS,
+    )
+
+
+def test_get_jira_issues_chunks(jira, monkeypatch):
+    monkeypatch.setattr(JiraIssues, "CHUNK_SIZE", 2)
+    jira.search_issues.return_value = []
+    result = list(JiraIssues(jira).get_jira_issues(("1", "2", "3", "2")))
+    assert result == []
+    jql_strs = sorted(c.args[0] for c in jira.search_issues.call_args_list)
+    assert jql_strs == ["id in (1, 2)", "id in (3)"]
+
+
+def _jira_issues_data(jira_issue_data, *ids: str) -> list:
+    return [
+        type("JiraIssueMock", (jira_issue_data,), dict(id=id, key=f"KEY-{id}"))
+        for id in ids
+    ]
+
+
+def test_get_jira_issues_offset_size(jira, jira_issue_data):
+    jira.search_issues.return_value = _jira_issues_data(jira_issue_data, "1", "2", "3")
+    result = list(JiraIssues(jira).get_jira_issues(("1", "2", "3"), 1, 1))
+    assert [r.id for r in result] == ["2"]
+
+
+def test_get_jira_issues_size_zero(jira, jira_issue_data):
+    jira.search_issues.return_value = _jira_issues_data(jira_issue_data, "1", "2")
+    result = list(JiraIssues(jira).get_jira_issues(("1", "2"), 0, 0))
+    assert [r.id for r in result] == ["1", "2"]
+
+
+def test_get_jira_issues_requested_order(jira, jira_issue_data):
+    # Cache the second issue, so that it is not queried again
+    jira.search_issues.return_value = _jira_issues_data(jira_issue_data, "2")
+    list(JiraIssues(_jira_connection(jira, "alice")).get_jira_issues(("2",)))
+
+    jira.search_issues.return_value = _jira_issues_data(jira_issue_data, "3", "1")
+    jira_issues = JiraIssues(_jira_connection(jira, "alice"))
+    result = list(jira_issues.get_jira_issues(("1", "2", "KEY-3", "3")))
+
+    assert [r.id for r in result] == ["1", "2", "3"]
+    assert [r.id for r in jira_issues.get_jira_issues(("1", "2", "3"), 1, 1)] == ["2"]
+
+
+def test_get_jira_issues_shared_cache(jira, jira_issue_data):
+    jira.search_issues.return_value = [jira_issue_data]
+    list(JiraIssues(_jira_connection(jira, "alice")).get_jira_issues(("1",)))
+    jira.search_issues.reset_mock()
+
+    results = list(JiraIssues(_jira_connection(jira, "alice")).get_jira_issues(("1",)))
+
+    assert [r.id for r in results] == [jira_issue_data.id]
+    jira.search_issues.assert_not_called()
+
+
+def test_get_jira_issues_shared_cache_per_user(jira, jira_issue_data):
+    jira.search_issues.return_value = [jira_issue_data]
+    list(JiraIssues(_jira_connection(jira, "alice")).get_jira_issues(("1",)))
+    jira.search_issues.reset_mock()
+
+    list(JiraIssues(_jira_connection(jira, "bob")).get_jira_issues(("1",)))
+
+    jira.search_issues.assert_called_once()
+
+
+def test_lookup_jira_issue_shared_cache(jira, jira_issue_data):
+    jira.search_issues.return_value = [jira_issue_data]
+    list(JiraIssues(_jira_connection(jira, "alice")).get_jira_issues(("1",)))
+
+    jira_issues_view = JiraIssues(_jira_connection(jira, "alice"))
+    result = jira_issues_view.lookup_jira_issue(jira_issue_data.id)
+
+    assert result.id == jira_issue_data.id
+    assert jira_issues_view._jira_issues_cache == {jira_issue_data.id: result}
+
+
+def test_update_jira_issue_invalidates_shared_cache(
+    jira, jira_issue_data, jira_issue_input
+):
+    jira.search_issues.return_value = [jira_issue_data]
+    jira.issue.return_value = jira_issue_data
+    list(JiraIssues(_jira_connection(jira, "bob")).get_jira_issues(("1",)))
+
+    JiraIssues(_jira_connection(jira, "alice")).update_jira_issue(
+        jira_issue_data.id, jira_issue_input
     )
 
+    assert JiraIssues(_jira_connection(jira, "bob")).lookup_jira_issue("1") is None
+
+
+def test_delete_jira_issue_invalidates_shared_cache(jira, jira_issue_data):
+    jira.search_issues.return_value = [jira_issue_data]
+    jira.issue.return_value = jira_issue_data
+    list(JiraIssues(_jira_connection(jira, "alice")).get_jira_issues(("1",)))
+
+    JiraIssues(_jira_connection(jira, "alice")).delete_jira_issue(jira_issue_data.id)
+
+    assert JiraIssues(_jira_connection(jira, "alice")).lookup_jira_issue("1") is None
+
 
 def test_get_jira_issues_no_issues(jira):
     jira.search_issues.return_value = []
@@ -288,6 +463,47 @@ def test_get_jira_issues_no_issues(jira):
     jira.search_issues.assert_not_called()
 
 
+def test_get_accessible_jira_issue_ids(jira, jira_issue_data):
+    jira.search_issues.return_value = [jira_issue_data]
+
+    result = JiraIssues(jira).get_accessible_jira_issue_ids(("1", "2", "1"))
+
+    assert result == {jira_issue_data.id}
+    jira.search_issues.assert_called_once_with(
+        "id in (1, 2)", maxResults=0, validate_query=False, fields="id"
+    )
+
+
+def test_get_accessible_jira_issue_ids_shared_cache_per_user(jira, jira_issue_data):
+    jira.search_issues.return_value = [jira_issue_data]
+    JiraIssues(_jira_connection(jira, "alice")).get_accessible_jira_issue_ids(["2"])
+    list(JiraIssues(_jira_connection(jira, "alice")).get_jira_issues(("1",)))
+    jira.search_issues.reset_mock()
+
+    alice_view = JiraIssues(_jira_connection(jira, "alice"))
+    assert alice_view.get_accessible_jira_issue_ids(["1", "2"]) == {"1"}
+    jira.search_issues.assert_not_called()
+
+    jira.search_issues.return_value = []
+    bob_view = JiraIssues(_jira_connection(jira, "bob"))
+    assert bob_view.get_accessible_jira_issue_ids(["1"]) == set()
+    jira.search_issues.assert_called_once()
+
+
+def test_get_accessible_jira_issue_ids_uses_stale_data(
+    stale_jira_caches, jira, jira_issue_data
+):
+    jira.search_issues.return_value = [jira_issue_data]
+    JiraIssues(jira).get_accessible_jira_issue_ids(["1", "2"])
+    jira.search_issues.side_effect = _jira_unavailable_error()
+
+    jira_issues_view = JiraIssues(jira)
+    result = jira_issues_view.get_accessible_jira_issue_ids(["1", "2", "3"])
+
+    assert result == {"1"}
+    assert jira_issues_view.jira_unavailable
+
+
 def test_check_jira_issue_id_fails(jira):
     jira.issue.side_effect = JIRAError("error")
     with pytest.raises(JIRAError):
@@ -346,3 +562,78 @@ def test_delete_jira_issue(jira, jira_issue_data):
     JiraIssues(jira).delete_jira_issue(jira_issue_data.id)
     jira.issue.assert_called_once_with(jira_issue_data.id)
     jira_issue_data.delete.assert_called_once_with()
+
+
+@pytest.fixture
+def stale_jira_caches():
+    """Expire data cached across requests immediately, but keep it as stale data."""
+    setup_jira_caches(
+        CacheConfig(jira_issues_ttl=0, jira_projects_ttl=0, jira_max_stale=60)
+    )
+    yield
+    setup_jira_caches(CacheConfig())
+
+
+def _jira_unavailable_error() -> JIRAError:
+    return JIRAError("JIRA is temporarily unavailable", status_code=503)
+
+
+def test_get_jira_issues_uses_stale_data(stale_jira_caches, jira, jira_issue_data):
+    list(JiraIssues(_jira_connection(jira, "alice")).get_jira_issues(("1",)))
+    jira.search_issues.side_effect = _jira_unavailable_error()
+
+    jira_issues_view = JiraIssues(_jira_connection(jira, "alice"))
+    results = list(jira_issues_view.get_jira_issues(("1", "2")))
+
+    assert [r.id for r in results] == [jira_issue_data.id]
+    assert jira_issues_view.jira_unavailable
+    assert jira_issues_view.lookup_jira_issue("1") == results[0]
+
+
+def test_get_jira_issues_without_stale_data(jira):
+    jira.search_issues.side_effect = _jira_unavailable_error()
+
+    jira_issues_view = JiraIssues(jira)
+    results = list(jira_issues_view.get_jira_issues(("1",)))
+
+    assert results == []
+    assert jira_issues_view.jira_unavailable
+
+
+def test_get_jira_issues_raises_client_errors(jira):
+    jira.search_issues.side_effect = JIRAError("Bad request", status_code=400)
+    with pytest.raises(JIRAError):
+        list(JiraIssues(jira).get_jira_issues(("1",)))
+
+
+def test_list_jira_projects_uses_stale_data(stale_jira_caches, jira):
+    expected = list(JiraProjects(_jira_connection(jira, "alice")).list_jira_projects())
+    jira.projects.side_effect = _jira_unavailable_error()
+
+    jira_projects_view = JiraProjects(_jira_connection(jira, "alice"))
+    results = list(jira_projects_view.list_jira_projects())
+
+    assert results == expected
+    assert jira_projects_view.jira_unavailable
+
+
+def test_list_jira_projects_without_stale_data(jira):
+    jira.projects.side_effect = _jira_unavailable_error()
+    with pytest.raises(JIRAError):
+        list(JiraProjects(jira).list_jira_projects())
+
+
+def test_cache_jira_projects_uses_stale_data(
+    stale_jira_caches, jira, jira_project_data
+):
+    list(JiraProjects(_jira_connection(jira, "alice")).list_jira_projects())
+    jira.project.side_effect = _jira_unavailable_error()
+
+    jira_projects_view = JiraProjects(_jira_connection(jira, "alice"))
+    jira_projects_view.cache_jira_projects([jira_project_data.id, "unknown"])
+
+    assert jira_projects_view.jira_unavailable
+    assert jira_projects_view.lookup_jira_project(jira_project_data.id).id == (
+        jira_project_data.id
+    )
+    assert jira_projects_view.lookup_jira_project("unknown") is None
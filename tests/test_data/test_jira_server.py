@@ -0,0 +1,337 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from jira import JIRA, JIRAError
+
+from mvtool.auth.jira_ import create_jira_connection
+from mvtool.config import JiraConfig
+from mvtool.data.jira_ import JiraIssues, JiraProjects, JiraUsers
+from mvtool.data.jira_async import close_jira_async_clients
+
+
+class FakeJiraServer(ThreadingHTTPServer):
+    """Local JIRA server which answers JQL searches for issues by their IDs and
+    requests for single users and projects. IDs starting with "missing" are not
+    found. Connections are kept alive and counted."""
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), FakeJiraRequestHandler)
+        self.delay = delay
+        self.searches: list[dict[str, list[str]]] = []
+        self.authorizations: list[str | None] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @staticmethod
+    def issue_data(issue_id: str) -> dict:
+        return {
+            "id": issue_id,
+            "key": f"FAKE-{issue_id}",
+            "fields": {
+                "summary": f"summary {issue_id}",
+                "description": None,
+                "assignee": None,
+                "issuetype": {"id": "1", "name": "Task"},
+                "project": {"id": "1", "key": "FAKE", "name": "Fake"},
+                "status": {"name": "Open", "statusCategory": {"colorName": "grey"}},
+            },
+        }
+
+
+class FakeJiraRequestHandler(BaseHTTPRequestHandler):
+    server: FakeJiraServer
+    protocol_version = "HTTP/1.1"  # keep connections alive
+    disable_nagle_algorithm = True  # do not delay responses on kept alive connections
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.authorizations.append(self.headers.get("Authorization"))
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(
+                self.server.max_in_flight, self.server.in_flight
+            )
+        try:
+            self._handle_get()
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _handle_get(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        if url.path.endswith("/user"):
+            time.sleep(self.server.delay)
+            user_id = params["username"][0]
+            if user_id.startswith("missing"):
+                self.send_error(404)
+            else:
+                self._send_json(
+                    {"name": user_id, "displayName": user_id, "emailAddress": None}
+                )
+        elif "/project/" in url.path:
+            time.sleep(self.server.delay)
+            project_id = url.path.rsplit("/", 1)[-1]
+            if project_id.startswith("missing"):
+                self.send_error(404)
+            else:
+                self._send_json(
+                    {"id": project_id, "key": f"P{project_id}", "name": project_id}
+                )
+        elif url.path.endswith("/field"):
+            self._send_json([])
+        elif url.path.endswith("/serverInfo"):
+            self._send_json({"deploymentType": "Server", "versionNumbers": [9, 4, 0]})
+        elif url.path.endswith("/myself"):
+            self._send_json(
+                {"name": "user", "displayName": "user", "emailAddress": None}
+            )
+        elif url.path.endswith("/search"):
+            self.server.searches.append(params)
+            time.sleep(self.server.delay)
+
+            match = re.fullmatch(r"id in \((.*)\)", params["jql"][0])
+            issue_ids = match.group(1).split(", ") if match else []
+            self._send_json(
+                {
+                    "startAt": 0,
+                    "maxResults": 1000,
+                    "total": len(issue_ids),
+                    "issues": [self.server.issue_data(i) for i in issue_ids],
+                }
+            )
+        else:
+            self.send_error(404)
+
+    def _send_json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_fake_jira_server(delay: float = 0.0):
+    server = FakeJiraServer(delay)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def fake_jira_server():
+    yield from _start_fake_jira_server()
+
+
+@pytest.fixture
+def slow_fake_jira_server():
+    yield from _start_fake_jira_server(delay=0.1)
+
+
+def _get_jira_issues(server: FakeJiraServer, issue_ids: list[str]) -> list:
+    jira = JIRA(server.url, get_server_info=False)
+    return list(JiraIssues(jira).get_jira_issues(issue_ids))
+
+
+def test_get_jira_issues_chunked_queries(fake_jira_server: FakeJiraServer):
+    issue_ids = [str(i) for i in range(1, 251)]
+
+    jira_issues = _get_jira_issues(fake_jira_server, issue_ids)
+
+    assert sorted(ji.id for ji in jira_issues) == sorted(issue_ids)
+    assert len(fake_jira_server.searches) == 3
+    for params in fake_jira_server.searches:
+        assert params["jql"][0].startswith("id in (")
+        assert params["fields"] == JiraIssues.JIRA_ISSUE_FIELDS.split(",")
+
+
+def test_get_jira_issues_concurrent_queries(slow_fake_jira_server: FakeJiraServer):
+    issue_ids = [str(i) for i in range(1, 801)]
+
+    jira_issues = _get_jira_issues(slow_fake_jira_server, issue_ids)
+
+    assert len(jira_issues) == 800
+    assert len(slow_fake_jira_server.searches) == 8
+    assert slow_fake_jira_server.max_in_flight > 1
+
+
+def _jira_connection(server: FakeJiraServer) -> JIRA:
+    return JIRA(server.url, basic_auth=("user", "password"), get_server_info=False)
+
+
+def test_get_jira_users_concurrently(slow_fake_jira_server: FakeJiraServer):
+    user_ids = [f"user{i}" for i in range(8)] + ["missing"]
+
+    jira_users = JiraUsers(_jira_connection(slow_fake_jira_server))
+    result = jira_users.get_jira_users(user_ids)
+
+    assert [u.id for u in result] == user_ids[:-1]
+    assert slow_fake_jira_server.max_in_flight > 1
+    assert all(
+        a and a.startswith("Basic ") for a in slow_fake_jira_server.authorizations
+    )
+
+
+def test_get_jira_users_concurrency_limit(
+    slow_fake_jira_server: FakeJiraServer, monkeypatch
+):
+    monkeypatch.setattr(JiraUsers, "MAX_CONCURRENT_REQUESTS", 2)
+
+    jira_users = JiraUsers(_jira_connection(slow_fake_jira_server))
+    jira_users.get_jira_users([f"user{i}" for i in range(6)])
+
+    assert slow_fake_jira_server.max_in_flight == 2
+
+
+def test_cache_jira_projects_concurrently(slow_fake_jira_server: FakeJiraServer):
+    jira_projects = JiraProjects(_jira_connection(slow_fake_jira_server))
+
+    jira_projects.cache_jira_projects(["1", "2", "3", "missing"])
+
+    assert slow_fake_jira_server.max_in_flight > 1
+    assert jira_projects.lookup_jira_project("2", try_to_get=False).key == "P2"
+    assert jira_projects.lookup_jira_project("missing") is None
+
+
+def _list_jira_issues_concurrently(
+    server: FakeJiraServer, usernames: list[str]
+) -> list[list]:
+    results = [None] * len(usernames)
+
+    def run(index):
+        jira = JIRA(
+            server.url,
+            basic_auth=(usernames[index], "password"),
+            get_server_info=False,
+        )
+        results[index] = list(JiraIssues(jira).list_jira_issues("id in (1, 2)"))
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(usernames))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_list_jira_issues_coalesces_identical_requests(
+    slow_fake_jira_server: FakeJiraServer,
+):
+    results = _list_jira_issues_concurrently(slow_fake_jira_server, ["user"] * 4)
+
+    assert all([ji.id for ji in result] == ["1", "2"] for result in results)
+    assert len(slow_fake_jira_server.searches) == 1
+
+
+def test_list_jira_issues_does_not_coalesce_requests_of_other_users(
+    slow_fake_jira_server: FakeJiraServer,
+):
+    _list_jira_issues_concurrently(slow_fake_jira_server, ["user1", "user2"])
+
+    assert len(slow_fake_jira_server.searches) == 2
+
+
+def test_search_jira_issues_timeout(slow_fake_jira_server: FakeJiraServer):
+    jira = JIRA(
+        slow_fake_jira_server.url, get_server_info=False, timeout=0.02, max_retries=0
+    )
+    with pytest.raises(JIRAError) as error_info:
+        list(JiraIssues(jira).list_jira_issues("id in (1)"))
+    assert error_info.value.status_code == 504
+
+
+def test_get_jira_users_timeout(slow_fake_jira_server: FakeJiraServer):
+    jira = JIRA(
+        slow_fake_jira_server.url,
+        basic_auth=("user", "password"),
+        get_server_info=False,
+        timeout=0.02,
+    )
+    with pytest.raises(JIRAError) as error_info:
+        JiraUsers(jira).get_jira_users(["user1", "user2"])
+    assert error_info.value.status_code == 504
+
+
+def test_get_jira_issues_unreachable_jira():
+    # Nothing listens on port 9 (discard) of localhost
+    jira = JIRA("http://127.0.0.1:9", get_server_info=False, max_retries=0)
+    jira_issues = JiraIssues(jira)
+
+    assert list(jira_issues.get_jira_issues(["1"])) == []
+    assert jira_issues.jira_unavailable
+
+
+def test_jira_connections_share_http_connections(fake_jira_server: FakeJiraServer):
+    jira_config = JiraConfig(url=fake_jira_server.url)
+    for username in ("alice", "bob", "alice"):
+        jira = create_jira_connection(username, "password", jira_config)
+        jira.myself()
+
+    assert fake_jira_server.connections == 1
+    assert jira._is_cloud is False and jira._version == (9, 4, 0)
+
+
+def test_async_requests_of_users_share_http_connections(
+    fake_jira_server: FakeJiraServer,
+):
+    for username in ("alice", "bob"):
+        jira = JIRA(
+            fake_jira_server.url,
+            basic_auth=(username, "password"),
+            get_server_info=False,
+        )
+        JiraUsers(jira).get_jira_users(["user1"])
+
+    assert fake_jira_server.connections == 1
+    alice, bob = fake_jira_server.authorizations
+    assert alice != bob
+
+
+def test_close_jira_async_clients(fake_jira_server: FakeJiraServer):
+    JiraUsers(_jira_connection(fake_jira_server)).get_jira_users(["user1"])
+    close_jira_async_clients()
+
+    result = JiraUsers(_jira_connection(fake_jira_server)).get_jira_users(["user2"])
+
+    assert [u.id for u in result] == ["user2"]
+    assert fake_jira_server.connections == 2
@@ -0,0 +1,224 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from jira import JIRAError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from mvtool.config import Config
+from mvtool.data import jira_snapshots
+from mvtool.data.jira_ import JiraIssues
+from mvtool.data.jira_snapshots import JiraIssueSnapshots, get_jira_issue_snapshots
+from mvtool.data.measures import Measures
+from mvtool.data.requirements import Requirements
+from mvtool.db.schema import JiraIssueSnapshot, Measure, Requirement
+from mvtool.models import JiraIssue
+from mvtool.models.measures import MeasureInput
+
+
+@pytest.fixture
+def snapshots(jira, session: Session) -> JiraIssueSnapshots:
+    return JiraIssueSnapshots(JiraIssues(jira), session)
+
+
+@pytest.fixture
+def jira_issue(jira, jira_issue_data) -> JiraIssue:
+    return JiraIssues(jira)._to_jira_issue_model(jira_issue_data)
+
+
+@pytest.fixture
+def linked_measure(measures: Measures, requirement: Requirement, jira_issue_data):
+    measure_input = MeasureInput(summary="title", jira_issue_id=jira_issue_data.id)
+    return measures.create_measure(requirement, measure_input)
+
+
+def test_store_jira_issues(
+    session: Session, snapshots: JiraIssueSnapshots, jira_issue: JiraIssue
+):
+    snapshots.store_jira_issues([jira_issue])
+
+    snapshot = session.get(JiraIssueSnapshot, jira_issue.id)
+    assert snapshot.key == jira_issue.key
+    assert snapshot.status_name == jira_issue.status.name
+    assert snapshots._to_jira_issue_model(snapshot) == jira_issue
+
+
+def test_cache_jira_issues_stores_missing_snapshots(
+    session: Session, snapshots: JiraIssueSnapshots, jira, jira_issue_data
+):
+    snapshots.cache_jira_issues([jira_issue_data.id])
+
+    jira.search_issues.assert_called_once()
+    assert session.get(JiraIssueSnapshot, jira_issue_data.id) is not None
+
+
+def test_cache_jira_issues_reads_snapshots(
+    session: Session, jira, jira_issue: JiraIssue
+):
+    JiraIssueSnapshots(JiraIssues(jira), session).store_jira_issues([jira_issue])
+    jira_issues = JiraIssues(jira)
+
+    JiraIssueSnapshots(jira_issues, session).cache_jira_issues([jira_issue.id])
+
+    # Only the access to the JIRA issue is checked
+    jira.search_issues.assert_called_once_with(
+        f"id in ({jira_issue.id})", maxResults=0, validate_query=False, fields="id"
+    )
+    assert jira_issues.lookup_jira_issue(jira_issue.id) == jira_issue
+
+
+def test_cache_jira_issues_skips_inaccessible_snapshots(
+    session: Session, jira, jira_issue: JiraIssue
+):
+    JiraIssueSnapshots(JiraIssues(jira), session).store_jira_issues([jira_issue])
+    jira.search_issues.return_value = []
+    jira_issues = JiraIssues(jira)
+
+    JiraIssueSnapshots(jira_issues, session).cache_jira_issues([jira_issue.id])
+
+    jira.search_issues.assert_called_once()
+    assert jira_issues.lookup_jira_issue(jira_issue.id) is None
+
+
+def test_cache_jira_issues_starts_sync_of_outdated_snapshots(
+    session: Session, jira, jira_issue: JiraIssue, monkeypatch
+):
+    started = []
+    monkeypatch.setattr(
+        jira_snapshots, "start_sync_worker", lambda *args: started.append(args)
+    )
+    snapshots = JiraIssueSnapshots(JiraIssues(jira), session, max_age=60)
+    snapshots.store_jira_issues([jira_issue])
+
+    snapshots.cache_jira_issues([jira_issue.id])
+    assert started == []
+
+    snapshot = session.get(JiraIssueSnapshot, jira_issue.id)
+    snapshot.fetched_at = datetime.utcnow() - timedelta(minutes=2)
+    snapshots.cache_jira_issues([jira_issue.id])
+    assert started == [(jira, [jira_issue.id])]
+
+
+def test_cache_jira_issues_skips_sync_of_inaccessible_snapshots(
+    session: Session, jira, jira_issue: JiraIssue, monkeypatch
+):
+    started = []
+    monkeypatch.setattr(
+        jira_snapshots, "start_sync_worker", lambda *args: started.append(args)
+    )
+    JiraIssueSnapshots(JiraIssues(jira), session).store_jira_issues([jira_issue])
+    snapshot = session.get(JiraIssueSnapshot, jira_issue.id)
+    snapshot.fetched_at = datetime.utcnow() - timedelta(minutes=2)
+    jira.search_issues.return_value = []
+
+    snapshots = JiraIssueSnapshots(JiraIssues(jira), session, max_age=60)
+    snapshots.cache_jira_issues([jira_issue.id])
+
+    assert started == []
+
+
+def test_refresh_jira_issue_snapshots(
+    session: Session, snapshots: JiraIssueSnapshots, jira_issue: JiraIssue
+):
+    deleted_jira_issue = jira_issue.model_copy(update=dict(id="2"))
+    outdated_jira_issue = jira_issue.model_copy(update=dict(summary="outdated"))
+    snapshots.store_jira_issues([deleted_jira_issue, outdated_jira_issue])
+
+    snapshots.refresh_jira_issue_snapshots([jira_issue.id, deleted_jira_issue.id])
+
+    snapshot_list = session.execute(select(JiraIssueSnapshot)).scalars().all()
+    assert [s.id for s in snapshot_list] == [jira_issue.id]
+    assert snapshot_list[0].summary == jira_issue.summary
+
+
+def test_refresh_jira_issue_snapshots_jira_unavailable(
+    session: Session, snapshots: JiraIssueSnapshots, jira, jira_issue: JiraIssue
+):
+    snapshots.store_jira_issues([jira_issue])
+    jira.search_issues.side_effect = JIRAError("unavailable", status_code=503)
+
+    with pytest.raises(JIRAError):
+        snapshots.refresh_jira_issue_snapshots([jira_issue.id])
+    assert session.get(JiraIssueSnapshot, jira_issue.id) is not None
+
+
+def test_sync_jira_issue_snapshots(
+    session: Session,
+    snapshots: JiraIssueSnapshots,
+    linked_measure: Measure,
+    jira_issue: JiraIssue,
+):
+    unlinked_jira_issue = jira_issue.model_copy(update=dict(id="2"))
+    outdated_jira_issue = jira_issue.model_copy(update=dict(summary="outdated"))
+    snapshots.store_jira_issues([unlinked_jira_issue, outdated_jira_issue])
+    progress = []
+
+    count = snapshots.sync_jira_issue_snapshots(progress.append)
+
+    assert count == 1
+    assert progress == [1]
+    snapshot_list = session.execute(select(JiraIssueSnapshot)).scalars().all()
+    assert [s.id for s in snapshot_list] == [linked_measure.jira_issue_id]
+    assert snapshot_list[0].summary == jira_issue.summary
+
+
+def test_list_measures_reads_snapshots(
+    session: Session,
+    jira,
+    requirements: Requirements,
+    documents,
+    linked_measure: Measure,
+    jira_issue: JiraIssue,
+):
+    jira_issues = JiraIssues(jira)
+    snapshots = JiraIssueSnapshots(jira_issues, session)
+    snapshots.store_jira_issues([jira_issue])
+    jira.reset_mock()
+
+    measures = Measures(jira_issues, requirements, documents, session, snapshots)
+    (measure,) = measures.list_measures()
+
+    jira.search_issues.assert_not_called()
+    assert measure.jira_issue == jira_issue
+
+
+def test_get_jira_issue_snapshots(config: Config, jira_issues, session: Session):
+    assert get_jira_issue_snapshots(jira_issues, session, config) is None
+
+    config.jira_snapshots.enabled = True
+    snapshots = get_jira_issue_snapshots(jira_issues, session, config)
+    assert isinstance(snapshots, JiraIssueSnapshots)
+    assert snapshots._max_age == config.jira_snapshots.max_age
+
+
+def test_start_sync_worker_once(jira, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(
+        jira_snapshots, "_sync_jira_issue_snapshots", lambda *_: release.wait(5)
+    )
+
+    assert jira_snapshots.start_sync_worker(jira, ["1"]) is True
+    assert jira_snapshots.start_sync_worker(jira, ["1"]) is False
+
+    release.set()
+    jira_snapshots.wait_for_sync_worker(5)
+    assert jira_snapshots.start_sync_worker(jira, ["1"]) is True
+    jira_snapshots.wait_for_sync_worker(5)
@@ -0,0 +1,167 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+from jira import JIRAError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from mvtool.config import Config
+from mvtool.data.jira_ import JiraUsers
+from mvtool.data.jira_users import JiraUserDirectory, get_jira_user_directory
+from mvtool.db.schema import JiraUserEntry, JiraUserSearch
+from mvtool.models import JiraUser
+
+
+@pytest.fixture
+def jira_users_data():
+    return [
+        dict(name="jdoe", displayName="John Doe", emailAddress="john@example.com"),
+        dict(name="asmith", displayName="Anna Smith", emailAddress="anna@x.org"),
+        dict(name="bob", displayName="Bob Lee", emailAddress=None),
+    ]
+
+
+@pytest.fixture
+def jira_users(jira, jira_users_data) -> JiraUsers:
+    def user(jira_user_id):
+        for data in jira_users_data:
+            if data["name"] == jira_user_id:
+                return data
+        raise JIRAError("User not found", 404)
+
+    jira.user = Mock(side_effect=user)
+    jira.search_assignable_users_for_issues = Mock(
+        return_value=[Mock(raw=data) for data in jira_users_data[:2]]
+    )
+    return JiraUsers(jira)
+
+
+@pytest.fixture
+def directory(jira_users: JiraUsers, session: Session) -> JiraUserDirectory:
+    return JiraUserDirectory(jira_users, session, ttl=60)
+
+
+def test_get_jira_users_stores_missing_users(
+    directory: JiraUserDirectory, session: Session, jira
+):
+    results = directory.get_jira_users(["jdoe", "missing", "bob"])
+
+    assert [u.id for u in results] == ["jdoe", "bob"]
+    assert jira.user.call_count == 3
+    assert session.get(JiraUserEntry, "jdoe").display_name == "John Doe"
+
+
+def test_get_jira_users_reads_directory(directory: JiraUserDirectory, jira):
+    directory.get_jira_users(["jdoe"])
+    jira.user.reset_mock()
+
+    results = directory.get_jira_users(["jdoe"])
+
+    assert results == [
+        JiraUser(id="jdoe", display_name="John Doe", email_address="john@example.com")
+    ]
+    jira.user.assert_not_called()
+
+
+def test_get_jira_users_refreshes_outdated_users(
+    directory: JiraUserDirectory, session: Session, jira
+):
+    directory.get_jira_users(["jdoe"])
+    entry = session.get(JiraUserEntry, "jdoe")
+    entry.fetched_at = datetime.utcnow() - timedelta(seconds=120)
+    jira.user.reset_mock()
+
+    directory.get_jira_users(["jdoe"])
+
+    jira.user.assert_called_once()
+    assert entry.fetched_at > datetime.utcnow() - timedelta(seconds=60)
+
+
+def test_get_jira_user_stores_myself(
+    directory: JiraUserDirectory, session: Session, jira_user_data
+):
+    result = directory.get_jira_user()
+
+    assert result.id == jira_user_data["accountId"]
+    assert session.get(JiraUserEntry, result.id) is not None
+
+
+def test_get_jira_user_not_found(directory: JiraUserDirectory):
+    with pytest.raises(JIRAError):
+        directory.get_jira_user("missing")
+
+
+def test_search_jira_users_stores_results(directory: JiraUserDirectory, jira):
+    results = directory.search_jira_users("", "KEY")
+
+    assert [u.id for u in results] == ["jdoe", "asmith"]
+    jira.search_assignable_users_for_issues.assert_called_once()
+
+    # Searches for extensions of a complete search are answered locally
+    assert [u.id for u in directory.search_jira_users("Sm", "KEY")] == ["asmith"]
+    assert [u.id for u in directory.search_jira_users("john@", "KEY")] == ["jdoe"]
+    assert [u.id for u in directory.search_jira_users("ASM", "KEY")] == ["asmith"]
+    assert directory.search_jira_users("a%", "KEY") == []
+    jira.search_assignable_users_for_issues.assert_called_once()
+
+
+def test_search_jira_users_in_other_project(directory: JiraUserDirectory, jira):
+    directory.search_jira_users("a", "KEY")
+    directory.search_jira_users("a", "OTHER")
+
+    assert jira.search_assignable_users_for_issues.call_count == 2
+
+
+def test_search_jira_users_truncated_results(directory: JiraUserDirectory, jira):
+    # Truncated results cannot answer other searches
+    directory.search_jira_users("a", "KEY", limit=2)
+    directory.search_jira_users("an", "KEY", limit=2)
+
+    assert jira.search_assignable_users_for_issues.call_count == 2
+
+
+def test_search_jira_users_limit(directory: JiraUserDirectory, jira):
+    directory.search_jira_users("", "KEY", limit=5)
+
+    results = directory.search_jira_users("", "KEY", limit=1)
+
+    assert [u.id for u in results] == ["asmith"]
+    jira.search_assignable_users_for_issues.assert_called_once()
+
+
+def test_search_jira_users_outdated_search(
+    directory: JiraUserDirectory, session: Session, jira
+):
+    directory.search_jira_users("a", "KEY")
+    for search in session.scalars(select(JiraUserSearch)):
+        search.fetched_at = datetime.utcnow() - timedelta(seconds=120)
+    session.flush()
+
+    directory.search_jira_users("a", "KEY")
+
+    assert jira.search_assignable_users_for_issues.call_count == 2
+
+
+def test_get_jira_user_directory(
+    jira_users: JiraUsers, session: Session, config: Config
+):
+    config.cache.jira_users_ttl = 30
+    directory = get_jira_user_directory(jira_users, session, config)
+    assert directory._ttl == 30
@@ -0,0 +1,141 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import json
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.orm import Session
+
+from mvtool.config import Config
+from mvtool.data.jira_ import JiraIssues, _shared_jira_issues_cache
+from mvtool.data.jira_snapshots import JiraIssueSnapshots
+from mvtool.data.jira_webhooks import JiraWebhooks
+from mvtool.db.schema import JiraIssueSnapshot
+from mvtool.models import JiraIssue, JiraWebhookEvent
+from mvtool.utils.errors import NotFoundError, UnauthorizedError
+
+
+def load_jira_webhook_event(name: str) -> JiraWebhookEvent:
+    """Load a webhook payload recorded from JIRA."""
+    with open(f"tests/data/jira_webhooks/{name}.json") as payload_file:
+        return JiraWebhookEvent.model_validate(json.load(payload_file))
+
+
+@pytest.fixture
+def jira_webhooks(session: Session, config: Config) -> JiraWebhooks:
+    config.jira.webhook_secret = "secret"
+    return JiraWebhooks(session, config)
+
+
+@pytest.fixture
+def jira_issue(jira, jira_issue_data) -> JiraIssue:
+    return JiraIssues(jira)._to_jira_issue_model(jira_issue_data)
+
+
+@pytest.fixture
+def snapshot(session: Session, jira, jira_issue: JiraIssue) -> JiraIssueSnapshot:
+    JiraIssueSnapshots(JiraIssues(jira), session).store_jira_issues([jira_issue])
+    return session.get(JiraIssueSnapshot, jira_issue.id)
+
+
+def _cache_shared(jira, jira_issue: JiraIssue) -> None:
+    connection = Mock(wraps=jira, server_url=jira.server_url)
+    connection._session = Mock(auth=("user", "password"))
+    JiraIssues(connection)._cache_jira_issue(jira_issue)
+
+
+def test_check_secret(jira_webhooks: JiraWebhooks):
+    jira_webhooks.check_secret("secret")
+
+    for secret in ("wrong", None):
+        with pytest.raises(UnauthorizedError):
+            jira_webhooks.check_secret(secret)
+
+
+def test_check_secret_webhooks_disabled(session: Session, config: Config):
+    with pytest.raises(NotFoundError):
+        JiraWebhooks(session, config).check_secret("secret")
+
+
+def test_issue_updated_updates_snapshot(
+    jira_webhooks: JiraWebhooks, snapshot: JiraIssueSnapshot
+):
+    jira_webhooks.process_event(load_jira_webhook_event("issue_updated"))
+
+    assert snapshot.summary == "updated summary"
+    assert snapshot.status_name == "Done"
+    assert snapshot.status_color_name == "green"
+    assert snapshot.assignee_id == "jdoe"
+
+
+def test_issue_updated_creates_no_snapshot(
+    jira_webhooks: JiraWebhooks, session: Session
+):
+    jira_webhooks.process_event(load_jira_webhook_event("issue_updated"))
+    assert session.get(JiraIssueSnapshot, "1") is None
+
+
+def test_issue_updated_evicts_cached_issue(
+    jira_webhooks: JiraWebhooks, jira, jira_issue: JiraIssue
+):
+    _cache_shared(jira, jira_issue)
+    assert _shared_jira_issues_cache.stats.size == 1
+
+    jira_webhooks.process_event(load_jira_webhook_event("issue_updated"))
+
+    assert _shared_jira_issues_cache.stats.size == 0
+
+
+def test_incomplete_issue_deletes_snapshot(
+    jira_webhooks: JiraWebhooks, session: Session, snapshot: JiraIssueSnapshot
+):
+    event = load_jira_webhook_event("issue_updated")
+    del event.issue["fields"]["status"]
+
+    jira_webhooks.process_event(event)
+
+    assert session.get(JiraIssueSnapshot, snapshot.id) is None
+
+
+def test_issue_deleted_deletes_snapshot(
+    jira_webhooks: JiraWebhooks,
+    session: Session,
+    snapshot: JiraIssueSnapshot,
+    jira,
+    jira_issue: JiraIssue,
+):
+    _cache_shared(jira, jira_issue)
+    session.expunge(snapshot)
+
+    jira_webhooks.process_event(load_jira_webhook_event("issue_deleted"))
+
+    assert session.get(JiraIssueSnapshot, snapshot.id) is None
+    assert _shared_jira_issues_cache.stats.size == 0
+
+
+def test_other_events_are_ignored(
+    jira_webhooks: JiraWebhooks,
+    snapshot: JiraIssueSnapshot,
+    jira,
+    jira_issue: JiraIssue,
+):
+    _cache_shared(jira, jira_issue)
+
+    jira_webhooks.process_event(load_jira_webhook_event("comment_created"))
+
+    assert snapshot.summary == jira_issue.summary
+    assert _shared_jira_issues_cache.stats.size == 1
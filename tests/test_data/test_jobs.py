@@ -0,0 +1,354 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import threading
+from datetime import datetime, timedelta
+from tempfile import NamedTemporaryFile
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from mvtool.config import Config
+from mvtool.data.jobs import (
+    Jobs,
+    beat_jobs,
+    setup_job_executor,
+    shutdown_job_executor,
+    wait_for_job,
+)
+from mvtool.db.schema import Job
+from mvtool.utils.errors import ClientError, NotFoundError, ValueHttpError
+
+
+@pytest.fixture
+def job_executor(config: Config, session: Session):
+    yield setup_job_executor(config.jobs)
+    shutdown_job_executor()
+
+
+@pytest.fixture
+def jobs(session: Session) -> Jobs:
+    return Jobs(session, "user", None)
+
+
+def test_create_job(jobs: Jobs):
+    job = jobs.create_job("kind", result_filename="result.csv")
+
+    assert job.id is not None
+    assert job.kind == "kind"
+    assert job.owner == "user"
+    assert job.status == "pending"
+    assert job.processed == 0
+    assert job.result_filename == "result.csv"
+
+
+def test_list_jobs(session: Session, jobs: Jobs):
+    job = jobs.create_job("kind")
+    Jobs(session, "other", None).create_job("kind")
+
+    assert jobs.list_jobs() == [job]
+
+
+def test_get_job(jobs: Jobs):
+    job = jobs.create_job("kind")
+    assert jobs.get_job(job.id) is job
+
+
+def test_get_job_of_other_user(session: Session, jobs: Jobs):
+    job = Jobs(session, "other", None).create_job("kind")
+
+    with pytest.raises(NotFoundError):
+        jobs.get_job(job.id)
+
+
+def test_submit_job_completed(session: Session, jobs: Jobs, job_executor):
+    def job_function(session, report_progress):
+        report_progress(3)
+        return "result_path"
+
+    job = jobs.create_job("kind")
+    jobs.submit_job(job, job_function)
+    wait_for_job(job.id)
+
+    session.refresh(job)
+    assert job.status == "completed"
+    assert job.processed == 3
+    assert job.error is None
+    assert job.result_path == "result_path"
+
+
+def test_submit_job_failed(session: Session, jobs: Jobs, job_executor):
+    def job_function(session, report_progress):
+        report_progress(1)
+        raise ValueHttpError("Invalid row")
+
+    job = jobs.create_job("kind")
+    jobs.submit_job(job, job_function)
+    wait_for_job(job.id)
+
+    session.refresh(job)
+    assert job.status == "failed"
+    assert job.processed == 1
+    assert job.error == "Invalid row"
+    assert job.result_path is None
+
+
+def test_submit_job_without_executor(jobs: Jobs):
+    job = jobs.create_job("kind")
+
+    with pytest.raises(RuntimeError):
+        jobs.submit_job(job, lambda *_: None)
+
+
+def test_get_progress(jobs: Jobs):
+    job = jobs.create_job("kind")
+    job.processed = 5
+
+    assert jobs.get_progress(job) == 5
+
+
+def _create_temp_file() -> str:
+    with NamedTemporaryFile(delete=False) as temp_file:
+        return temp_file.name
+
+
+def _stop_heartbeat(job: Job) -> None:
+    job.heartbeat = datetime.utcnow() - timedelta(hours=1)
+
+
+def test_setup_job_executor_fails_interrupted_jobs(
+    config: Config, session: Session, jobs: Jobs
+):
+    job = jobs.create_job("kind")
+    _stop_heartbeat(job)
+    session.commit()
+
+    setup_job_executor(config.jobs)
+    shutdown_job_executor()
+
+    session.refresh(job)
+    assert job.status == "failed"
+    assert job.error == "Job was interrupted"
+
+
+def test_setup_job_executor_keeps_jobs_of_other_workers(
+    config: Config, session: Session, jobs: Jobs
+):
+    input_path = _create_temp_file()
+    job = jobs.create_job("kind", input_path=input_path)
+    job.status = "running"
+    session.commit()
+
+    setup_job_executor(config.jobs)
+    shutdown_job_executor()
+
+    session.refresh(job)
+    assert job.status == "running"
+    assert os.path.exists(input_path)
+    os.remove(input_path)
+
+
+def test_beat_jobs(session: Session, jobs: Jobs, job_executor):
+    started, release = threading.Event(), threading.Event()
+
+    def job_function(session, report_progress):
+        report_progress(2)
+        started.set()
+        release.wait(5)
+
+    job = jobs.create_job("kind")
+    _stop_heartbeat(job)
+    heartbeat = job.heartbeat
+    jobs.submit_job(job, job_function)
+    started.wait(5)
+    try:
+        beat_jobs(session)
+        session.refresh(job)
+        assert job.heartbeat > heartbeat
+        assert job.processed == 2
+    finally:
+        release.set()
+        wait_for_job(job.id)
+
+
+def test_delete_job(session: Session, jobs: Jobs):
+    with NamedTemporaryFile(delete=False) as temp_file:
+        pass
+    job = jobs.create_job("kind")
+    job.status = "completed"
+    job.result_path = temp_file.name
+
+    jobs.delete_job(job)
+
+    assert session.get(Job, job.id) is None
+    assert not os.path.exists(temp_file.name)
+
+
+def test_delete_running_job(jobs: Jobs, job_executor):
+    def job_function(session, report_progress):
+        # Wait until the deletion has been tried
+        with pytest.raises(ClientError):
+            jobs.delete_job(job)
+
+    job = jobs.create_job("kind")
+    jobs.submit_job(job, job_function)
+    wait_for_job(job.id)
+
+
+def test_delete_job_running_in_other_worker(jobs: Jobs):
+    job = jobs.create_job("kind")
+    job.status = "running"
+
+    with pytest.raises(ClientError):
+        jobs.delete_job(job)
+
+
+def test_submit_job_deleted_before_start(config: Config, session: Session, jobs: Jobs):
+    config.jobs.max_workers = 1
+    setup_job_executor(config.jobs)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_job_function(session, report_progress):
+        started.set()
+        release.wait(5)
+
+    blocking_job = jobs.create_job("kind")
+    jobs.submit_job(blocking_job, blocking_job_function)
+    job = jobs.create_job("kind")
+    jobs.submit_job(job, lambda *_: None)
+    started.wait(5)
+
+    # Delete the job like another worker process would
+    session.delete(job)
+    session.commit()
+    release.set()
+    wait_for_job(job.id)
+    shutdown_job_executor()
+
+    assert session.get(Job, job.id) is None
+
+
+def test_submit_job_deleted_while_running(session: Session, jobs: Jobs, job_executor):
+    result_path = _create_temp_file()
+
+    def job_function(session, report_progress):
+        session.execute(delete(Job).where(Job.id == job_id))
+        return result_path
+
+    job = jobs.create_job("kind")
+    job_id = job.id
+    jobs.submit_job(job, job_function)
+    wait_for_job(job_id)
+
+    session.expunge(job)
+    assert session.get(Job, job_id) is None
+    assert not os.path.exists(result_path)
+
+
+@pytest.mark.parametrize("fails", [False, True])
+def test_submit_job_removes_input_file(
+    session: Session, jobs: Jobs, job_executor, fails: bool
+):
+    def job_function(session, report_progress):
+        assert os.path.exists(input_path)
+        if fails:
+            raise ValueHttpError("Invalid row")
+
+    input_path = _create_temp_file()
+    job = jobs.create_job("kind", input_path=input_path)
+    jobs.submit_job(job, job_function)
+    wait_for_job(job.id)
+
+    session.refresh(job)
+    assert job.status == ("failed" if fails else "completed")
+    assert job.input_path is None
+    assert not os.path.exists(input_path)
+
+
+def test_delete_pending_job_removes_input_file(session: Session, jobs: Jobs):
+    input_path = _create_temp_file()
+    job = jobs.create_job("kind", input_path=input_path)
+
+    jobs.delete_job(job)
+
+    assert session.get(Job, job.id) is None
+    assert not os.path.exists(input_path)
+
+
+def test_setup_job_executor_removes_files_of_interrupted_jobs(
+    config: Config, session: Session, jobs: Jobs
+):
+    input_path = _create_temp_file()
+    job = jobs.create_job("kind", input_path=input_path)
+    _stop_heartbeat(job)
+    session.commit()
+
+    setup_job_executor(config.jobs)
+    shutdown_job_executor()
+
+    session.refresh(job)
+    assert job.status == "failed"
+    assert not os.path.exists(input_path)
+
+
+def test_shutdown_job_executor_fails_cancelled_jobs(
+    config: Config, session: Session, jobs: Jobs
+):
+    config.jobs.max_workers = 1
+    setup_job_executor(config.jobs)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking_job_function(session, report_progress):
+        started.set()
+        release.wait(5)
+
+    running_job = jobs.create_job("kind")
+    jobs.submit_job(running_job, blocking_job_function)
+    input_path = _create_temp_file()
+    pending_job = jobs.create_job("kind", input_path=input_path)
+    jobs.submit_job(pending_job, lambda *_: None)
+    started.wait(5)
+
+    release.set()
+    shutdown_job_executor()
+
+    session.refresh(running_job)
+    session.refresh(pending_job)
+    assert running_job.status == "completed"
+    assert pending_job.status == "failed"
+    assert pending_job.error == "Job was cancelled"
+    assert not os.path.exists(input_path)
+
+
+def test_sweep_jobs(config: Config, session: Session, jobs: Jobs):
+    result_path = _create_temp_file()
+    expired_job = jobs.create_job("kind")
+    expired_job.status = "completed"
+    expired_job.result_path = result_path
+    expired_job.updated = datetime.utcnow() - timedelta(days=2)
+    pending_job = jobs.create_job("kind")
+    pending_job.updated = datetime.utcnow() - timedelta(days=2)
+    session.flush()
+
+    setup_job_executor(config.jobs)
+    shutdown_job_executor()
+
+    session.expire_all()
+    assert jobs.list_jobs() == [pending_job]
+    assert not os.path.exists(result_path)
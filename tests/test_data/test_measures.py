@@ -19,7 +19,7 @@ from unittest.mock import Mock
 
 import jira
 import pytest
-from sqlalchemy import desc
+from sqlalchemy import desc, event, func
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import select
 
@@ -857,3 +857,116 @@ def test_bulk_create_update_measures_skip_flush(
 
     # Check if the flush method was not called
     measures.session.flush.assert_not_called()
+
+
+def test_stream_create_update_measures(
+    session: Session, measures: Measures, requirement: Requirement
+):
+    # Create some test data, nested requirements are repeated across batches
+    measure_imports = (
+        MeasureImport(
+            summary=f"summary{i}",
+            requirement=RequirementImport(summary=f"requirement{i % 2}"),
+        )
+        for i in range(5)
+    )
+
+    # Test creating measures in batches
+    summary = measures.stream_create_update_measures(
+        measure_imports, fallback_requirement=requirement, batch_size=2
+    )
+
+    # Check if all measures are created and released from the session
+    assert summary.count == 5
+    assert summary.created == 5
+    assert session.execute(select(func.count()).select_from(Measure)).scalar() == 5
+    assert not any(isinstance(o, Measure) for o in session.identity_map.values())
+
+    # Check if nested requirements are created only once
+    requirement_summaries = session.execute(select(Requirement.summary)).scalars()
+    assert sorted(requirement_summaries) == ["requirement0", "requirement1", "title"]
+
+
+def test_stream_create_update_measures_releases_nested_items(
+    session: Session, measures: Measures, requirement: Requirement
+):
+    measure_imports = (
+        MeasureImport(
+            summary=f"summary{i}",
+            requirement=RequirementImport(summary=f"requirement{i % 2}"),
+            document=DocumentImport(reference=f"document{i % 2}", title="title"),
+        )
+        for i in range(5)
+    )
+
+    measures.stream_create_update_measures(
+        measure_imports, fallback_requirement=requirement, batch_size=2
+    )
+
+    # Check if only the fallback requirement is kept in the session
+    remaining = [
+        o
+        for o in session.identity_map.values()
+        if isinstance(o, (Measure, Requirement, Document))
+    ]
+    assert remaining == [requirement]
+
+    # Check if nested items of earlier batches are reused by later batches
+    assert session.execute(select(func.count()).select_from(Document)).scalar() == 2
+    measures_by_summary = {
+        m.summary: m for m in session.execute(select(Measure)).scalars()
+    }
+    assert measures_by_summary["summary0"].requirement_id == (
+        measures_by_summary["summary4"].requirement_id
+    )
+    assert measures_by_summary["summary1"].document_id == (
+        measures_by_summary["summary3"].document_id
+    )
+
+
+def test_stream_create_update_measures_flushes_per_batch(
+    measures: Measures, requirement: Requirement
+):
+    measure_imports = [MeasureImport(summary=f"summary{i}") for i in range(5)]
+    measures.session = Mock(wraps=measures.session)
+
+    measures.stream_create_update_measures(
+        measure_imports, fallback_requirement=requirement, batch_size=2
+    )
+
+    # Check if the session was flushed once per batch
+    assert measures.session.flush.call_count == 3
+
+
+def test_stream_create_update_measures_counts_changes(
+    session: Session, measures: Measures, requirement: Requirement
+):
+    existing = [
+        measures.create_measure(requirement, MeasureInput(summary=f"summary{i}"))
+        for i in range(3)
+    ]
+    updated_timestamps = [m.updated for m in existing]
+    measure_imports = [
+        MeasureImport(id=existing[0].id, summary="summary0"),
+        MeasureImport(id=existing[1].id, summary="changed"),
+        MeasureImport(id=existing[2].id, summary="summary2"),
+        MeasureImport(summary="new"),
+    ]
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(session.get_bind(), "before_cursor_execute", listener)
+    try:
+        summary = measures.stream_create_update_measures(
+            measure_imports, fallback_requirement=requirement, patch=True
+        )
+    finally:
+        event.remove(session.get_bind(), "before_cursor_execute", listener)
+
+    assert summary.model_dump() == dict(count=4, created=1, updated=1, unchanged=2)
+
+    # Only the changed measure is updated
+    updates = [s for s in statements if s.lstrip().upper().startswith("UPDATE")]
+    assert len(updates) == 1
+    assert session.get(Measure, existing[0].id).updated == updated_timestamps[0]
+    assert session.get(Measure, existing[2].id).updated == updated_timestamps[2]
@@ -15,19 +15,31 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from unittest.mock import patch
+
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import create_engine, event, exc, func, inspect, select, text
+from sqlalchemy.pool import StaticPool
 
+from mvtool.config import DatabaseConfig
 from mvtool.db.database import (
+    TimedQueuePool,
     create_all,
     create_in_db,
     dispose_connection,
     drop_all,
+    get_change_state,
+    get_load_options,
+    get_pool_stats,
     get_session,
     read_from_db,
+    read_many_from_db,
+    set_changed_attrs,
     setup_connection,
+    upsert_into_db,
 )
-from mvtool.db.schema import Project
+from mvtool.db.schema import JiraIssueSnapshot, Project, Requirement
 
 
 def test_setup_engine(config):
@@ -78,3 +90,257 @@ def test_session_rollback(config):
 
     drop_all()
     dispose_connection()
+
+
+def test_read_many_from_db(session):
+    projects = [create_in_db(session, Project(name=f"test{i}")) for i in range(3)]
+    session.expunge(projects[0])
+
+    items = read_many_from_db(session, Project, [p.id for p in projects] + [-1])
+
+    assert set(items.keys()) == {p.id for p in projects}
+    assert items[projects[1].id] is projects[1]
+    assert items[projects[0].id] is not projects[0]
+    assert items[projects[0].id].name == "test0"
+
+
+def test_read_many_from_db_uses_identity_map(session):
+    project = create_in_db(session, Project(name="test"))
+    queries = []
+    event.listen(
+        session.get_bind(), "before_cursor_execute", lambda *a: queries.append(a)
+    )
+
+    items = read_many_from_db(session, Project, [project.id])
+
+    assert items == {project.id: project}
+    assert queries == []
+
+
+def test_get_load_options(session):
+    project = create_in_db(session, Project(name="name", description="description"))
+    create_in_db(session, Requirement(summary="summary", project=project))
+    session.expunge_all()
+
+    options = get_load_options(
+        Requirement, {"summary": None, "project": {"name": None}}
+    )
+    requirement = session.scalars(select(Requirement).options(*options)).unique().one()
+
+    assert "description" in inspect(requirement).unloaded
+    assert "catalog_requirement" in inspect(requirement).unloaded
+    assert "project" not in inspect(requirement).unloaded
+    assert "description" in inspect(requirement.project).unloaded
+    assert requirement.project.name == "name"
+
+
+def test_get_load_options_property_column(session):
+    project = create_in_db(session, Project(name="name", jira_project_id="JP"))
+    session.expunge_all()
+
+    options = get_load_options(Project, {"jira_project": None})
+    project = session.scalars(select(Project).options(*options)).unique().one()
+
+    assert "jira_project_id" not in inspect(project).unloaded
+    assert "name" in inspect(project).unloaded
+
+
+def test_set_changed_attrs(session):
+    project = create_in_db(session, Project(name="test", description="description"))
+
+    set_changed_attrs(project, {"name": "test", "description": "description"})
+    assert project not in session.dirty
+
+    set_changed_attrs(project, {"name": "test", "description": "changed"})
+    assert project in session.dirty
+    assert project.description == "changed"
+
+
+def test_upsert_into_db(session):
+    project = create_in_db(session, Project(name="old"))
+
+    upsert_into_db(
+        session, Project, [dict(id=project.id, name="new"), dict(id=-1, name="other")]
+    )
+
+    assert project.name == "new"  # expired and reloaded
+    assert session.get(Project, -1).name == "other"
+
+
+def test_upsert_into_db_respects_sqlite_parameter_limit(session):
+    rows = [
+        dict(
+            id=str(i),
+            key=f"KEY-{i}",
+            summary="summary",
+            issuetype_id="1",
+            issuetype_name="Task",
+            project_id="1",
+            project_key="KEY",
+            project_name="Project",
+            status_name="Open",
+            status_color_name="blue",
+        )
+        for i in range(200)
+    ]
+    parameter_counts = []
+    listener = lambda conn, cursor, statement, parameters, *args: (
+        parameter_counts.append(len(parameters))
+    )
+    event.listen(session.get_bind(), "before_cursor_execute", listener)
+    try:
+        upsert_into_db(session, JiraIssueSnapshot, rows)
+    finally:
+        event.remove(session.get_bind(), "before_cursor_execute", listener)
+
+    assert len(parameter_counts) > 1
+    assert max(parameter_counts) <= 999
+    assert session.execute(select(func.count(JiraIssueSnapshot.id))).scalar() == 200
+
+
+def test_upsert_into_db_row_inserted_by_other_session(tmp_path):
+    setup_connection(DatabaseConfig(url=f"sqlite:///{tmp_path / 'db'}"))
+    create_all()
+    try:
+        for name in ("first", "second"):
+            for session in get_session():
+                upsert_into_db(session, Project, [dict(id=1, name=name)])
+
+        for session in get_session():
+            assert session.get(Project, 1).name == "second"
+    finally:
+        drop_all()
+        dispose_connection()
+
+
+def test_get_change_state(session):
+    project = Project(name="test")
+    session.add(project)
+    assert get_change_state(project) == "created"
+
+    session.flush()
+    assert get_change_state(project) == "unchanged"
+
+    project.name = "test"
+    assert get_change_state(project) == "unchanged"
+
+    project.name = "changed"
+    assert get_change_state(project) == "updated"
+
+
+def test_setup_connection_pool_options():
+    database_config = DatabaseConfig(
+        url="postgresql+psycopg2://localhost/mvtool",
+        pool_size=20,
+        max_overflow=5,
+        pool_timeout=3,
+        pool_recycle=1800,
+        pool_pre_ping=False,
+        insertmanyvalues_page_size=500,
+        executemany_mode="values_plus_batch",
+    )
+    with patch("mvtool.db.database.create_engine") as create_engine_mock:
+        setup_connection(database_config)
+        dispose_connection()
+
+    create_engine_mock.assert_called_once_with(
+        "postgresql+psycopg2://localhost/mvtool",
+        poolclass=TimedQueuePool,
+        pool_size=20,
+        max_overflow=5,
+        pool_timeout=3,
+        pool_recycle=1800,
+        pool_pre_ping=False,
+        echo=False,
+        use_insertmanyvalues=True,
+        insertmanyvalues_page_size=500,
+        executemany_mode="values_plus_batch",
+    )
+
+
+def test_setup_connection_executemany_mode_not_supported(tmp_path, caplog):
+    database_config = DatabaseConfig(
+        url=f"sqlite:///{tmp_path / 'db'}", executemany_mode="values_plus_batch"
+    )
+    engine, _ = setup_connection(database_config)
+    try:
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
+    finally:
+        dispose_connection()
+    assert "executemany_mode is not supported by the pysqlite driver" in caplog.text
+
+
+def test_setup_connection_statement_timeout_not_supported(config, caplog):
+    config.database.statement_timeout = 10
+    setup_connection(config.database)
+    dispose_connection()
+    assert "statement_timeout is not supported by sqlite" in caplog.text
+
+
+def test_get_pool_stats_not_pooled(config):
+    setup_connection(config.database)
+    assert get_pool_stats() is None
+    dispose_connection()
+
+
+def test_timed_queue_pool_stats(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+    with engine.connect():
+        stats = engine.pool.stats
+        assert (stats.size, stats.checked_out, stats.overflow) == (1, 1, 0)
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = engine.pool.stats
+    assert stats.checked_out == 0
+    assert stats.checkouts == 2
+    assert stats.timeouts == 1
+    assert stats.max_wait_time >= 0.01
+    assert stats.mean_wait_time == stats.wait_time / 2
+    engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "url", ["sqlite://", "sqlite:///:memory:", "sqlite:///file:db?mode=memory&uri=true"]
+)
+def test_setup_connection_sqlite_in_memory(url):
+    engine, _ = setup_connection(DatabaseConfig(url=url))
+    assert isinstance(engine.pool, StaticPool)
+    dispose_connection()
+
+
+def test_setup_connection_sqlite_file(tmp_path):
+    engine, _ = setup_connection(DatabaseConfig(url=f"sqlite:///{tmp_path / 'db'}"))
+    try:
+        assert isinstance(engine.pool, TimedQueuePool)
+        with engine.connect() as connection:
+            pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1  # NORMAL
+            assert pragma("busy_timeout") == 5000
+            assert pragma("cache_size") == -64 * 1024
+    finally:
+        dispose_connection()
+
+
+def test_setup_connection_sqlite_file_concurrent_sessions(tmp_path):
+    setup_connection(DatabaseConfig(url=f"sqlite:///{tmp_path / 'db'}"))
+    create_all()
+    try:
+        sessions = [get_session() for _ in range(2)]
+        connections = [
+            next(s).connection().connection.dbapi_connection for s in sessions
+        ]
+        assert connections[0] is not connections[1]
+        for session in sessions:
+            session.close()
+    finally:
+        drop_all()
+        dispose_connection()
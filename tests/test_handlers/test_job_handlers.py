@@ -0,0 +1,81 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from tempfile import NamedTemporaryFile
+
+import pytest
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from mvtool.data.jobs import Jobs
+from mvtool.db.schema import Job
+from mvtool.handlers.jobs import delete_job, download_job_result, get_job, get_jobs
+from mvtool.models.jobs import JobOutput
+from mvtool.utils.errors import ClientError, NotFoundError
+
+
+@pytest.fixture
+def jobs(session: Session) -> Jobs:
+    return Jobs(session, "user", None)
+
+
+@pytest.fixture
+def job(jobs: Jobs) -> Job:
+    return jobs.create_job("kind", result_filename="result.csv")
+
+
+def test_get_jobs(jobs: Jobs, job: Job):
+    jobs_list = get_jobs(jobs)
+
+    assert len(jobs_list) == 1
+    assert isinstance(jobs_list[0], JobOutput)
+    assert jobs_list[0].id == job.id
+
+
+def test_get_job(jobs: Jobs, job: Job):
+    job_output = get_job(job.id, jobs)
+
+    assert isinstance(job_output, JobOutput)
+    assert job_output.id == job.id
+    assert job_output.status == "pending"
+
+
+def test_download_job_result(jobs: Jobs, job: Job):
+    with NamedTemporaryFile(delete=False) as temp_file:
+        pass
+    job.status = "completed"
+    job.result_path = temp_file.name
+
+    response = download_job_result(job.id, jobs)
+    os.remove(temp_file.name)
+
+    assert isinstance(response, FileResponse)
+    assert response.path == temp_file.name
+    assert response.filename == "result.csv"
+
+
+def test_download_job_result_not_completed(jobs: Jobs, job: Job):
+    with pytest.raises(ClientError):
+        download_job_result(job.id, jobs)
+
+
+def test_delete_job(jobs: Jobs, job: Job):
+    delete_job(job.id, jobs)
+
+    with pytest.raises(NotFoundError):
+        jobs.get_job(job.id)
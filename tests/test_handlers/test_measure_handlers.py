@@ -17,9 +17,10 @@
 
 import jira
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 from sqlalchemy.orm import Session
 
+from mvtool.data.jira_ import JiraIssues, JiraProjects
 from mvtool.data.measures import Measures
 from mvtool.data.requirements import Requirements
 from mvtool.db.schema import CatalogRequirement, Document, Measure, Project, Requirement
@@ -65,6 +66,23 @@ def test_get_measures_with_pagination(measures: Measures, measure: Measure):
         assert isinstance(measure, MeasureOutput)
 
 
+@pytest.mark.parametrize("jira_unavailable", [False, True])
+def test_get_measures_jira_unavailable_header(
+    measures: Measures,
+    measure: Measure,
+    jira_issues: JiraIssues,
+    jira_projects: JiraProjects,
+    jira_unavailable: bool,
+):
+    jira_issues.jira_unavailable = jira_unavailable
+    jira_projects.jira_unavailable = False
+    response = Response()
+
+    get_measures([], [], {}, measures, response)
+
+    assert ("x-jira-unavailable" in response.headers) == jira_unavailable
+
+
 def test_create_measure(
     requirements: Requirements, requirement: Requirement, measures: Measures
 ):
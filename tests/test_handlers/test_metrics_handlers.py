@@ -0,0 +1,57 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from unittest.mock import patch
+
+from sqlalchemy.orm import Session
+
+from mvtool.db.database import PoolStats
+from mvtool.handlers.metrics import get_metrics
+from mvtool.models import Metrics
+
+
+def test_get_metrics(session: Session):
+    metrics = get_metrics()
+
+    assert isinstance(metrics, Metrics)
+    assert metrics.database_pool is None  # SQLite shares a single connection
+    assert metrics.jira.circuit_breaker == "closed"
+    assert metrics.jira.requests_in_flight == 0
+    assert set(metrics.jira.caches) == {
+        "issues",
+        "issue_access",
+        "projects",
+        "issue_types",
+    }
+    assert metrics.jira.caches["issues"].hits == 0
+
+
+def test_get_metrics_database_pool(session: Session):
+    pool_stats = PoolStats(
+        size=5,
+        checked_out=2,
+        overflow=0,
+        checkouts=10,
+        timeouts=0,
+        wait_time=0.5,
+        max_wait_time=0.2,
+    )
+    with patch("mvtool.handlers.metrics.get_pool_stats", return_value=pool_stats):
+        metrics = get_metrics()
+
+    assert metrics.database_pool.checked_out == 2
+    assert metrics.database_pool.mean_wait_time == 0.05
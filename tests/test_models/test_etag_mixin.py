@@ -13,6 +13,9 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import pickle
+from unittest.mock import patch
+
 import pytest
 
 from mvtool.models.common import ETagMixin
@@ -67,3 +70,32 @@ def test_etag_mixin_nested_different_values(person):
     other_address = Address(street="456 Market St", city="San Francisco", country="USA")
     other_person = Person(name="Jane Doe", age=30, address=other_address)
     assert person != other_person
+
+
+def test_etag_mixin_etag_is_cached(person):
+    etag = person.etag
+    with patch("mvtool.models.common.blake2b") as blake2b_mock:
+        assert person.etag == etag
+        blake2b_mock.assert_not_called()
+
+
+def test_etag_mixin_etag_invalidated_on_assignment(person):
+    etag = person.etag
+    person.name = "Jane Doe"
+    assert person.etag != etag
+
+
+def test_etag_mixin_etag_invalidated_on_nested_assignment(person):
+    etag = person.etag
+    person.address.city = "Boston"
+    assert person.etag != etag
+
+
+def test_etag_mixin_etag_of_copy(person):
+    etag = person.etag
+    assert person.model_copy().etag == etag
+    assert person.model_copy(update=dict(age=31)).etag != etag
+
+
+def test_etag_mixin_etag_of_unpickled(person):
+    assert pickle.loads(pickle.dumps(person)).etag == person.etag
@@ -13,6 +13,9 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
 import pytest
 
 from mvtool.models.common import ETagMixin
@@ -77,6 +80,34 @@ def test_column_group_import_labels(column_group):
     assert list(column_group.import_labels) == expected_labels
 
 
+def test_column_group_export_attrs(column_group: ColumnGroup):
+    assert column_group.export_attrs == {
+        "field1": None,
+        "field2": None,
+        "nested": {"field3": None},
+    }
+
+
+def test_column_group_export_types(column_group: ColumnGroup):
+    column_group.columns.append(
+        Column("Field 4", "field4", Column.EXPORT_ONLY, value_type=float)
+    )
+    column_group.columns.append(Column("Field 5", "field5", Column.EXPORT_ONLY))
+
+    assert column_group.export_types == {
+        "Group Field 1": str,
+        "Group Field 2": int,
+        "Nested Field 3": str,
+        "Group Field 4": float,
+        "Group Field 5": Any,
+    }
+
+
+def test_column_group_export_attrs_hidden_columns(column_group: ColumnGroup):
+    column_group.hide_columns(["Group Field 2", "Nested Field 3"])
+    assert column_group.export_attrs == {"field1": None}
+
+
 def test_column_group_export_to_row(column_group: ColumnGroup):
     obj = MainModel(field1="A", field2=1, nested=NestedModel(field3="C"))
     exported_row = list(column_group.export_to_row(obj))
@@ -154,3 +185,86 @@ def test_column_group_import_from_dataframe(column_group: ColumnGroup):
     assert imported_objs[1].field1 == "D"
     assert imported_objs[1].field2 == 3
     assert imported_objs[1].nested.field3 == "F"
+
+
+def test_column_group_import_from_rows(column_group: ColumnGroup):
+    rows = iter(
+        [
+            [
+                Cell("Group Field 1", "A"),
+                Cell("Group Field 2", 1),
+                Cell("Nested Field 3", "C"),
+            ],
+            [
+                Cell("Group Field 1", "D"),
+                Cell("Group Field 2", 3),
+                Cell("Nested Field 3", "F"),
+            ],
+        ]
+    )
+
+    imported_objs: list[MainModel] = list(column_group.import_from_rows(rows))
+    assert len(imported_objs) == 2
+    assert imported_objs[0].field1 == "A"
+    assert imported_objs[0].nested.field3 == "C"
+    assert imported_objs[1].field1 == "D"
+    assert imported_objs[1].nested.field3 == "F"
+
+
+def _get_rows(count: int, invalid_index: int | None = None):
+    for i in range(count):
+        yield [
+            Cell("Group Field 1", f"A{i}"),
+            Cell("Group Field 2", "invalid" if i == invalid_index else i),
+            Cell("Nested Field 3", f"C{i}"),
+        ]
+
+
+def test_column_group_import_from_rows_row_number(column_group: ColumnGroup):
+    with pytest.raises(RowValidationError) as error_info:
+        list(column_group.import_from_rows(_get_rows(3, invalid_index=1)))
+
+    # The first row after the header is row 2
+    assert error_info.value.row_number == 3
+    assert error_info.value.detail[0].startswith("Row 3: ")
+
+
+@pytest.mark.parametrize("count", [0, 3, 10])
+def test_column_group_import_from_rows_parallel(column_group: ColumnGroup, count):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        imported_objs: list[MainModel] = list(
+            column_group.import_from_rows(
+                _get_rows(count), executor=executor, chunk_size=4
+            )
+        )
+
+    # Check if the objects are returned in the order of the rows
+    assert [o.field2 for o in imported_objs] == list(range(count))
+    assert [o.nested.field3 for o in imported_objs] == [f"C{i}" for i in range(count)]
+
+
+def test_column_group_import_from_rows_parallel_row_number(column_group: ColumnGroup):
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        with pytest.raises(RowValidationError) as error_info:
+            list(
+                column_group.import_from_rows(
+                    _get_rows(10, invalid_index=6), executor=executor, chunk_size=4
+                )
+            )
+
+    assert error_info.value.row_number == 8
+
+
+def test_column_group_validate_rows(column_group: ColumnGroup):
+    rows = list(_get_rows(3, invalid_index=1))
+    rows.append([Cell("Group Field 1", None), Cell("Group Field 2", None)])
+
+    results = list(column_group.validate_rows(rows, skip_none=False))
+
+    # Invalid rows are reported without stopping the validation
+    assert [r[0] for r in results] == [2, 3, 4, 5]
+    assert results[0][1].field1 == "A0" and results[0][2] == []
+    assert results[1][1] is None and len(results[1][2]) == 1
+    assert results[1][2][0].startswith('Invalid value in "Field 2"')
+    assert results[2][1].field1 == "A2" and results[2][2] == []
+    assert results[3][1] is None and results[3][2] == []
@@ -0,0 +1,111 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+from sqlalchemy import inspect
+
+from mvtool.data.measures import Measures
+from mvtool.db.schema import Measure
+from mvtool.tables.catalog_modules import get_catalog_module_columns
+from mvtool.tables.catalog_requirements import get_catalog_requirement_columns
+from mvtool.tables.catalogs import get_catalog_columns
+from mvtool.tables.columns import ColumnGroup
+from mvtool.tables.documents import get_document_only_columns
+from mvtool.tables.jira_ import get_jira_issue_columns, get_jira_project_columns
+from mvtool.tables.measures import _get_measure_export_params, get_measure_columns
+from mvtool.tables.projects import get_project_only_columns
+from mvtool.tables.requirements import (
+    get_requirement_only_columns,
+    get_requirement_without_status_columns,
+)
+
+
+@pytest.fixture
+def measure_columns() -> ColumnGroup:
+    catalog_module_columns = get_catalog_module_columns(get_catalog_columns())
+    return get_measure_columns(
+        get_requirement_without_status_columns(
+            get_catalog_requirement_columns(catalog_module_columns),
+            get_project_only_columns(get_jira_project_columns()),
+            get_requirement_only_columns(),
+        ),
+        get_document_only_columns(),
+        get_jira_issue_columns(),
+    )
+
+
+def test_get_measure_export_params_without_jira(
+    session,
+    jira_issues,
+    measures_view: Measures,
+    create_measure: Measure,
+    measure_columns: ColumnGroup,
+):
+    measure_columns.hide_columns(
+        [label for label in measure_columns.export_labels if "Jira" in label]
+    )
+    params = _get_measure_export_params(measure_columns)
+    assert params["query_jira"] is False
+
+    session.expunge_all()
+    jira_issues.reset_mock()
+    measures = measures_view.list_measures(**params)
+    assert [m.id for m in measures] == [create_measure.id]
+    jira_issues.get_jira_issues.assert_not_called()
+
+
+def test_get_measure_export_params_prunes_hidden_columns(
+    session,
+    jira_issues,
+    measures_view: Measures,
+    create_measure: Measure,
+    measure_columns: ColumnGroup,
+):
+    measure_columns.hide_columns(
+        [
+            label
+            for label in measure_columns.export_labels
+            if label not in ("Measure ID", "Measure Summary")
+        ]
+    )
+    params = _get_measure_export_params(measure_columns)
+
+    session.expunge_all()
+    (measure,) = measures_view.list_measures(**params)
+    unloaded = inspect(measure).unloaded
+    assert "description" in unloaded
+    assert "requirement" in unloaded
+    assert "document" in unloaded
+    assert "summary" not in unloaded
+
+
+def test_get_measure_export_params_with_jira(
+    session,
+    jira_issues,
+    measures_view: Measures,
+    create_measure: Measure,
+    measure_columns: ColumnGroup,
+):
+    params = _get_measure_export_params(measure_columns)
+    assert params["query_jira"] is True
+
+    session.expunge_all()
+    (measure,) = measures_view.list_measures(**params)
+    assert "jira_issue_id" not in inspect(measure).unloaded
+    assert "project" not in inspect(measure.requirement).unloaded
+    assert measure.jira_issue.id == create_measure.jira_issue_id
+    assert measure.requirement.project.jira_project is not None
@@ -0,0 +1,114 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from mvtool.db.schema import Measure, Requirement
+from mvtool.models.measures import MeasureImport
+from mvtool.models.requirements import RequirementImport
+from mvtool.tables.columns import Cell, Column, ColumnGroup
+from mvtool.tables.preview import check_import, preview_import
+from mvtool.utils.errors import ValueHttpError
+
+
+@pytest.fixture
+def columns() -> ColumnGroup:
+    requirement_columns = ColumnGroup(
+        RequirementImport,
+        "Requirement",
+        [Column("ID", "id"), Column("Summary", "summary")],
+        "requirement",
+    )
+    return ColumnGroup(
+        MeasureImport,
+        "Measure",
+        [
+            Column("ID", "id"),
+            Column("Summary", "summary", required=True),
+            requirement_columns,
+        ],
+    )
+
+
+def _row(measure_id=None, summary="summary", requirement_id=None):
+    return [
+        Cell("Measure ID", measure_id),
+        Cell("Measure Summary", summary),
+        Cell("Requirement ID", requirement_id),
+        Cell("Requirement Summary", "summary" if requirement_id else None),
+    ]
+
+
+def test_preview_import(
+    session: Session,
+    columns: ColumnGroup,
+    create_measure: Measure,
+    create_requirement: Requirement,
+):
+    rows = [
+        _row(requirement_id=create_requirement.id),  # create
+        _row(measure_id=create_measure.id),  # update
+        _row(measure_id=-1),  # unknown measure
+        _row(measure_id="invalid"),  # invalid
+        _row(),  # no requirement and no fallback
+    ]
+
+    preview = preview_import(session, columns, rows, skip_none=False)
+
+    assert (preview.created, preview.updated, preview.invalid) == (1, 1, 3)
+    assert [r.row for r in preview.rows] == [2, 3, 4, 5, 6]
+    assert [r.action for r in preview.rows] == ["create", "update", None, None, None]
+    assert preview.rows[2].errors == ["No measure with id=-1."]
+    assert len(preview.rows[3].errors) == 1
+    assert preview.rows[4].errors == ["No fallback requirement provided."]
+
+
+def test_preview_import_with_fallback(session: Session, columns: ColumnGroup):
+    preview = preview_import(session, columns, [_row()], fallbacks={"requirement"})
+
+    assert preview.created == 1
+    assert preview.rows[0].errors == []
+
+
+def test_preview_import_does_not_write(
+    session: Session, columns: ColumnGroup, create_measure: Measure
+):
+    session.expunge_all()
+    statements = []
+    engine = session.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        preview_import(session, columns, [_row(measure_id=create_measure.id), _row()])
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert statements
+    assert all(s.lstrip().upper().startswith("SELECT") for s in statements)
+    assert not session.new and not session.dirty
+
+
+def test_check_import(session: Session, columns: ColumnGroup):
+    with pytest.raises(ValueHttpError) as error_info:
+        check_import(session, columns, [_row(), _row(measure_id=-1)])
+
+    assert error_info.value.detail == [
+        "Row 2: No fallback requirement provided.",
+        "Row 3: No measure with id=-1.",
+    ]
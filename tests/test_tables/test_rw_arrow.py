@@ -0,0 +1,152 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from datetime import date
+from tempfile import NamedTemporaryFile
+from typing import Annotated
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pydantic import BaseModel, constr
+
+from mvtool.tables.columns import Column, ColumnGroup
+from mvtool.tables.rw_arrow import get_arrow_schema, write_arrow, write_parquet
+
+
+class ImportModel(BaseModel):
+    id: int | None = None
+    status: constr(pattern=r"^(C|NC)$") | None = None
+    summary: str
+    day: date | None = None
+    tag: Annotated[str, "not a constraint"] | None = None
+
+
+class ExportModel(BaseModel):
+    id: int
+    status: str | None = None
+    summary: str
+    day: date | None = None
+    tag: str | None = None
+    progress: float | None = None
+    other: object = None
+
+
+def _get_columns() -> ColumnGroup:
+    return ColumnGroup(
+        ImportModel,
+        "Item",
+        [
+            Column("ID", "id"),
+            Column("Status", "status"),
+            Column("Summary", "summary"),
+            Column("Day", "day"),
+            Column("Tag", "tag"),
+            Column("Progress", "progress", Column.EXPORT_ONLY, value_type=float),
+            Column("Other", "other", Column.EXPORT_ONLY),
+        ],
+    )
+
+
+def _get_objects(count: int = 6) -> list[ExportModel]:
+    return [
+        ExportModel(
+            id=i,
+            status="C" if i % 2 else "NC",
+            summary=f"summary{i}",
+            day=date(2024, 1, i + 1),
+            other=i if i % 2 else "text",
+        )
+        for i in range(count)
+    ]
+
+
+def test_get_arrow_schema():
+    schema = get_arrow_schema(_get_columns())
+
+    assert schema.names == [
+        "Item ID",
+        "Item Status",
+        "Item Summary",
+        "Item Day",
+        "Item Tag",
+        "Item Progress",
+        "Item Other",
+    ]
+    assert schema.field("Item ID").type == pa.int64()
+    assert schema.field("Item Status").type == pa.dictionary(pa.int32(), pa.string())
+    assert schema.field("Item Summary").type == pa.string()
+    assert schema.field("Item Day").type == pa.date32()
+    assert schema.field("Item Tag").type == pa.string()
+    assert schema.field("Item Progress").type == pa.float64()
+    assert schema.field("Item Other").type == pa.string()
+
+
+def test_get_arrow_schema_hidden_columns():
+    columns = _get_columns()
+    columns.hide_columns(["Item Summary"])
+
+    assert "Item Summary" not in get_arrow_schema(columns).names
+
+
+def test_write_parquet():
+    with NamedTemporaryFile(suffix=".parquet") as temp:
+        write_parquet(_get_columns(), _get_objects(), temp.name, batch_size=4)
+
+        parquet_file = pq.ParquetFile(temp.name)
+        assert parquet_file.metadata.num_row_groups == 2
+        table = parquet_file.read()
+
+    assert table.schema == get_arrow_schema(_get_columns())
+    assert table.column("Item ID").to_pylist() == list(range(6))
+    assert table.column("Item Progress").to_pylist() == [None] * 6
+    assert table.column("Item Other").to_pylist()[:2] == ["text", "1"]
+
+
+def test_write_arrow():
+    with NamedTemporaryFile(suffix=".arrow") as temp:
+        write_arrow(_get_columns(), _get_objects(), temp.name, batch_size=4)
+
+        with pa.ipc.open_file(temp.name) as reader:
+            assert reader.num_record_batches == 2
+            table = reader.read_all()
+
+    assert table.schema == get_arrow_schema(_get_columns())
+    assert table.column("Item Status").to_pylist() == ["NC", "C"] * 3
+    assert table.column("Item Day").to_pylist()[0] == date(2024, 1, 1)
+
+
+def test_write_arrow_unknown_choice():
+    objs = _get_objects(2) + [_get_objects(1)[0].model_copy(update={"status": "X"})]
+
+    with NamedTemporaryFile(suffix=".arrow") as temp:
+        write_arrow(_get_columns(), objs, temp.name, batch_size=2)
+
+        with pa.ipc.open_file(temp.name) as reader:
+            table = reader.read_all()
+
+    assert table.column("Item Status").to_pylist() == ["NC", "C", "X"]
+
+
+def test_write_arrow_empty():
+    with NamedTemporaryFile(suffix=".arrow") as temp:
+        write_arrow(_get_columns(), [], temp.name)
+
+        with pa.ipc.open_file(temp.name) as reader:
+            table = reader.read_all()
+
+    assert table.num_rows == 0
+    assert table.schema == get_arrow_schema(_get_columns())
@@ -22,6 +22,7 @@ from mvtool.tables.dataframe import DataFrame
 from mvtool.tables.rw_csv import (
     CSVDialect,
     get_encoding_options,
+    iter_csv,
     lookup_encoding,
     read_csv,
     sniff_csv_dialect,
@@ -344,3 +345,37 @@ def test_write_csv_cursor_reset():
 
     # Check if cursor is reset after writing
     assert buffer.tell() == 0
+
+
+def test_iter_csv():
+    csv_content = "a,b,c\n1,,3\n4,5,6\n"
+    file_obj = io.BytesIO(csv_content.encode("utf-8"))
+
+    rows = [[tuple(cell) for cell in row] for row in iter_csv(file_obj, "utf-8")]
+    assert rows == [
+        [("a", "1"), ("b", None), ("c", "3")],
+        [("a", "4"), ("b", "5"), ("c", "6")],
+    ]
+
+
+def test_iter_csv_empty():
+    file_obj = io.BytesIO(b"")
+    assert list(iter_csv(file_obj, "utf-8")) == []
+
+
+def test_iter_csv_nonexistent_encoding():
+    file_obj = io.BytesIO(b"a,b,c\n1,2,3\n")
+
+    with pytest.raises(ValueHttpError) as e_info:
+        iter_csv(file_obj, encoding="non_existent_encoding")
+
+    assert "Unsupported encoding: non_existent_encoding" in str(e_info.value)
+
+
+def test_iter_csv_invalid_columns():
+    file_obj = io.BytesIO(b"a,b\n1,2,3\n")
+
+    with pytest.raises(ValueHttpError) as e_info:
+        list(iter_csv(file_obj, "utf-8"))
+
+    assert "Error reading CSV due to" in str(e_info.value)
@@ -18,7 +18,7 @@ from tempfile import NamedTemporaryFile
 from openpyxl import Workbook, load_workbook
 
 from mvtool.tables.dataframe import Cell, DataFrame
-from mvtool.tables.rw_excel import read_excel, write_excel
+from mvtool.tables.rw_excel import iter_excel, read_excel, write_excel
 
 
 def test_read_excel():
@@ -42,6 +42,26 @@ def test_read_excel():
         }
 
 
+def test_iter_excel():
+    # Create a workbook and add some data
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["A", "B"])
+    ws.append([1, 2])
+    ws.append([3, 4])
+
+    # Save the workbook to a temporary file
+    with NamedTemporaryFile(suffix=".xlsx") as temp:
+        wb.save(temp.name)
+
+        # Now iterate over the rows of the file and check the data
+        rows = [[tuple(cell) for cell in row] for row in iter_excel(temp.name)]
+        assert rows == [
+            [("A", 1), ("B", 2)],
+            [("A", 3), ("B", 4)],
+        ]
+
+
 def test_write_excel():
     # Create a DataFrame and add some data
     df = DataFrame(
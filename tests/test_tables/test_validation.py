@@ -0,0 +1,53 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from mvtool.config import ImportsConfig
+from mvtool.tables.validation import (
+    setup_validation_executor,
+    shutdown_validation_executor,
+    validation_params,
+)
+
+
+@pytest.fixture(autouse=True)
+def shutdown():
+    yield
+    shutdown_validation_executor()
+
+
+def test_setup_validation_executor():
+    imports_config = ImportsConfig(validation_workers=2, validation_chunk_size=10)
+
+    executor = setup_validation_executor(imports_config)
+
+    assert isinstance(executor, ProcessPoolExecutor)
+    assert validation_params() == dict(executor=executor, chunk_size=10)
+
+
+def test_setup_validation_executor_single_worker():
+    imports_config = ImportsConfig(validation_workers=1)
+
+    assert setup_validation_executor(imports_config) is None
+    assert validation_params() == dict()
+
+
+def test_validation_params_without_executor():
+    assert validation_params() == dict()
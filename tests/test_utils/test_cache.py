@@ -0,0 +1,219 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from mvtool.utils.cache import CacheStats, SharedCache, SingleFlight
+
+
+def test_shared_cache_get_set():
+    cache = SharedCache(maxsize=10, ttl=60)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    assert cache.get("missing", "default") == "default"
+
+
+def test_shared_cache_stats():
+    cache = SharedCache(maxsize=10, ttl=60)
+    cache.set("key", "value")
+    cache.get("key")
+    cache.get("key")
+    cache.get("missing")
+
+    stats = cache.stats
+    assert stats == CacheStats(hits=2, misses=1, size=1)
+    assert stats.hit_rate == 2 / 3
+
+
+def test_shared_cache_stats_no_lookups():
+    assert SharedCache().stats.hit_rate == 0.0
+
+
+def test_shared_cache_ttl():
+    cache = SharedCache(maxsize=10, ttl=0.01)
+    cache.set("key", "value")
+    time.sleep(0.02)
+    assert cache.get("key") is None
+    assert cache.stats.size == 0
+
+
+def test_shared_cache_maxsize():
+    cache = SharedCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_shared_cache_delete():
+    cache = SharedCache()
+    cache.set("key", "value")
+    cache.delete("key")
+    cache.delete("missing")
+    assert cache.get("key") is None
+
+
+def test_shared_cache_delete_where():
+    cache = SharedCache()
+    cache.set(("user1", "1"), "a")
+    cache.set(("user2", "1"), "b")
+    cache.set(("user1", "2"), "c")
+
+    cache.delete_where(lambda key: key[1] == "1")
+
+    assert cache.get(("user1", "1")) is None
+    assert cache.get(("user2", "1")) is None
+    assert cache.get(("user1", "2")) == "c"
+
+
+def test_shared_cache_configure_and_clear():
+    cache = SharedCache()
+    cache.set("key", "value")
+    cache.configure(maxsize=5, ttl=10)
+    assert cache.get("key") is None
+
+    cache.set("key", "value")
+    cache.clear()
+    assert cache.stats == CacheStats(hits=0, misses=0, size=0)
+
+
+def _wait_for_refresh(cache: SharedCache, key) -> None:
+    for _ in range(100):
+        with cache._lock:
+            if key not in cache._refreshing:
+                return
+        time.sleep(0.01)
+
+
+def test_shared_cache_get_or_load():
+    cache = SharedCache()
+    load = Mock(return_value="value")
+
+    assert cache.get_or_load("key", load) == "value"
+    assert cache.get_or_load("key", load) == "value"
+    load.assert_called_once()
+
+
+def test_shared_cache_get_or_load_refreshes_in_background():
+    cache = SharedCache(refresh_after=0)
+    cache.get_or_load("key", lambda: "old")
+
+    # The cached value is returned while it is refreshed in background
+    assert cache.get_or_load("key", lambda: "new") == "old"
+    _wait_for_refresh(cache, "key")
+    assert cache.get("key") == "new"
+
+
+def test_shared_cache_get_or_load_refresh_error():
+    cache = SharedCache(refresh_after=0)
+    cache.get_or_load("key", lambda: "old")
+
+    assert cache.get_or_load("key", Mock(side_effect=Exception("error"))) == "old"
+    _wait_for_refresh(cache, "key")
+    assert cache.get("key") == "old"
+
+
+def test_shared_cache_get_stale():
+    cache = SharedCache(ttl=0.01, max_stale=60)
+    cache.set("key", "value")
+    time.sleep(0.02)
+
+    # Expired entries are only returned by get_stale
+    assert cache.get("key") is None
+    assert cache.get_stale("key") == "value"
+    assert cache.get_or_load("key", lambda: "new") == "new"
+
+
+def test_shared_cache_get_stale_drops_entries():
+    cache = SharedCache(ttl=0.01)
+    cache.set("key", "value")
+    time.sleep(0.02)
+
+    assert cache.get_stale("key", "default") == "default"
+
+
+def _run_concurrently(fn, count: int) -> list:
+    results = [None] * count
+
+    def run(index):
+        try:
+            results[index] = fn()
+        except Exception as error:
+            results[index] = error
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_single_flight_shares_concurrent_calls():
+    single_flight = SingleFlight()
+    release = threading.Event()
+    fn = Mock(side_effect=lambda: release.wait(1) and "value")
+
+    threading.Timer(0.1, release.set).start()
+    results = _run_concurrently(lambda: single_flight.do("key", fn), 4)
+
+    assert results == ["value"] * 4
+    fn.assert_called_once()
+    assert single_flight.in_flight == 0
+
+
+def test_single_flight_shares_exceptions():
+    single_flight = SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait(1)
+        raise ValueError("error")
+
+    fn = Mock(side_effect=fn)
+
+    threading.Timer(0.1, release.set).start()
+    results = _run_concurrently(lambda: single_flight.do("key", fn), 3)
+
+    assert all(isinstance(r, ValueError) for r in results)
+    fn.assert_called_once()
+
+
+def test_single_flight_distinct_and_sequential_calls():
+    single_flight = SingleFlight()
+    fn = Mock(return_value="value")
+
+    single_flight.do("key", fn)
+    single_flight.do("key", fn)
+    single_flight.do("other", fn)
+
+    assert fn.call_count == 3
+
+
+def test_single_flight_error_does_not_block():
+    single_flight = SingleFlight()
+
+    with pytest.raises(ValueError):
+        single_flight.do("key", Mock(side_effect=ValueError))
+    assert single_flight.do("key", lambda: "value") == "value"
@@ -0,0 +1,102 @@
+# coding: utf-8
+#
+# Copyright (C) 2024 Helmar Hutschenreuter
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from mvtool.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def _fail(breaker: CircuitBreaker, error: Exception = ValueError()) -> None:
+    with pytest.raises(type(error)):
+        breaker.call(Mock(side_effect=error))
+
+
+def test_circuit_breaker_passes_calls():
+    breaker = CircuitBreaker()
+    assert breaker.call(lambda: "value") == "value"
+    assert breaker.state == "closed"
+
+
+def test_circuit_breaker_opens_after_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    _fail(breaker)
+    assert breaker.state == "closed"
+    _fail(breaker)
+    assert breaker.state == "open"
+
+    fn = Mock()
+    with pytest.raises(CircuitOpenError):
+        breaker.call(fn)
+    fn.assert_not_called()
+
+
+def test_circuit_breaker_success_resets_failures():
+    breaker = CircuitBreaker(failure_threshold=2)
+    _fail(breaker)
+    breaker.call(lambda: None)
+    _fail(breaker)
+    assert breaker.state == "closed"
+
+
+def test_circuit_breaker_ignores_non_failures():
+    breaker = CircuitBreaker(
+        failure_threshold=1, is_failure=lambda e: not isinstance(e, KeyError)
+    )
+    _fail(breaker, KeyError())
+    assert breaker.state == "closed"
+
+
+def test_circuit_breaker_trial_call_closes_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    _fail(breaker)
+    assert breaker.state == "half-open"
+
+    assert breaker.call(lambda: "value") == "value"
+    assert breaker.state == "closed"
+
+
+def test_circuit_breaker_failed_trial_call_opens_circuit():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        _fail(breaker)
+    time.sleep(0.05)
+    assert breaker.state == "half-open"
+
+    _fail(breaker)  # trial call
+    assert breaker.state == "open"
+
+
+def test_circuit_breaker_single_trial_call():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    _fail(breaker)
+
+    def trial():
+        # Other calls are refused while the trial call is running
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: None)
+        return "value"
+
+    assert breaker.call(trial) == "value"
+
+
+def test_circuit_breaker_reset():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    _fail(breaker)
+    breaker.reset()
+    assert breaker.state == "closed"
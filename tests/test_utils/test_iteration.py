@@ -14,7 +14,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import pytest
-from mvtool.utils.iteration import CachedIterable
+from mvtool.utils.iteration import CachedIterable, batched
 
 
 def test_cached_iterable_basic():
@@ -110,3 +110,24 @@ def test_cached_iterable_interrupted_first_iteration(interrupted_generator):
     second_iteration = list(iterable)
 
     assert second_iteration == [0, 1, 2]
+
+
+@pytest.mark.parametrize(
+    "size, expected_batches",
+    [
+        (2, [[0, 1], [2, 3], [4]]),
+        (5, [[0, 1, 2, 3, 4]]),
+        (10, [[0, 1, 2, 3, 4]]),
+    ],
+)
+def test_batched(generator, size, expected_batches):
+    assert list(batched(generator, size)) == expected_batches
+
+
+def test_batched_empty():
+    assert list(batched([], 3)) == []
+
+
+def test_batched_invalid_size():
+    with pytest.raises(ValueError):
+        list(batched(range(5), 0))
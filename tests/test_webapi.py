@@ -22,6 +22,7 @@ from jira import JIRAError
 
 from mvtool import get_app
 from mvtool.auth import get_jira
+from mvtool.config import load_config
 from mvtool.db.database import get_session
 from mvtool.db.schema import CatalogRequirement, Document, Project, Requirement
 from mvtool.models.jira_ import JiraIssueInput
@@ -428,3 +429,45 @@ def test_upload_gs_baustein(client, create_catalog):
             files=dict(upload_file=gs_baustein_file),
         )
     assert response.status_code == 201
+
+
+@pytest.fixture
+def webhook_client(client, config):
+    config.jira.webhook_secret = "secret"
+    client.app.dependency_overrides[load_config] = lambda: config
+    return client
+
+
+@pytest.mark.parametrize(
+    "payload_name", ["issue_updated", "issue_deleted", "comment_created"]
+)
+def test_replay_jira_webhook(webhook_client, payload_name):
+    with open(f"tests/data/jira_webhooks/{payload_name}.json", "rb") as payload_file:
+        response = webhook_client.post(
+            "/api/jira/webhook?secret=secret",
+            content=payload_file.read(),
+            headers={"Content-Type": "application/json"},
+        )
+    assert response.status_code == 204
+
+
+def test_jira_webhook_secret_header(webhook_client):
+    response = webhook_client.post(
+        "/api/jira/webhook",
+        headers={"X-Jira-Webhook-Secret": "secret"},
+        json={"webhookEvent": "jira:issue_created"},
+    )
+    assert response.status_code == 204
+
+
+def test_jira_webhook_invalid_secret(webhook_client):
+    response = webhook_client.post(
+        "/api/jira/webhook?secret=wrong", json={"webhookEvent": "jira:issue_updated"}
+    )
+    assert response.status_code == 401
+
+
+def test_get_metrics(client):
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.json()["jira"]["circuit_breaker"] == "closed"